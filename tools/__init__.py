@@ -1,7 +1,25 @@
 """Stationeers Companion scraping tools."""
 
-from .github_scraper import GitHubScraper
-from .steam_scraper import SteamScraper
-from .wiki_scraper import WikiScraper
+import importlib
+
+# Scrapers pull in requests/bs4, so load them only when first accessed
+_LAZY_ATTRS = {
+    "GitHubScraper": ".github_scraper",
+    "SteamScraper": ".steam_scraper",
+    "WikiScraper": ".wiki_scraper",
+}
 
 __all__ = ["WikiScraper", "GitHubScraper", "SteamScraper"]
+
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -342,56 +342,39 @@ GRAMMAR_PATH = GRAMMAR_DIR / "tree-sitter-ic10.so"
 MAX_LINES = 128
 MAX_LINE_LENGTH = 90
 MAX_CODE_SIZE = 4096  # bytes
+MAX_INSTRUCTIONS_PER_TICK = 128  # "CPU overrun" beyond this without a yield
+
+# On-disk validation result cache (opt-in via --cache)
+VALIDATOR_CACHE_PATH = PROJECT_ROOT / ".cache" / "ic10-validator.sqlite3"
+VALIDATOR_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Machine-local baseline for `python -m tools.ic10_bench validate`
+VALIDATOR_BENCH_BASELINE = PROJECT_ROOT / ".cache" / "ic10-bench-validate.json"
+VALIDATOR_BENCH_THRESHOLD = 0.20  # fail on >20% regressions
 
 # Valid registers
 VALID_REGISTERS = [f"r{i}" for i in range(16)] + ["ra", "sp"]
 
 # Valid device ports
-VALID_DEVICES = [f"d{i}" for i in range(6)] + ["db", "dr"]
+VALID_DEVICES = [f"d{i}" for i in range(6)] + ["db"]
 
 # Instructions that don't require yield in loops (they pause execution)
 YIELD_INSTRUCTIONS = {"yield", "sleep"}
 
 # Instructions that can branch (for loop detection)
-BRANCH_INSTRUCTIONS = {
-    "j",
-    "jr",
-    "jal",
-    "beq",
-    "bne",
-    "bgt",
-    "blt",
-    "bge",
-    "ble",
-    "beqz",
-    "bnez",
-    "bgtz",
-    "bltz",
-    "bgez",
-    "blez",
-    "beqal",
-    "bneal",
-    "bgtal",
-    "bltal",
-    "bgeal",
-    "bleal",
-    "bap",
-    "bna",
-    "bapz",
-    "bnaz",
-    "bdse",
-    "bdns",
-    "bdseal",
-    "bdnsal",
-    "brap",
-    "brna",
-    "breq",
-    "brne",
-    "brgt",
-    "brlt",
-    "brge",
-    "brle",
-}
+BRANCH_INSTRUCTIONS = set(INSTRUCTION_CATEGORIES["branching"])
 
-# Unconditional jump instructions (for unreachable code detection)
+# Unconditional jump instructions (for unreachable code detection); `jal`
+# still resumes at the next line when its callee returns
 UNCONDITIONAL_JUMPS = {"j", "jr", "jal"}
+
+# =============================================================================
+# IC10 Emulator Configuration
+# =============================================================================
+
+# Prefab hash sources for the simulated device network
+DEVICE_HASHES_PATH = KNOWLEDGE_DIR / "hashes" / "device-hashes.md"
+
+# Game clock for the tick scheduler
+TICK_SECONDS = 0.5
+DAY_TICKS = 2400  # default 20-minute day/night cycle
@@ -0,0 +1,351 @@
+"""Vectorized stand-in atmosphere for closed-loop IC10 controller tests.
+
+Not the game's simulation: an ideal-gas model of many rooms at once, with
+just enough behaviour for controllers to act against. Each room holds moles
+of the seven gases in knowledge/gases/properties.md at one temperature, and
+pressure is nRT/V. Active vents, volume pumps, heaters and coolers move gas
+and heat each step. A sensor reads every logic type that
+docs/devices/atmospheric/gas-sensor.md lists as readable. State is stored
+as [rooms] and [gases, rooms] arrays, so one step updates every room with a
+few NumPy operations.
+
+    rooms = Atmosphere(10_000, temperature=np.linspace(270, 320, 10_000))
+    sim = LockstepChips(compile_program(code), chips=10_000)
+    closed_loop(sim, rooms, ticks=2400, sensor=0, vent=1, heater=2)
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+from . import config
+from .ic10_emulator import PIN_COUNT
+
+# Gas order of every [gases, rooms] array; logic types are "Ratio" + name
+GASES = (
+    "Oxygen",
+    "Nitrogen",
+    "CarbonDioxide",
+    "Volatiles",
+    "Pollutant",
+    "Water",
+    "NitrousOxide",
+)
+# Molar heat capacities, J/(mol K) (approximate in-game values)
+SPECIFIC_HEAT = np.array([21.1, 20.6, 28.2, 20.4, 24.8, 72.0, 23.0])
+# Liquids are not modelled; their ratios always read 0
+LIQUID_RATIOS = (
+    "RatioLiquidOxygen",
+    "RatioLiquidNitrogen",
+    "RatioLiquidCarbonDioxide",
+    "RatioLiquidVolatiles",
+    "RatioLiquidPollutant",
+    "RatioLiquidNitrousOxide",
+    "RatioPollutedWater",
+)
+
+GAS_CONSTANT = 8.31446  # J/(mol K); with litres, nRT/V is in kPa
+ROOM_VOLUME = 8000.0  # litres, one 2 m grid cell
+IDEAL_PRESSURE = 101.325  # kPa
+IDEAL_TEMPERATURE = 293.15  # K
+AIR = np.array([0.21, 0.79, 0.0, 0.0, 0.0, 0.0, 0.0])
+
+VENT_MAX_FLOW = 10.0  # mol/s through an active vent
+HEATER_WATTS = 1000.0
+COOLER_WATTS = 1000.0
+# Flammable mix for the Combustion flag
+COMBUSTION_OXYGEN = 0.05
+COMBUSTION_VOLATILES = 0.05
+
+
+@dataclass
+class GasSource:
+    """An unlimited pipe network that vents and pumps draw from."""
+
+    pressure: float = 5000.0  # kPa
+    temperature: float = IDEAL_TEMPERATURE
+    ratios: np.ndarray = field(default_factory=lambda: AIR.copy())
+
+
+def _per_room(value, rooms: int) -> np.ndarray:
+    return np.broadcast_to(np.asarray(value, dtype=np.float64), (rooms,)).copy()
+
+
+# =============================================================================
+# Rooms
+# =============================================================================
+
+
+class Atmosphere:
+    """Gas contents and temperature of many independent rooms."""
+
+    def __init__(
+        self,
+        rooms: int,
+        volume: Union[float, np.ndarray] = ROOM_VOLUME,
+        pressure: Union[float, np.ndarray] = IDEAL_PRESSURE,
+        temperature: Union[float, np.ndarray] = IDEAL_TEMPERATURE,
+        ratios: np.ndarray = AIR,
+    ):
+        self.rooms = rooms
+        self.volume = _per_room(volume, rooms)
+        self.temperature = _per_room(temperature, rooms)
+        total = _per_room(pressure, rooms) * self.volume / (GAS_CONSTANT * self.temperature)
+        self.moles = np.asarray(ratios, dtype=np.float64)[:, None] * total
+
+    @property
+    def total_moles(self) -> np.ndarray:
+        return self.moles.sum(axis=0)
+
+    @property
+    def pressure(self) -> np.ndarray:
+        """kPa."""
+        return self.total_moles * GAS_CONSTANT * self.temperature / self.volume
+
+    @property
+    def heat_capacity(self) -> np.ndarray:
+        """J/K."""
+        return SPECIFIC_HEAT @ self.moles
+
+    def ratios(self) -> np.ndarray:
+        """[gases, rooms] mole fractions (0 in vacuum)."""
+        total = self.total_moles
+        return np.divide(self.moles, total, out=np.zeros_like(self.moles), where=total > 0)
+
+    def readings(self) -> dict[str, np.ndarray]:
+        """Every readable Gas Sensor atmosphere logic type, per room."""
+        ratios = self.ratios()
+        values = {
+            "Pressure": self.pressure,
+            "Temperature": self.temperature.copy(),
+            "TotalMoles": self.total_moles,
+        }
+        for i, gas in enumerate(GASES):
+            values["Ratio" + gas] = ratios[i]
+        values["Combustion"] = (
+            (ratios[0] >= COMBUSTION_OXYGEN) & (ratios[3] >= COMBUSTION_VOLATILES)
+        ).astype(np.float64)
+        zeros = np.zeros(self.rooms)
+        for name in LIQUID_RATIOS:
+            values[name] = zeros
+        return values
+
+    # -- Changes ------------------------------------------------------------
+
+    def add_gas(self, moles: np.ndarray, temperature: Union[float, np.ndarray]) -> None:
+        """Mix [gases, rooms] moles at `temperature` into the rooms."""
+        added = SPECIFIC_HEAT @ moles
+        capacity = self.heat_capacity
+        total = capacity + added
+        mixed = np.divide(
+            capacity * self.temperature + added * temperature,
+            total,
+            out=self.temperature.copy(),
+            where=total > 0,
+        )
+        self.moles += moles
+        self.temperature = mixed
+
+    def remove_gas(self, total: np.ndarray) -> np.ndarray:
+        """Take up to `total` moles per room at its current mix; returns [gases, rooms]."""
+        taken = self.ratios() * np.minimum(total, self.total_moles)
+        self.moles -= taken
+        np.maximum(self.moles, 0.0, out=self.moles)
+        return taken
+
+    def heat(self, joules: Union[float, np.ndarray]) -> None:
+        """Add (or remove, if negative) heat; rooms stay at or above 0 K."""
+        capacity = self.heat_capacity
+        delta = np.divide(joules, capacity, out=np.zeros(self.rooms), where=capacity > 0)
+        self.temperature = np.maximum(self.temperature + delta, 0.0)
+
+    def vent(
+        self,
+        on: np.ndarray,
+        mode: np.ndarray,
+        target: np.ndarray,
+        seconds: float,
+        source: Optional[GasSource] = None,
+    ) -> None:
+        """Active vents: mode 0 fills from `source` up to `target` kPa, 1 empties to it."""
+        source = source or GasSource()
+        pressure = self.pressure
+        per_kpa = self.volume / (GAS_CONSTANT * np.maximum(self.temperature, 1.0))
+        limit = VENT_MAX_FLOW * seconds
+        flow = np.clip((target - pressure) * per_kpa, -limit, limit)
+        running = on != 0
+        inward = running & (mode != 0)
+        outward = running & (mode == 0) & (pressure < source.pressure)
+        fill = np.where(outward, np.maximum(flow, 0.0), 0.0)
+        self.add_gas(np.outer(source.ratios, fill), source.temperature)
+        self.remove_gas(np.where(inward, np.maximum(-flow, 0.0), 0.0))
+
+    def pump(
+        self,
+        on: np.ndarray,
+        setting: np.ndarray,
+        seconds: float,
+        source: Optional[GasSource] = None,
+    ) -> None:
+        """Volume pumps: move `setting` litres/s of `source` gas into the rooms."""
+        source = source or GasSource()
+        litres = np.where(on != 0, np.maximum(setting, 0.0), 0.0) * seconds
+        moles = litres * source.pressure / (GAS_CONSTANT * source.temperature)
+        self.add_gas(np.outer(source.ratios, moles), source.temperature)
+
+
+# =============================================================================
+# Closed Loop
+# =============================================================================
+
+
+def closed_loop(
+    sim,
+    rooms: Atmosphere,
+    ticks: int,
+    sensor: Optional[int] = None,
+    vent: Optional[int] = None,
+    pump: Optional[int] = None,
+    heater: Optional[int] = None,
+    cooler: Optional[int] = None,
+    source: Optional[GasSource] = None,
+    disturbance: Optional[Callable[[Atmosphere, int], None]] = None,
+    max_steps: int = config.MAX_INSTRUCTIONS_PER_TICK,
+) -> Counter:
+    """Run LockstepChips against one room per chip for `ticks` ticks.
+
+    Each tick writes sensor readings to the `sensor` pin, runs every chip to
+    its next yield/sleep (or `max_steps`, resuming next tick), then applies
+    what the chips wrote to the vent (On, Mode, PressureExternal), pump (On,
+    Setting), heater and cooler (On) pins for config.TICK_SECONDS.
+    `disturbance(rooms, tick)` runs last, for heat leaks, crew breathing and
+    the like. Returns the final chip statuses.
+    """
+    if rooms.rooms != sim.chips:
+        raise ValueError(f"{rooms.rooms} rooms for {sim.chips} chips")
+    source = source or GasSource()
+    if vent is not None and "PressureExternal" not in sim.pin_logic:
+        sim.attach(vent, {"PressureExternal": IDEAL_PRESSURE})
+    for pin in (sensor, vent, pump, heater, cooler):
+        if pin is not None:
+            sim.pin_set[:, pin] = True
+
+    seconds = config.TICK_SECONDS
+    statuses = Counter()
+    for tick in range(ticks):
+        if sensor is not None:
+            for logic_type, values in rooms.readings().items():
+                sim.pin_values(logic_type)[:, sensor] = values
+        statuses = sim.run(max_steps)
+        on = sim.pin_values("On")
+        if vent is not None:
+            rooms.vent(
+                on[:, vent],
+                sim.pin_values("Mode")[:, vent],
+                sim.pin_values("PressureExternal")[:, vent],
+                seconds,
+                source,
+            )
+        if pump is not None:
+            rooms.pump(on[:, pump], sim.pin_values("Setting")[:, pump], seconds, source)
+        if heater is not None:
+            rooms.heat(np.where(on[:, heater] != 0, HEATER_WATTS * seconds, 0.0))
+        if cooler is not None:
+            rooms.heat(np.where(on[:, cooler] != 0, -COOLER_WATTS * seconds, 0.0))
+        if disturbance is not None:
+            disturbance(rooms, tick)
+    return statuses
+
+
+# =============================================================================
+# CLI Interface
+# =============================================================================
+
+
+def _pin(text: str) -> int:
+    if text == "db":
+        return PIN_COUNT
+    if not (text.startswith("d") and text[1:].isdigit() and int(text[1:]) < PIN_COUNT):
+        raise argparse.ArgumentTypeError(f"expected d0-d5 or db, got '{text}'")
+    return int(text[1:])
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description="Run an IC10 controller against simulated rooms (one per chip)"
+    )
+    parser.add_argument("file", type=Path, help="Path to IC10 file to run")
+    parser.add_argument("--rooms", type=int, default=1000, help="Rooms/chips (default: 1000)")
+    parser.add_argument(
+        "--ticks", type=int, default=config.DAY_TICKS, help="Ticks to run (default: one day)"
+    )
+    parser.add_argument("--sensor", type=_pin, help="Gas sensor pin, e.g. d0")
+    parser.add_argument("--vent", type=_pin, help="Active vent pin")
+    parser.add_argument("--pump", type=_pin, help="Volume pump pin")
+    parser.add_argument("--heater", type=_pin, help="Wall heater pin")
+    parser.add_argument("--cooler", type=_pin, help="Wall cooler pin")
+    parser.add_argument(
+        "--temperature",
+        type=float,
+        nargs=2,
+        default=(IDEAL_TEMPERATURE, IDEAL_TEMPERATURE),
+        metavar=("LOW", "HIGH"),
+        help="Spread starting temperatures across rooms (K)",
+    )
+    parser.add_argument(
+        "--pressure",
+        type=float,
+        nargs=2,
+        default=(IDEAL_PRESSURE, IDEAL_PRESSURE),
+        metavar=("LOW", "HIGH"),
+        help="Spread starting pressures across rooms (kPa)",
+    )
+    args = parser.parse_args()
+
+    from .ic10_emulator import CompileError, compile_program
+    from .ic10_lockstep import LockstepChips
+
+    try:
+        sim = LockstepChips(compile_program(args.file.read_text(encoding="utf-8")), args.rooms)
+    except (OSError, CompileError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    rooms = Atmosphere(
+        args.rooms,
+        pressure=np.linspace(*args.pressure, args.rooms),
+        temperature=np.linspace(*args.temperature, args.rooms),
+    )
+
+    start = time.perf_counter()
+    statuses = closed_loop(
+        sim,
+        rooms,
+        args.ticks,
+        sensor=args.sensor,
+        vent=args.vent,
+        pump=args.pump,
+        heater=args.heater,
+        cooler=args.cooler,
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"Ticks: {args.ticks} x {args.rooms} rooms in {elapsed:.2f}s")
+    for name, values in (("Pressure", rooms.pressure), ("Temperature", rooms.temperature)):
+        print(
+            f"  {name:<12} min {values.min():9.2f}  mean {values.mean():9.2f}"
+            f"  max {values.max():9.2f}"
+        )
+    for status, count in statuses.most_common():
+        print(f"  {status}: {count}")
+    sys.exit(1 if statuses.get("error") else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,561 @@
+"""Benchmarks for the IC10 tooling.
+
+Subcommands:
+  startup   import-time budget for `python -m tools.ic10_validator`
+  memory    retained memory of ValidationResult objects per 10k results
+  validate  throughput, per-check time and peak memory over the corpus and
+            synthetic worst cases, compared against a saved JSON baseline
+  emulator  instructions per second of the IC10 emulator
+  scheduler wall time for 10,000 sleeping chips over one in-game day
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from . import config
+
+# Modules the validator must not import before it reads any input
+STARTUP_FORBIDDEN = (
+    "requests",
+    "bs4",
+    "urllib3",
+    "rich",
+    "tree_sitter",
+    "sqlite3",
+    "ctypes",
+    "numpy",
+    "multiprocessing",
+    "concurrent.futures.process",
+)
+STARTUP_BUDGET_MS = 50.0
+
+# Retained bytes per ValidationResult (about 2.6 KiB before they were slotted)
+MEMORY_BUDGET_BYTES = 2048.0
+
+# Validations per timed worst-case sample (single runs are sub-millisecond)
+WORST_CASE_LOOPS = 50
+
+
+# =============================================================================
+# Startup
+# =============================================================================
+
+
+def measure_import(module: str = "tools.ic10_validator") -> tuple[float, list[str]]:
+    """Import a module in a fresh interpreter under -X importtime.
+
+    Returns (cumulative import time of the module in ms, modules imported).
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (str(config.PROJECT_ROOT), env.get("PYTHONPATH")) if p
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    cumulative_us = 0
+    imported = []
+    for row in proc.stderr.splitlines():
+        if not row.startswith("import time:") or "|" not in row:
+            continue
+        _, cumulative, name = row.split("|", 2)
+        name = name.strip()
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        imported.append(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, imported
+
+
+def bench_startup(runs: int = 5, budget_ms: float = STARTUP_BUDGET_MS) -> dict:
+    """Best-of-N import time plus any forbidden eager imports."""
+    timings = []
+    imported: list[str] = []
+    for _ in range(runs):
+        ms, imported = measure_import()
+        timings.append(ms)
+
+    forbidden = sorted(
+        name
+        for name in set(imported)
+        if any(name == f or name.startswith(f + ".") for f in STARTUP_FORBIDDEN)
+    )
+    best = min(timings)
+    return {
+        "import_ms": round(best, 2),
+        "budget_ms": budget_ms,
+        "forbidden_imports": forbidden,
+        "passed": best <= budget_ms and not forbidden,
+    }
+
+
+# =============================================================================
+# Memory
+# =============================================================================
+
+
+def bench_memory(
+    count: int = 10_000,
+    budget_bytes: float = MEMORY_BUDGET_BYTES,
+    corpus: Path = config.EXAMPLES_DIR,
+) -> dict:
+    """Retained bytes of `count` results validated from the corpus.
+
+    Results are kept alive (as bulk candidate validation does) and measured
+    with tracemalloc; messages are not read, so lazily formatted text stays
+    unformatted just as it would until something prints it. Passes if the
+    bytes per result stay within `budget_bytes`.
+    """
+    from .ic10_validator import IC10Validator
+
+    validator = IC10Validator()
+    codes = [p.read_text(encoding="utf-8") for p in sorted(corpus.rglob("*.ic10"))]
+    for code in codes:
+        validator.validate(code)  # warm caches before measuring
+
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    results = [validator.validate(codes[i % len(codes)]) for i in range(count)]
+    gc.collect()  # count only what the results keep alive
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    retained = sum(
+        stat.size_diff for stat in snapshot.compare_to(baseline, "filename")
+    )
+    issues = sum(len(r.errors) + len(r.warnings) + len(r.info) for r in results)
+    per_result = retained / count
+    return {
+        "results": count,
+        "issues": issues,
+        "retained_bytes": retained,
+        "bytes_per_result": round(per_result, 1),
+        "kib_per_10k_results": round(per_result * 10_000 / 1024, 1),
+        "budget_bytes": budget_bytes,
+        "passed": per_result <= budget_bytes,
+    }
+
+
+# =============================================================================
+# Validation Throughput
+# =============================================================================
+
+
+def synthetic_programs() -> dict[str, str]:
+    """Generated worst cases at (or just past) the IC10 limits."""
+    limit = config.MAX_LINES
+    width = config.MAX_LINE_LENGTH
+
+    # Every line used, all registers and devices touched
+    max_lines = "\n".join(
+        f"add r{i % 16} r{(i + 1) % 16} d{i % 6}" if i % 8 else "yield"
+        for i in range(limit)
+    )
+
+    # Every line at the length limit (and well over the byte limit)
+    max_width = "\n".join(
+        f"move r{i % 16} {i} # ".ljust(width, "x") for i in range(limit)
+    )
+
+    # Exactly MAX_CODE_SIZE bytes: pad each line's comment to a fixed width
+    per_line = config.MAX_CODE_SIZE // limit
+    max_size = "\n".join(
+        f"sub r{i % 16} r{i % 16} 1 #".ljust(per_line - 1, "y") for i in range(limit)
+    )
+
+    # A label on every line and a branch to a distant label on each
+    dense_labels = "\n".join(
+        f"l{i}: bgt r{i % 16} r{(i + 3) % 16} l{(i * 37 + 11) % limit}"
+        for i in range(limit)
+    )
+
+    # Nested yield-free loops: one large SCC plus many back edges
+    dense_branches = "\n".join(
+        f"b{i}: brlt r{i % 16} {i} {-min(i, 7) or 1}"
+        if i % 4
+        else f"b{i}: j b{(i * 5 + 3) % limit}"
+        for i in range(limit)
+    )
+
+    return {
+        "max_lines": max_lines,
+        "max_line_length": max_width,
+        "max_code_size": max_size,
+        "dense_labels": dense_labels,
+        "dense_branches": dense_branches,
+    }
+
+
+def bench_validate(repeat: int = 5, corpus: Path = config.EXAMPLES_DIR) -> dict:
+    """Time IC10Validator.validate over the corpus and synthetic worst cases.
+
+    Pass times are best-of-`repeat`; per-check times are the rule and
+    analysis timings summed over one pass, averaged over all passes. Peak
+    memory is measured in a separate pass under tracemalloc.
+    """
+    from .ic10_validator import IC10Validator
+
+    validator = IC10Validator()
+    codes = [p.read_text(encoding="utf-8") for p in sorted(corpus.rglob("*.ic10"))]
+    synthetic = synthetic_programs()
+    line_count = sum(code.count("\n") + 1 for code in codes)
+    for code in [*codes, *synthetic.values()]:
+        validator.validate(code)  # warm up
+
+    checks: dict[str, float] = {}
+    corpus_runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for code in codes:
+            result = validator.validate(code)
+            for name, ms in result.analysis_timings.items():
+                checks[name] = checks.get(name, 0.0) + ms
+            for name, ms in result.rule_timings.items():
+                checks[name] = checks.get(name, 0.0) + ms
+        corpus_runs.append(time.perf_counter() - start)
+    best = min(corpus_runs)
+
+    worst_cases = {}
+    for name, code in synthetic.items():
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(WORST_CASE_LOOPS):
+                validator.validate(code)
+            runs.append((time.perf_counter() - start) / WORST_CASE_LOOPS)
+        worst_cases[name] = round(min(runs) * 1000, 3)
+
+    tracemalloc.start()
+    for code in [*codes, *synthetic.values()]:
+        validator.validate(code)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "scripts": len(codes),
+        "lines": line_count,
+        "corpus_ms": round(best * 1000, 3),
+        "scripts_per_s": round(len(codes) / best, 1),
+        "lines_per_s": round(line_count / best, 1),
+        "checks_ms": {name: round(ms / repeat, 3) for name, ms in checks.items()},
+        "worst_case_ms": worst_cases,
+        "peak_memory_kib": round(peak / 1024, 1),
+    }
+
+
+def compare_baseline(
+    current: dict, baseline: dict, threshold: float = config.VALIDATOR_BENCH_THRESHOLD
+) -> list[str]:
+    """Describe every metric that regressed by more than `threshold`."""
+    regressions = []
+
+    def check(name: str, now: float, then: float, higher_is_better: bool) -> None:
+        if not then:
+            return
+        change = (then - now) / then if higher_is_better else (now - then) / then
+        if change > threshold:
+            regressions.append(f"{name}: {then} -> {now} ({change:+.0%} worse)")
+
+    check("scripts_per_s", current["scripts_per_s"], baseline["scripts_per_s"], True)
+    check("lines_per_s", current["lines_per_s"], baseline["lines_per_s"], True)
+    check(
+        "peak_memory_kib", current["peak_memory_kib"], baseline["peak_memory_kib"], False
+    )
+    for name, ms in current["worst_case_ms"].items():
+        if name in baseline.get("worst_case_ms", {}):
+            check(f"worst_case_ms.{name}", ms, baseline["worst_case_ms"][name], False)
+    return regressions
+
+
+# =============================================================================
+# Emulator Throughput
+# =============================================================================
+
+# Arithmetic loop that never yields: measures raw dispatch speed
+EMULATOR_KERNEL = """\
+move r0 0
+loop:
+add r0 r0 1
+mul r1 r0 2
+sub r2 r1 r0
+slt r3 r2 100
+blt r0 200000 loop
+"""
+EMULATOR_TARGET_IPS = 1_000_000
+
+# Same kernel with a per-chip loop bound read from d0, so chips diverge
+LOCKSTEP_KERNEL = """\
+l r5 d0 Setting
+move r0 0
+loop:
+add r0 r0 1
+mul r1 r0 2
+sub r2 r1 r0
+slt r3 r2 100
+blt r0 r5 loop
+yield
+"""
+
+
+def bench_emulator(
+    ticks: int = 100,
+    corpus: Path = config.EXAMPLES_DIR,
+    target: int = EMULATOR_TARGET_IPS,
+    chips: int = 10_000,
+) -> dict:
+    """Instructions/s on a dispatch kernel and over the example corpus.
+
+    Corpus scripts run with an empty device on every pin for up to `ticks`
+    yields each; scripts that do not compile are skipped and counted. The
+    `jit_*` figures repeat both runs with `JitChip` (compiled blocks). With
+    NumPy installed, the lockstep figure is chip-instructions/s for `chips`
+    copies of a kernel whose loop bounds differ per chip.
+    """
+    from .ic10_emulator import Chip, compile_program
+    from .ic10_jit import JitChip
+
+    kernel_ips, scripts, skipped, steps, corpus_ips = _run_corpus(Chip, ticks, corpus)
+    jit_kernel_ips, _, _, _, jit_corpus_ips = _run_corpus(JitChip, ticks, corpus)
+    result = {
+        "kernel_ips": round(kernel_ips),
+        "corpus_scripts": scripts,
+        "corpus_skipped": skipped,
+        "corpus_steps": steps,
+        "corpus_ips": round(corpus_ips),
+        "jit_kernel_ips": round(jit_kernel_ips),
+        "jit_corpus_ips": round(jit_corpus_ips),
+        "lockstep_chips": chips,
+        "lockstep_ips": None,
+        "target_ips": target,
+        "passed": kernel_ips >= target,
+    }
+
+    try:
+        import numpy as np
+
+        from .ic10_lockstep import LockstepChips
+    except ImportError:
+        return result  # NumPy is optional (pip install .[sim])
+
+    sim = LockstepChips(compile_program(LOCKSTEP_KERNEL), chips)
+    bounds = np.random.default_rng(0).integers(500, 1000, chips).astype(np.float64)
+    sim.attach(0, {"Setting": bounds})
+    start = time.perf_counter()
+    sim.run(10_000)
+    result["lockstep_ips"] = round(int(sim.steps.sum()) / (time.perf_counter() - start))
+    return result
+
+
+def _run_corpus(engine: type, ticks: int, corpus: Path) -> tuple[float, int, int, int, float]:
+    """(kernel ips, scripts, skipped, corpus steps, corpus ips) for one chip class."""
+    from .ic10_emulator import PIN_COUNT, SLEEP, YIELD, CompileError, Device, compile_program
+
+    chip = engine(compile_program(EMULATOR_KERNEL))
+    start = time.perf_counter()
+    chip.run(10_000_000)
+    kernel_ips = chip.steps / (time.perf_counter() - start)
+
+    loaded = []
+    skipped = 0
+    for path in sorted(corpus.rglob("*.ic10")):
+        try:
+            chip = engine(compile_program(path.read_text(encoding="utf-8")))
+        except CompileError:
+            skipped += 1
+            continue
+        for pin in range(PIN_COUNT):
+            chip.pins[pin] = Device()
+        loaded.append(chip)
+
+    start = time.perf_counter()
+    for chip in loaded:
+        for _ in range(ticks):
+            if chip.run(10_000) not in (YIELD, SLEEP):
+                break
+    elapsed = time.perf_counter() - start
+    steps = sum(chip.steps for chip in loaded)
+    return kernel_ips, len(loaded), skipped, steps, steps / elapsed
+
+
+# =============================================================================
+# Scheduler
+# =============================================================================
+
+# Thermostat that reads, writes and sleeps for 10 s (20 ticks) per pass
+SCHEDULER_KERNEL = """\
+alias sensor d0
+alias heater d1
+loop:
+l r0 sensor Temperature
+slt r1 r0 293.15
+s heater On r1
+sleep 10
+j loop
+"""
+SCHEDULER_BUDGET_S = 10.0
+
+
+def bench_scheduler(
+    chips: int = 10_000,
+    ticks: int = config.DAY_TICKS,
+    budget_s: float = SCHEDULER_BUDGET_S,
+) -> dict:
+    """Wall time for `chips` sleeping controllers over `ticks` game ticks.
+
+    Chip start ticks are staggered across the sleep period, so wake-ups are
+    spread over the day rather than all landing on the same ticks.
+    """
+    from .ic10_emulator import PIN_COUNT, Chip, Device, compile_program
+    from .ic10_scheduler import Scheduler
+
+    bytecode = compile_program(SCHEDULER_KERNEL)
+    scheduler = Scheduler()
+    for i in range(chips):
+        chip = Chip(bytecode)
+        for pin in range(PIN_COUNT):
+            chip.pins[pin] = Device(logic={"Temperature": 280.0 + i % 30})
+        scheduler.add(chip, delay=i % 20)
+
+    start = time.perf_counter()
+    stats = scheduler.run(ticks)
+    elapsed = time.perf_counter() - start
+    return {
+        "chips": chips,
+        "ticks": stats.ticks,
+        "idle_ticks": stats.idle_ticks,
+        "wakeups": stats.runs,
+        "instructions": stats.instructions,
+        "elapsed_s": round(elapsed, 3),
+        "budget_s": budget_s,
+        "passed": elapsed <= budget_s,
+    }
+
+
+# =============================================================================
+# CLI Interface
+# =============================================================================
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the IC10 tooling")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    startup = commands.add_parser("startup", help="Validator import-time budget")
+    startup.add_argument("--runs", type=int, default=5, help="Best of N runs")
+    startup.add_argument(
+        "--budget-ms",
+        type=float,
+        default=STARTUP_BUDGET_MS,
+        help=f"Fail above this import time (default: {STARTUP_BUDGET_MS})",
+    )
+    startup.add_argument("--output", type=Path, help="Also write JSON results here")
+
+    memory = commands.add_parser("memory", help="Retained memory per 10k results")
+    memory.add_argument("--count", type=int, default=10_000, help="Results to keep")
+    memory.add_argument(
+        "--budget-bytes",
+        type=float,
+        default=MEMORY_BUDGET_BYTES,
+        help=f"Fail above this many bytes per result (default: {MEMORY_BUDGET_BYTES})",
+    )
+    memory.add_argument("--output", type=Path, help="Also write JSON results here")
+
+    validate = commands.add_parser(
+        "validate", help="Validator throughput against a saved baseline"
+    )
+    validate.add_argument("--repeat", type=int, default=5, help="Best of N passes")
+    validate.add_argument(
+        "--baseline",
+        type=Path,
+        default=config.VALIDATOR_BENCH_BASELINE,
+        help="Baseline JSON to compare against (default: %(default)s)",
+    )
+    validate.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Write this run as the new baseline instead of comparing",
+    )
+    validate.add_argument(
+        "--threshold",
+        type=float,
+        default=config.VALIDATOR_BENCH_THRESHOLD,
+        help="Allowed regression as a fraction (default: %(default)s)",
+    )
+    validate.add_argument("--output", type=Path, help="Also write JSON results here")
+
+    emulator = commands.add_parser("emulator", help="Emulator instructions/s")
+    emulator.add_argument("--ticks", type=int, default=100, help="Ticks per script")
+    emulator.add_argument(
+        "--target",
+        type=int,
+        default=EMULATOR_TARGET_IPS,
+        help="Fail below this kernel instructions/s (default: %(default)s)",
+    )
+    emulator.add_argument(
+        "--chips", type=int, default=10_000, help="Lockstep batch size (needs NumPy)"
+    )
+    emulator.add_argument("--output", type=Path, help="Also write JSON results here")
+
+    scheduler = commands.add_parser(
+        "scheduler", help="Tick scheduler wall time for a simulated day"
+    )
+    scheduler.add_argument("--chips", type=int, default=10_000, help="Chips to run")
+    scheduler.add_argument(
+        "--ticks",
+        type=int,
+        default=config.DAY_TICKS,
+        help="Game ticks to simulate (default: %(default)s, one day)",
+    )
+    scheduler.add_argument(
+        "--budget-s",
+        type=float,
+        default=SCHEDULER_BUDGET_S,
+        help="Fail above this wall time in seconds (default: %(default)s)",
+    )
+    scheduler.add_argument("--output", type=Path, help="Also write JSON results here")
+
+    args = parser.parse_args()
+
+    if args.command == "startup":
+        result = bench_startup(args.runs, args.budget_ms)
+    elif args.command == "memory":
+        result = bench_memory(args.count, args.budget_bytes)
+    elif args.command == "validate":
+        result = bench_validate(args.repeat)
+        if args.save_baseline:
+            args.baseline.parent.mkdir(parents=True, exist_ok=True)
+            args.baseline.write_text(json.dumps(result, indent=2) + "\n")
+            result["regressions"] = []
+        elif args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text())
+            result["regressions"] = compare_baseline(result, baseline, args.threshold)
+        else:
+            result["regressions"] = []  # nothing to compare against yet
+        result["passed"] = not result["regressions"]
+    elif args.command == "emulator":
+        result = bench_emulator(args.ticks, target=args.target, chips=args.chips)
+    elif args.command == "scheduler":
+        result = bench_scheduler(args.chips, args.ticks, args.budget_s)
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2) + "\n")
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Persistent, size-bounded LRU cache for IC10 validation results."""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+from . import config
+
+
+class ResultCache:
+    """On-disk LRU cache mapping content keys to JSON-serializable results.
+
+    Entries live in a single SQLite file so several worker processes can
+    share it. When the stored payloads exceed max_bytes, the least recently
+    used entries are evicted down to 90% of the budget.
+    """
+
+    def __init__(
+        self,
+        path: Path = config.VALIDATOR_CACHE_PATH,
+        max_bytes: int = config.VALIDATOR_CACHE_MAX_BYTES,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("BEGIN IMMEDIATE")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)"
+        )
+        # Running payload total, kept by triggers so puts never scan the table
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS totals ("
+            " id INTEGER PRIMARY KEY CHECK (id = 0),"
+            " size INTEGER NOT NULL)"
+        )
+        self._db.execute(
+            "INSERT OR IGNORE INTO totals (id, size)"
+            " SELECT 0, COALESCE(SUM(size), 0) FROM entries"
+        )
+        self._db.execute(
+            "CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries"
+            " BEGIN UPDATE totals SET size = size + new.size WHERE id = 0; END"
+        )
+        self._db.execute(
+            "CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries"
+            " BEGIN UPDATE totals SET size = size - old.size WHERE id = 0; END"
+        )
+        self._db.execute(
+            "CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries"
+            " BEGIN UPDATE totals SET size = size + new.size - old.size WHERE id = 0; END"
+        )
+        self._db.execute("COMMIT")
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached value for key, refreshing its LRU position."""
+        row = self._db.execute(
+            "SELECT value FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._db.execute(
+            "UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key)
+        )
+        return json.loads(row[0])
+
+    def put(self, key: str, value: dict) -> None:
+        """Store a value and evict old entries if over budget."""
+        payload = json.dumps(value, separators=(",", ":"))
+        self._db.execute(
+            "INSERT INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET"
+            " value = excluded.value, size = excluded.size, last_used = excluded.last_used",
+            (key, payload, len(payload), time.time()),
+        )
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under 90% of max_bytes."""
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+
+        excess = total - int(self.max_bytes * 0.9)
+        victims = []
+        for key, size in self._db.execute(
+            "SELECT key, size FROM entries ORDER BY last_used"
+        ):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._db.execute("DELETE FROM entries")
+
+    def size(self) -> int:
+        """Total payload bytes currently stored."""
+        return self._db.execute("SELECT size FROM totals WHERE id = 0").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self._db.close()
@@ -0,0 +1,717 @@
+"""Basic-block control-flow graph for IC10 programs.
+
+IC10 addresses are 0-indexed source lines: `j 5` jumps to the sixth line
+whether or not it holds an instruction, and labels resolve to the line they
+are written on. Blocks therefore cover every source line, with leaders at
+line 0, at every jump target and after every branch.
+
+Calls (`jal`, `b*al`) get an edge to the callee and a summary edge to the
+return site; returns (`j ra`) end a path. This keeps call sites from being
+linked to each other through the shared return, which would otherwise
+create cycles that cannot execute.
+"""
+
+import math
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Optional
+
+from . import config
+from .ic10_parser import (
+    IDENTIFIER,
+    INDIRECT_DEVICE,
+    INDIRECT_REGISTER,
+    NUMBER,
+    REGISTER,
+    Line,
+    Operand,
+    Program,
+    classify_operand,
+    parse_number,
+)
+
+BRANCH_OPCODES = frozenset(config.BRANCH_INSTRUCTIONS)
+CALL_OPCODES = frozenset(
+    op for op in BRANCH_OPCODES if op == "jal" or (op[0] == "b" and op.endswith("al"))
+)
+RELATIVE_OPCODES = frozenset(op for op in BRANCH_OPCODES if op == "jr" or op.startswith("br"))
+YIELD_OPCODES = frozenset(config.YIELD_INSTRUCTIONS)
+
+# Target of `j ra` and friends
+RETURN = -1
+
+# (instructions, last 0-indexed line) of a run of straight-line execution
+_Run = tuple[float, int]
+
+
+# =============================================================================
+# Data Classes
+# =============================================================================
+
+
+@dataclass(slots=True)
+class BasicBlock:
+    """A straight-line run of source lines with a single entry."""
+
+    index: int
+    start: int  # 0-indexed first line
+    end: int  # 0-indexed last line (inclusive)
+    successors: list[int] = field(default_factory=list)
+    predecessors: list[int] = field(default_factory=list)
+    has_yield: bool = False  # contains yield/sleep
+    returns: bool = False  # ends in `j ra` / `jr ra`
+    calls: Optional[int] = None  # block index of the callee, for jal/b*al
+    call_yields: bool = False  # the callee always yields before returning
+
+    @property
+    def pauses(self) -> bool:
+        """True if every path through this block yields or sleeps."""
+        return self.has_yield or self.call_yields
+
+
+@dataclass(slots=True)
+class TickPath:
+    """The longest run from a resume point to the next pause."""
+
+    start: int  # 0-indexed line execution resumes at (0, or after a yield/sleep)
+    end: int  # 0-indexed last line of the longest run
+    instructions: int  # lines executed, the closing yield/sleep included
+
+
+@dataclass
+class CFG:
+    """Control-flow graph over basic blocks."""
+
+    program: Program
+    blocks: list[BasicBlock]
+    block_of_line: list[int]  # 0-indexed line -> block index
+    unresolved: list[int] = field(default_factory=list)  # lines with unknown targets
+
+    def block_at(self, line_number: int) -> BasicBlock:
+        """The block containing a 1-indexed source line."""
+        return self.blocks[self.block_of_line[line_number - 1]]
+
+    def reachable(self, entry: int = 0) -> set[int]:
+        """Block indices reachable from the entry block."""
+        if not self.blocks:
+            return set()
+        seen = {entry}
+        stack = [entry]
+        while stack:
+            for succ in self.blocks[stack.pop()].successors:
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append(succ)
+        return seen
+
+    def computed_jumps(self) -> list[int]:
+        """0-indexed lines jumping to an address only known at runtime (`j r0`)."""
+        lines = self.program.lines
+        return [
+            number - 1
+            for number in self.unresolved
+            if jump_target(self.program, lines[number - 1], lines[number - 1].operands[-1]) is None
+        ]
+
+    def sccs(
+        self,
+        exclude: Optional[set[int]] = None,
+        cut: Optional[set[tuple[int, int]]] = None,
+    ) -> list[list[int]]:
+        """Strongly connected components (Tarjan, iterative, linear time).
+
+        Blocks in `exclude` and (from, to) edges in `cut` are removed from
+        the graph first. Components are returned in reverse topological order.
+        """
+        exclude = exclude or set()
+        cut = cut or set()
+        index_of: dict[int, int] = {}
+        lowlink: dict[int, int] = {}
+        on_stack: set[int] = set()
+        stack: list[int] = []
+        components: list[list[int]] = []
+        counter = 0
+
+        for root in range(len(self.blocks)):
+            if root in index_of or root in exclude:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, child = work.pop()
+                if child == 0:
+                    index_of[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                successors = self.blocks[node].successors
+                recursed = False
+                while child < len(successors):
+                    succ = successors[child]
+                    child += 1
+                    if succ in exclude or (node, succ) in cut:
+                        continue
+                    if succ not in index_of:
+                        work.append((node, child))
+                        work.append((succ, 0))
+                        recursed = True
+                        break
+                    if succ in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[succ])
+                if recursed:
+                    continue
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+        return components
+
+    def is_cycle(self, component: list[int], cut: Optional[set[tuple[int, int]]] = None) -> bool:
+        """True if a component contains at least one cycle."""
+        if len(component) > 1:
+            return True
+        block = component[0]
+        return block in self.blocks[block].successors and (block, block) not in (cut or ())
+
+    def _yielding_calls(self) -> set[tuple[int, int]]:
+        """Summary edges of `jal`s whose callee always yields before returning.
+
+        Such a call pauses on the way to its return site; the jump into the
+        callee is still followed, so a callee that loops without yielding
+        (and never returns) is caught. Conditional calls also fall through
+        untaken, so their edge is kept.
+        """
+        lines = self.program.lines
+        return {
+            (block.index, block.index + 1)
+            for block in self.blocks
+            if block.call_yields
+            and lines[block.end].opcode == "jal"
+            and block.index + 1 != block.calls
+        }
+
+    def yield_free_cycles(self) -> list[list[int]]:
+        """Components of cycles that can run without passing yield/sleep."""
+        pausing = {block.index for block in self.blocks if block.has_yield}
+        cut = self._yielding_calls()
+        return [
+            sorted(component)
+            for component in self.sccs(exclude=pausing, cut=cut)
+            if self.is_cycle(component, cut)
+        ]
+
+    def tick_paths(self) -> list[TickPath]:
+        """The longest run from each resume point to the next pause.
+
+        Resume points are line 0 and every line after a reachable yield or
+        sleep. Every line costs one instruction, blank and comment lines
+        included. A call costs its callee's longest run to `j ra` plus the
+        run from the return site; a run that resumes inside a function and
+        returns continues at the return sites of the calls to it. Runs end
+        at a pause, `hcf`, the last line, or a jump whose target is only
+        known at runtime (so those paths may be longer). Runs that can enter
+        a yield-free cycle are unbounded (W002) and are left out.
+
+        Blocks are visited once, successors first, so this is linear in the
+        program size.
+        """
+        lines = self.program.lines
+        count = len(lines)
+        blocks = self.blocks
+        if not blocks:
+            return []
+
+        # First pause at or after each line
+        next_pause = [count] * (count + 1)
+        for i in range(count - 1, -1, -1):
+            next_pause[i] = i if lines[i].opcode in YIELD_OPCODES else next_pause[i + 1]
+
+        # (instructions, last line) of the longest run from each block's first
+        # line to a pause or the end of execution, and to a return (or None)
+        to_pause: list[Optional[_Run]] = [None] * len(blocks)
+        to_return: list[Optional[_Run]] = [None] * len(blocks)
+
+        def longest(line: int) -> tuple[_Run, Optional[_Run]]:
+            block = blocks[self.block_of_line[line]]
+            if next_pause[line] <= block.end:
+                return (next_pause[line] - line + 1, next_pause[line]), None
+            pauses: list[_Run] = []
+            returns: list[_Run] = []
+            if block.calls is not None:
+                site = block.index + 1 if block.index + 1 < len(blocks) else None
+                called = None if block.call_yields else to_return[block.calls]
+                pauses.append(to_pause[block.calls])
+                if called is not None and site is None:  # returns past the last line
+                    pauses.append(called)
+                elif called is not None:
+                    pauses.append(_join(called, to_pause[site]))
+                    if to_return[site] is not None:
+                        returns.append(_join(called, to_return[site]))
+                if site is not None and lines[block.end].opcode != "jal":  # not taken
+                    pauses.append(to_pause[site])
+                    if to_return[site] is not None:
+                        returns.append(to_return[site])
+            else:
+                for succ in block.successors:
+                    pauses.append(to_pause[succ])
+                    if to_return[succ] is not None:
+                        returns.append(to_return[succ])
+            if block.returns:
+                returns.append((0, block.end))
+            here: _Run = (block.end - line + 1, block.end)
+            return (
+                _join(here, max(pauses)) if pauses else here,
+                _join(here, max(returns)) if returns else None,
+            )
+
+        pausing = {block.index for block in blocks if block.has_yield}
+        for index in pausing:
+            to_pause[index], to_return[index] = longest(blocks[index].start)
+        cut = self._yielding_calls()
+        for component in self.sccs(exclude=pausing, cut=cut):
+            if self.is_cycle(component, cut):
+                for index in component:
+                    to_pause[index] = to_return[index] = (math.inf, blocks[index].end)
+            else:
+                index = component[0]
+                to_pause[index], to_return[index] = longest(blocks[index].start)
+
+        # Each block belongs to the first function (callee, or the entry
+        # block) that reaches it without following calls
+        owner: list[Optional[int]] = [None] * len(blocks)
+        callers: dict[int, list[BasicBlock]] = {}
+        for block in blocks:
+            if block.calls is not None:
+                callers.setdefault(block.calls, []).append(block)
+        for entry in [0, *callers]:
+            if owner[entry] is not None:
+                continue
+            owner[entry] = entry
+            stack = [entry]
+            while stack:
+                block = blocks[stack.pop()]
+                for succ in block.successors:
+                    if succ == block.calls and succ != block.index + 1:
+                        continue
+                    if owner[succ] is None:
+                        owner[succ] = entry
+                        stack.append(succ)
+
+        # Longest run after returning from each function (recursion ends it)
+        after: dict[int, Optional[_Run]] = {}
+
+        def after_return(entry: Optional[int]) -> Optional[_Run]:
+            if entry is None or entry in after:
+                return after.get(entry)
+            after[entry] = None
+            runs = []
+            for call in callers.get(entry, ()):
+                site = call.index + 1
+                if site == len(blocks):
+                    continue
+                runs.append(to_pause[site])
+                rest = after_return(owner[call.index])
+                if to_return[site] is not None and rest is not None:
+                    runs.append(_join(to_return[site], rest))
+            after[entry] = max(runs) if runs else None
+            return after[entry]
+
+        reachable = self.reachable()
+        resumes = [0] + [
+            i + 1
+            for i, line in enumerate(lines)
+            if line.opcode in YIELD_OPCODES
+            and i + 1 < count
+            and self.block_of_line[i] in reachable
+        ]
+        paths = []
+        for start in dict.fromkeys(resumes):
+            run, returned = longest(start)
+            rest = after_return(owner[self.block_of_line[start]])
+            if returned is not None and rest is not None:
+                run = max(run, _join(returned, rest))
+            if run[0] != math.inf:
+                paths.append(TickPath(start, run[1], int(run[0])))
+        return paths
+
+
+# =============================================================================
+# Construction
+# =============================================================================
+
+
+def _join(first: "_Run", then: "_Run") -> "_Run":
+    """A run followed by another: summed length, the second's last line."""
+    return first[0] + then[0], then[1]
+
+
+def jump_target(program: Program, line: Line, operand: Operand) -> Optional[int]:
+    """Resolve a jump operand to a 0-indexed line, RETURN, or None if unknown."""
+    text = operand.text
+    kind = operand.kind
+    if kind == IDENTIFIER and text in program.aliases:
+        text = program.aliases[text]
+        kind = REGISTER if text in ("ra", "sp") or text[1:].isdigit() else IDENTIFIER
+
+    if kind == REGISTER:
+        return RETURN if text == "ra" else None
+
+    if kind == NUMBER:
+        value = operand.value
+    elif kind == IDENTIFIER and text in program.labels:
+        value = program.labels[text] - 1  # a label is just its line's address
+    elif kind == IDENTIFIER and text in program.defines:
+        value = parse_number(program.defines[text])
+    else:
+        return None
+
+    if value is None:
+        return None
+    offset = int(value)
+    if line.opcode in RELATIVE_OPCODES:
+        return line.number - 1 + offset
+    return offset
+
+
+def build_cfg(program: Program) -> CFG:
+    """Build the basic-block CFG of a program in linear time."""
+    lines = program.lines
+    count = len(lines)
+    if count == 0:
+        return CFG(program, [], [])
+
+    # Resolve every jump once
+    targets: dict[int, Optional[int]] = {}
+    unresolved: list[int] = []
+    leaders = {0}
+    for i, line in enumerate(lines):
+        if line.opcode not in BRANCH_OPCODES or not line.operands:
+            continue
+        target = jump_target(program, line, line.operands[-1])
+        if target is not None and target != RETURN and not 0 <= target < count:
+            target = None  # Out of range: execution stops
+        targets[i] = target
+        if target is None:
+            unresolved.append(i + 1)
+        elif target != RETURN:
+            leaders.add(target)
+        if i + 1 < count:
+            leaders.add(i + 1)
+    for i, line in enumerate(lines):
+        if line.opcode == "hcf" and i + 1 < count:
+            leaders.add(i + 1)
+
+    # Carve blocks
+    starts = sorted(leaders)
+    blocks: list[BasicBlock] = []
+    block_of_line = [0] * count
+    for n, start in enumerate(starts):
+        end = (starts[n + 1] if n + 1 < len(starts) else count) - 1
+        block = BasicBlock(index=n, start=start, end=end)
+        for i in range(start, end + 1):
+            block_of_line[i] = n
+            if lines[i].opcode in YIELD_OPCODES:
+                block.has_yield = True
+        blocks.append(block)
+
+    # Wire edges from each block's last line
+    for block in blocks:
+        last = lines[block.end]
+        opcode = last.opcode
+        falls_through = block.end + 1 < count
+        successors: list[int] = []
+
+        if block.end in targets:
+            target = targets[block.end]
+            if target == RETURN:
+                block.returns = True
+            elif target is not None:
+                successors.append(block_of_line[target])
+                if opcode in CALL_OPCODES:
+                    block.calls = block_of_line[target]
+            # j/jr go nowhere else; jal resumes at the return site
+            if opcode in config.UNCONDITIONAL_JUMPS and opcode not in CALL_OPCODES:
+                falls_through = False
+        elif opcode == "hcf":
+            falls_through = False
+
+        if falls_through:
+            successors.append(block.index + 1)
+
+        for succ in dict.fromkeys(successors):
+            block.successors.append(succ)
+            blocks[succ].predecessors.append(block.index)
+
+    cfg = CFG(program, blocks, block_of_line, unresolved)
+    _summarize_calls(cfg)
+    return cfg
+
+
+def _summarize_calls(cfg: CFG) -> None:
+    """Mark call blocks whose callee cannot return without yielding."""
+    verdicts: dict[int, bool] = {}
+    for block in cfg.blocks:
+        if block.calls is None:
+            continue
+        callee = block.calls
+        if callee not in verdicts:
+            # Can the callee reach a return while avoiding yield/sleep?
+            seen = {callee}
+            stack = [callee]
+            returns_freely = False
+            while stack and not returns_freely:
+                current = cfg.blocks[stack.pop()]
+                if current.has_yield:
+                    continue
+                if current.returns:
+                    returns_freely = True
+                    break
+                for succ in current.successors:
+                    if succ not in seen:
+                        seen.add(succ)
+                        stack.append(succ)
+            verdicts[callee] = not returns_freely
+        block.call_yields = verdicts[callee]
+
+
+# =============================================================================
+# Liveness
+# =============================================================================
+
+
+@dataclass(slots=True)
+class RegisterReference:
+    """One operand naming a register's storage."""
+
+    line: int  # 0-indexed
+    operand: Operand
+    register: int
+    alias: Optional[str]  # alias name it went through, or None for a raw register
+    device: bool  # `dr3`: the register picks a device
+
+
+# (opcode, operand count) -> operand letters (see ic10_emulator), None if malformed
+_SIGNATURES: dict[tuple[str, int], Optional[str]] = {}
+
+
+def _signature(opcode: str, count: int) -> Optional[str]:
+    key = (opcode, count)
+    if key not in _SIGNATURES:
+        from .ic10_emulator import HANDLERS  # only needed once liveness is asked for
+
+        entry = HANDLERS.get("move" if opcode == "mv" else opcode)
+        if entry is None:
+            _SIGNATURES[key] = None
+        elif entry[1] == "*":
+            _SIGNATURES[key] = ""
+        else:
+            _SIGNATURES[key] = next((c for c in entry[1].split("|") if len(c) == count), None)
+    return _SIGNATURES[key]
+
+
+def resolve_operand(program: Program, operand: Operand) -> tuple[Operand, Optional[str]]:
+    """Follow aliases to a register or device; also the first alias name used."""
+    alias = None
+    seen = set()
+    while operand.kind == IDENTIFIER and operand.text in program.aliases:
+        if operand.text in seen:
+            break
+        seen.add(operand.text)
+        alias = alias or operand.text
+        operand = classify_operand(program.aliases[operand.text], operand.column)
+    return operand, alias
+
+
+_REGISTER_KINDS = (REGISTER, INDIRECT_REGISTER, INDIRECT_DEVICE)
+
+
+def _bits(mask: int) -> list[int]:
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length() - 1)
+        mask ^= low
+    return out
+
+
+class Liveness:
+    """Register uses, definitions and liveness per line, as bitmasks.
+
+    Bit n stands for rn (virtual registers past r15 included; ra and sp are
+    not tracked). A return flows to the line after every call. Where the
+    program is opaque, liveness errs towards live: an indirect register
+    (`rr0`) reads every register, and after a computed jump (`j r0`)
+    everything is live.
+    """
+
+    def __init__(self, cfg: CFG):
+        program = cfg.program
+        self.cfg = cfg
+        self.program = program
+        lines = program.lines
+        count = len(lines)
+        self._found: list[tuple] = []  # RegisterReference fields, built on demand
+        self.uses = [0] * count
+        self.defs = [0] * count
+        self.moves: dict[int, int] = {}  # line of `move a b` -> register of b
+        self.aliased: set[int] = set()  # registers named by an alias line
+        self.indirect: list[int] = []  # 0-indexed lines with `rr` operands
+
+        uses = self.uses
+        defs = self.defs
+        aliases: dict[str, tuple[Operand, Optional[str]]] = {}  # resolved once each
+        highest = 0
+        for i, line in enumerate(lines):
+            opcode = line.opcode
+            if opcode is None or opcode == "define" or opcode == "label":
+                continue
+            if opcode == "alias":
+                if len(line.operands) == 2:
+                    target, _ = resolve_operand(program, line.operands[1])
+                    if target.kind in (REGISTER, INDIRECT_DEVICE) and target.index is not None:
+                        self.aliased.add(target.index)
+                continue
+            signature = _SIGNATURES.get((opcode, len(line.operands)), False)
+            if signature is False:
+                signature = _signature(opcode, len(line.operands))
+            used = defined = 0
+            for position, operand in enumerate(line.operands):
+                kind = operand.kind
+                if kind == IDENTIFIER:
+                    if operand.text not in program.aliases:
+                        continue
+                    if operand.text not in aliases:
+                        aliases[operand.text] = resolve_operand(program, operand)
+                    resolved, alias = aliases[operand.text]
+                    kind = resolved.kind
+                elif kind in _REGISTER_KINDS:
+                    resolved, alias = operand, None
+                else:
+                    continue
+                if kind == INDIRECT_REGISTER:
+                    self.indirect.append(i)
+                    continue
+                register = resolved.index
+                if register is None or kind != REGISTER and kind != INDIRECT_DEVICE:
+                    continue
+                self._found.append((i, operand, register, alias, kind == INDIRECT_DEVICE))
+                if register > highest:
+                    highest = register
+                if signature is None:  # malformed: assume the worst
+                    used |= 1 << register
+                    defined |= 1 << register
+                elif signature[position] == "r":
+                    defined |= 1 << register
+                else:
+                    used |= 1 << register
+            uses[i] = used
+            defs[i] = defined
+            if (opcode == "move" or opcode == "mv") and len(line.operands) == 2:
+                source = line.operands[1]
+                if source.kind == IDENTIFIER and source.text in aliases:
+                    source = aliases[source.text][0]
+                if source.kind == REGISTER and source.index is not None:
+                    self.moves[i] = source.index
+
+        self.everything = (1 << max(highest + 1, 16)) - 1
+        for i in self.indirect:
+            self.uses[i] = self.everything
+        self.live_out = self._solve()
+
+    def _solve(self) -> list[int]:
+        """Backward dataflow over the blocks, then line by line within them."""
+        count = len(self.program.lines)
+        blocks = self.cfg.blocks
+        opaque = set(self.cfg.computed_jumps())
+        return_sites = [
+            block.index + 1 for block in blocks if block.calls is not None and block.end + 1 < count
+        ]
+        successors = [
+            block.successors + (return_sites if block.returns else []) for block in blocks
+        ]
+
+        uses = self.uses
+        defs = self.defs
+        gen = []
+        kill = []
+        for block in blocks:
+            used = defined = 0
+            for i in range(block.end, block.start - 1, -1):
+                used = (used & ~defs[i]) | uses[i]
+                defined |= defs[i]
+            gen.append(used)
+            kill.append(defined)
+
+        everything = self.everything
+        exits = [block.end in opaque for block in blocks]
+        block_in = [0] * len(blocks)
+        block_out = [0] * len(blocks)
+        order = range(len(blocks) - 1, -1, -1)
+        changed = True
+        while changed:
+            changed = False
+            for b in order:
+                if exits[b]:
+                    out = everything
+                else:
+                    out = 0
+                    for succ in successors[b]:
+                        out |= block_in[succ]
+                block_out[b] = out
+                new = gen[b] | (out & ~kill[b])
+                if new != block_in[b]:
+                    block_in[b] = new
+                    changed = True
+
+        live_out = [0] * count
+        for block in blocks:
+            live = block_out[block.index]
+            for i in range(block.end, block.start - 1, -1):
+                live_out[i] = live
+                live = (live & ~defs[i]) | uses[i]
+        return live_out
+
+    @cached_property
+    def live_in(self) -> list[int]:
+        """Registers live before each line."""
+        return [
+            (live & ~defined) | used
+            for live, defined, used in zip(self.live_out, self.defs, self.uses)
+        ]
+
+    @cached_property
+    def references(self) -> list[RegisterReference]:
+        """Every operand naming a register, in line order."""
+        return [RegisterReference(*found) for found in self._found]
+
+    def registers(self) -> set[int]:
+        """Every register referenced or aliased (ra and sp aside)."""
+        return {found[2] for found in self._found} | self.aliased
+
+    def pressure(self) -> int:
+        """Most registers live at once (a definition counts while it is written)."""
+        peak = 0
+        for i in range(len(self.program.lines)):
+            live = max(self.live_in[i].bit_count(), (self.live_out[i] | self.defs[i]).bit_count())
+            peak = max(peak, live)
+        return peak
+
+    def interference(self) -> dict[int, set[int]]:
+        """Registers that are written while another one is live."""
+        graph: dict[int, set[int]] = {register: set() for register in self.registers()}
+        for i, defined in enumerate(self.defs):
+            for register in _bits(defined):
+                live = self.live_out[i] & ~(1 << register)
+                if i in self.moves:
+                    live &= ~(1 << self.moves[i])  # `move a b` may share a register
+                for other in _bits(live):
+                    graph[register].add(other)
+                    graph.setdefault(other, set()).add(register)
+        return graph
@@ -0,0 +1,159 @@
+"""Dead and unreachable code in IC10 scripts.
+
+Finds what a script carries without effect:
+
+    unreachable   lines no path from line 0 reaches, typically the ones
+                  after an unconditional jump (config.UNCONDITIONAL_JUMPS)
+    unused        labels, defines and aliases nothing refers to
+    dead store    a register written by an instruction with no other effect,
+                  then overwritten or never read
+
+The validator reports these as info (I003-I005), and the optimizer's
+dead-code rewrites delete them. That is how to get lines and bytes back on
+scripts close to the 128-line and 4096-byte limits.
+
+    dead = find_dead_code(cfg, Liveness(cfg))
+
+Dead stores are the only part that needs liveness; without it,
+find_dead_code leaves them out.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+from . import config
+from .ic10_cfg import BRANCH_OPCODES, CFG, Liveness, resolve_operand
+from .ic10_parser import IDENTIFIER, Program
+
+# Register writes that do nothing else, so they can go when the value is
+# dead: rand advances the generator, bitwise ops fault on inf/NaN, and
+# device and stack reads fault on missing devices and bad addresses.
+PURE_OPCODES = (
+    frozenset(config.INSTRUCTION_CATEGORIES["math"])
+    | frozenset(config.INSTRUCTION_CATEGORIES["comparison"])
+    | {"move", "mv"}
+) - {"rand"}
+
+_DECLARATIONS = ("alias", "define")
+
+# Instructions that save and restore ra around nested calls
+_STACK_OPCODES = ("push", "pop", "peek")
+
+
+# =============================================================================
+# Data Classes
+# =============================================================================
+
+
+@dataclass(slots=True)
+class Unreachable:
+    """A run of instructions no path from line 0 reaches."""
+
+    start: int  # 0-indexed first instruction
+    end: int  # 0-indexed last instruction (inclusive)
+    after: Optional[int]  # 0-indexed unconditional jump right before it, if any
+
+
+@dataclass(slots=True)
+class UnusedName:
+    """A label, define or alias nothing refers to."""
+
+    line: int  # 0-indexed
+    kind: str  # "label", "define" or "alias"
+    name: str
+
+
+@dataclass
+class DeadCode:
+    """Everything a script carries without effect."""
+
+    unreachable: list[Unreachable] = field(default_factory=list)
+    unused: list[UnusedName] = field(default_factory=list)
+    dead_stores: list[int] = field(default_factory=list)  # 0-indexed lines
+
+
+# =============================================================================
+# Analysis
+# =============================================================================
+
+
+def _sets_ra(program: Program) -> bool:
+    """True if an instruction other than a call or the stack reads or writes ra."""
+    for line in program.lines:
+        if line.opcode is None or line.opcode in _DECLARATIONS + _STACK_OPCODES:
+            continue
+        operands = line.operands[:-1] if line.opcode in BRANCH_OPCODES else line.operands
+        for operand in operands:
+            if resolve_operand(program, operand)[0].text == "ra":
+                return True
+    return False
+
+
+def _unreachable(cfg: CFG) -> list[Unreachable]:
+    if not cfg.blocks or cfg.computed_jumps():
+        return []  # a computed jump may land anywhere
+    if _sets_ra(cfg.program):
+        return []  # `j ra` may then jump anywhere, not just back after a call
+    lines = cfg.program.lines
+    reachable = cfg.reachable()
+    runs: list[Unreachable] = []
+    previous: Optional[int] = None  # last instruction line seen
+    for i, line in enumerate(lines):
+        if line.opcode is None or line.opcode in _DECLARATIONS:
+            continue
+        if cfg.block_of_line[i] in reachable:
+            previous = i
+            continue
+        if runs and runs[-1].end == previous:
+            runs[-1].end = i
+        else:
+            after = None
+            if previous is not None and lines[previous].opcode in config.UNCONDITIONAL_JUMPS:
+                after = previous
+            runs.append(Unreachable(i, i, after))
+        previous = i
+    return runs
+
+
+def _unused(cfg: CFG) -> list[UnusedName]:
+    lines = cfg.program.lines
+    referenced = set()
+    for line in lines:
+        operands = line.operands
+        if line.opcode in _DECLARATIONS:
+            operands = operands[1:]
+        for operand in operands:
+            if operand.kind == IDENTIFIER:
+                referenced.add(operand.text)
+
+    unused = []
+    for i, line in enumerate(lines):
+        if line.label is not None and line.label not in referenced:
+            unused.append(UnusedName(i, "label", line.label))
+        if line.opcode in _DECLARATIONS and line.operands:
+            name = line.operands[0].text
+            if name not in referenced:
+                unused.append(UnusedName(i, line.opcode, name))
+    return unused
+
+
+def find_dead_stores(cfg: CFG, liveness: Liveness, unreachable: list[Unreachable]) -> list[int]:
+    """0-indexed lines of pure instructions whose result is never read."""
+    skip = {i for run in unreachable for i in range(run.start, run.end + 1)}
+    skip.update(liveness.indirect)
+    dead = []
+    for i, line in enumerate(cfg.program.lines):
+        if line.opcode not in PURE_OPCODES or i in skip:
+            continue
+        written = liveness.defs[i]
+        if written and not written & (written - 1) and not written & liveness.live_out[i]:
+            dead.append(i)
+    return dead
+
+
+def find_dead_code(cfg: CFG, liveness: Optional[Liveness] = None) -> DeadCode:
+    """Unreachable runs, unused names and (given liveness) dead stores."""
+    dead = DeadCode(unreachable=_unreachable(cfg), unused=_unused(cfg))
+    if liveness is not None:
+        dead.dead_stores = find_dead_stores(cfg, liveness, dead.unreachable)
+    return dead
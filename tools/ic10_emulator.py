@@ -0,0 +1,1086 @@
+"""Bytecode-compiling IC10 emulator.
+
+Source is compiled once into a compact form: one opcode per source line
+(IC10 addresses are line numbers, so blank and comment lines are NOPs) and
+one operand tuple per line. Aliases, defines and labels are resolved at load
+time, so at run time every value operand is a plain index into the chip's
+memory list: slots 0-15 are r0-r15, 16 is sp, 17 is ra and the rest hold
+the program's constants. Running is a tight loop calling one handler per
+instruction.
+
+    chip = Chip(compile_program(code))
+    chip.pins[0] = Device(logic={"Temperature": 293.15})
+    status = chip.run(10_000)  # "yield", "sleep", "halt", "end", "error", "limit"
+"""
+
+import argparse
+import math
+import operator
+import random
+import sys
+import time
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from . import config
+from .ic10_parser import (
+    DEVICE,
+    HASH,
+    IDENTIFIER,
+    INDIRECT_DEVICE,
+    INDIRECT_REGISTER,
+    NUMBER,
+    REGISTER,
+    Line,
+    Operand,
+    Program,
+    classify_operand,
+    tokenize,
+)
+from .ic10_network import DeviceNetwork
+
+# Register file layout
+REGISTER_COUNT = 18
+SP = 16
+RA = 17
+STACK_SIZE = 512
+PIN_COUNT = 6
+DB = PIN_COUNT  # pins[6] is the chip's own housing
+
+# Opcodes: index into config.ALL_INSTRUCTIONS; NOP covers empty lines
+OPCODES: tuple[str, ...] = ("nop", *dict.fromkeys(config.ALL_INSTRUCTIONS))
+OPCODE_IDS = {name: i for i, name in enumerate(OPCODES)}
+NOP = 0
+
+# Run statuses
+YIELD = "yield"
+SLEEP = "sleep"
+HALT = "halt"  # hcf
+END = "end"  # ran past the last line
+ERROR = "error"
+LIMIT = "limit"  # step budget exhausted
+
+# Handler return codes besides "next line" (None) and a jump address (>= 0)
+_YIELD = -2
+_SLEEP = -3
+_HALT = -4
+
+BATCH_MODES = {"Average": 0, "Sum": 1, "Minimum": 2, "Maximum": 3}
+REAGENT_MODES = {"Contents": 0, "Required": 1, "Recipe": 2, "TotalContents": 3}
+
+# Tolerance floor of the approximate comparisons (8 * float.Epsilon in-game)
+_APPROX_EPSILON = 8 * 1.401298464324817e-45
+
+_INT64 = 1 << 64
+
+
+class CompileError(ValueError):
+    """Source that cannot be compiled (unknown opcode, bad operand, ...)."""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+
+
+class ChipError(RuntimeError):
+    """A runtime fault that stops the chip, as the in-game IC would."""
+
+
+# =============================================================================
+# Devices
+# =============================================================================
+
+
+@dataclass(slots=True)
+class Device:
+    """A logic device: readable/writable logic values, slots and memory."""
+
+    prefab_hash: int = 0
+    name_hash: int = 0
+    logic: dict[str, float] = field(default_factory=dict)
+    slots: list[dict[str, float]] = field(default_factory=list)
+    reagents: dict[tuple[int, int], float] = field(default_factory=dict)
+    stack: list[float] = field(default_factory=list)  # memory for get/put
+
+    @property
+    def reference_id(self) -> int:
+        """The id `ld`/`sd`/`getd`/`putd` address it by (its ReferenceId value)."""
+        return int(self.logic.get("ReferenceId", 0.0))
+
+    def read(self, logic_type: str) -> float:
+        return self.logic.get(logic_type, 0.0)
+
+    def write(self, logic_type: str, value: float) -> None:
+        self.logic[logic_type] = value
+
+    def read_slot(self, index: float, logic_type: str) -> float:
+        slot = int(index)
+        if not 0 <= slot < len(self.slots):
+            return 0.0
+        return self.slots[slot].get(logic_type, 0.0)
+
+    def write_slot(self, index: float, logic_type: str, value: float) -> None:
+        slot = int(index)
+        if 0 <= slot < len(self.slots):
+            self.slots[slot][logic_type] = value
+
+    def copy(self) -> "Device":
+        """An independent copy (plain dicts, even if this one is on a network)."""
+        return Device(
+            self.prefab_hash,
+            self.name_hash,
+            dict(self.logic),
+            [dict(slot) for slot in self.slots],
+            dict(self.reagents),
+            list(self.stack),
+        )
+
+
+def hash_string(text: str) -> int:
+    """HASH("...") - signed CRC-32 of the UTF-8 text."""
+    value = zlib.crc32(text.encode("utf-8"))
+    return value - (1 << 32) if value >= 1 << 31 else value
+
+
+def pack_string(text: str) -> int:
+    """STR("...") - up to six ASCII characters packed big-endian."""
+    value = 0
+    for char in text[:6]:
+        value = (value << 8) | (ord(char) & 0xFF)
+    return value
+
+
+# =============================================================================
+# Bytecode
+# =============================================================================
+
+
+@dataclass
+class Bytecode:
+    """A compiled program: per-line opcodes, operand tuples and constants."""
+
+    ops: array  # array('H') of opcode ids, one per source line
+    args: list[tuple]  # per-line operand tuples (see the handler table)
+    handlers: list[Callable]  # per-line handler, derived from ops
+    constants: list[float]  # appended to the register file as memory slots
+    lines: int
+
+    def memory(self) -> list[float]:
+        """A fresh register file followed by this program's constants."""
+        return [0.0] * REGISTER_COUNT + self.constants
+
+
+# Operand signature letters:
+#   r  destination register (memory slot)
+#   v  value: register or constant (memory slot)
+#   d  device pin (0-5, 6 = db)
+#   t  logic type: a name (str), or a value slot if numeric
+#   m  batch/reagent mode: mode name or value, as a value slot
+#   a  jump address: value slot, plus the line's own index appended
+# Every handler gets (chip, memory, args).
+
+
+class _Compiler:
+    """Resolves operands of one program into slots and constants."""
+
+    def __init__(self, program: Program):
+        self.program = program
+        self.constants: list[float] = []
+        self._constant_slots: dict[float, int] = {}
+
+    def constant(self, value: float) -> int:
+        """Memory slot holding a constant (deduplicated)."""
+        key = value if value == value else "nan"  # NaN never equals itself
+        slot = self._constant_slots.get(key)
+        if slot is None:
+            slot = REGISTER_COUNT + len(self.constants)
+            self.constants.append(value)
+            self._constant_slots[key] = slot
+        return slot
+
+    def _alias(self, operand: Operand) -> Operand:
+        """Follow alias chains to the aliased register or device."""
+        seen = set()
+        while operand.kind == IDENTIFIER and operand.text in self.program.aliases:
+            if operand.text in seen:
+                break
+            seen.add(operand.text)
+            operand = classify_operand(self.program.aliases[operand.text], operand.column)
+        return operand
+
+    def _number(self, operand: Operand) -> Optional[float]:
+        """Constant value of a number, hash, label or define operand."""
+        seen = set()
+        while True:
+            if operand.kind == NUMBER:
+                return operand.value
+            if operand.kind == HASH:
+                text = operand.text
+                inner = text[text.index('"') + 1 : text.rindex('"')]
+                if text.startswith("STR"):
+                    return float(pack_string(inner))
+                return float(hash_string(inner))
+            if operand.kind != IDENTIFIER or operand.text in seen:
+                return None
+            seen.add(operand.text)
+            if operand.text in self.program.labels:
+                return float(self.program.labels[operand.text] - 1)
+            if operand.text in self.program.defines:
+                operand = classify_operand(
+                    self.program.defines[operand.text], operand.column
+                )
+                continue
+            return None
+
+    def register(self, line: Line, operand: Operand) -> Union[int, tuple]:
+        """Register slot, or ("r", depth, base) for an indirect register."""
+        operand = self._alias(operand)
+        if operand.kind == REGISTER:
+            if operand.text == "sp":
+                return SP
+            if operand.text == "ra":
+                return RA
+            if operand.index is not None and operand.index < 16:
+                return operand.index
+        elif operand.kind == INDIRECT_REGISTER and operand.index < 16:
+            return ("r", operand.text.count("r") - 1, operand.index)
+        raise CompileError(line.number, f"Expected a register, got '{operand.text}'")
+
+    def value(self, line: Line, operand: Operand) -> Union[int, tuple]:
+        """Memory slot of a register or constant operand."""
+        number = self._number(operand)
+        if number is not None:
+            return self.constant(number)
+        return self.register(line, operand)
+
+    def device(self, line: Line, operand: Operand) -> Union[int, tuple]:
+        """Pin index, or ("d", depth, base) for an indirect device."""
+        operand = self._alias(operand)
+        if operand.kind == DEVICE:
+            if operand.text == "db":
+                return DB
+            if operand.index is not None and operand.index < PIN_COUNT:
+                return operand.index
+        elif operand.kind == INDIRECT_DEVICE and operand.index < 16:
+            return ("d", operand.text.count("r") - 1, operand.index)
+        raise CompileError(line.number, f"Expected a device, got '{operand.text}'")
+
+    def _is_name(self, operand: Operand) -> bool:
+        return operand.kind == IDENTIFIER and not (
+            operand.text in self.program.defines or operand.text in self.program.aliases
+        )
+
+    def logic_type(self, line: Line, operand: Operand) -> Union[str, int, tuple]:
+        """Logic type name, or a value slot if given numerically."""
+        if self._is_name(operand):
+            return sys.intern(operand.text)
+        return self.value(line, operand)
+
+    def mode(self, line: Line, operand: Operand) -> Union[int, tuple]:
+        """Batch or reagent mode (by name or value) as a value slot."""
+        if self._is_name(operand):
+            modes = BATCH_MODES if operand.text in BATCH_MODES else REAGENT_MODES
+            if operand.text not in modes:
+                raise CompileError(line.number, f"Unknown mode '{operand.text}'")
+            return self.constant(float(modes[operand.text]))
+        return self.value(line, operand)
+
+
+def compile_program(source: Union[str, Program]) -> Bytecode:
+    """Compile IC10 source (or a parsed Program) into Bytecode."""
+    program = tokenize(source) if isinstance(source, str) else source
+    compiler = _Compiler(program)
+    ops = array("H")
+    args: list[tuple] = []
+    handlers: list[Callable] = []
+
+    for index, line in enumerate(program.lines):
+        if line.opcode is None:
+            ops.append(NOP)
+            args.append(())
+            handlers.append(_nop)
+            continue
+
+        opcode = "move" if line.opcode == "mv" else line.opcode
+        if opcode not in HANDLERS:
+            raise CompileError(line.number, f"Unknown instruction '{line.opcode}'")
+        handler, signatures = HANDLERS[opcode]
+
+        operands = line.operands
+        if signatures == "*":
+            signature = ""
+            operands = ()  # alias/define/label: resolved above
+        else:
+            choices = signatures.split("|")
+            signature = next((c for c in choices if len(c) == len(operands)), None)
+            if signature is None:
+                expected = " or ".join(str(len(c)) for c in choices)
+                raise CompileError(
+                    line.number,
+                    f"'{opcode}' takes {expected} operands, got {len(operands)}",
+                )
+
+        encoded: list[Any] = []
+        for letter, operand in zip(signature, operands):
+            if letter == "r":
+                encoded.append(compiler.register(line, operand))
+            elif letter == "v" or letter == "a":
+                encoded.append(compiler.value(line, operand))
+            elif letter == "d":
+                encoded.append(compiler.device(line, operand))
+            elif letter == "t":
+                encoded.append(compiler.logic_type(line, operand))
+            elif letter == "m":
+                encoded.append(compiler.mode(line, operand))
+        if "a" in signature:
+            encoded.append(index)  # own address, for relative jumps and links
+
+        if any(isinstance(arg, tuple) for arg in encoded):
+            args.append((handler, tuple(encoded)))
+            handlers.append(_indirect)
+        else:
+            args.append(tuple(encoded))
+            handlers.append(handler)
+        ops.append(OPCODE_IDS[line.opcode])
+
+    return Bytecode(ops, args, handlers, compiler.constants, len(program.lines))
+
+
+# =============================================================================
+# Chip
+# =============================================================================
+
+
+class Chip:
+    """One IC10 chip: registers, stack, device pins and a program counter."""
+
+    def __init__(self, bytecode: Bytecode, seed: int = 0):
+        self.bytecode = bytecode
+        self.memory = bytecode.memory()
+        self.stack = [0.0] * STACK_SIZE
+        self.shared_stack = False  # stack list shared with a fork until written
+        self.housing = Device(stack=self.stack)
+        self.pins: list[Optional[Device]] = [None] * PIN_COUNT + [self.housing]
+        self.network = DeviceNetwork()  # devices reachable by batch ops
+        self.random = random.Random(seed)
+        self.pc = 0
+        self.steps = 0  # instructions executed so far
+        self.status: Optional[str] = None
+        self.error: Optional[str] = None
+        self.sleep_seconds = 0.0
+
+    @classmethod
+    def from_source(cls, code: str, seed: int = 0) -> "Chip":
+        return cls(compile_program(code), seed)
+
+    @property
+    def registers(self) -> list[float]:
+        """r0-r15, sp, ra."""
+        return self.memory[:REGISTER_COUNT]
+
+    def device(self, pin: int) -> Device:
+        device = self.pins[pin] if 0 <= pin <= DB else None
+        if device is None:
+            raise ChipError(f"Device d{pin} not set")
+        return device
+
+    def device_by_id(self, reference_id: float) -> Device:
+        """The housing, pin or network device with this ReferenceId."""
+        wanted = int(reference_id)
+        if wanted:
+            for device in (*self.pins, *self.network):
+                if device is not None and device.reference_id == wanted:
+                    return device
+        raise ChipError(f"No device with ReferenceId {wanted}")
+
+    def own_stack(self) -> list[float]:
+        """The stack, copied first if it is still shared with a fork."""
+        if self.shared_stack:
+            self.stack = self.housing.stack = self.stack[:]
+            self.shared_stack = False
+        return self.stack
+
+    def fork(self) -> "Chip":
+        """An independent copy of this chip and its devices, at its current state.
+
+        The stack is copy-on-write: both chips share it until either writes.
+        Devices are copied, keeping pins that share a device (or a network
+        device wired to a pin) shared in the copy. The random generator is
+        only copied if the program uses `rand`.
+        """
+        child = type(self).__new__(type(self))
+        child.bytecode = self.bytecode
+        child.memory = self.memory[:]
+        child.stack = self.stack
+        self.shared_stack = child.shared_stack = True
+        source = self.housing
+        housing = Device(  # not .copy(): the stack is shared, not copied
+            source.prefab_hash,
+            source.name_hash,
+            dict(source.logic),
+            [dict(slot) for slot in source.slots],
+            dict(source.reagents),
+            child.stack,
+        )
+        copies = {id(self.housing): housing}
+
+        def copy(device: Device) -> Device:
+            if id(device) not in copies:
+                copies[id(device)] = device.copy()
+            return copies[id(device)]
+
+        child.housing = housing
+        child.pins = [None if device is None else copy(device) for device in self.pins]
+        child.network = DeviceNetwork(copy(device) for device in self.network)
+        if OPCODE_IDS["rand"] in self.bytecode.ops:
+            child.random = random.Random(0)
+            child.random.setstate(self.random.getstate())
+        else:
+            child.random = self.random  # never drawn from
+        child.pc = self.pc
+        child.steps = self.steps
+        child.status = self.status
+        child.error = self.error
+        child.sleep_seconds = self.sleep_seconds
+        return child
+
+    def run(self, max_steps: int = 1_000_000) -> str:
+        """Execute until the chip yields, sleeps, stops or uses max_steps."""
+        handlers = self.bytecode.handlers
+        args = self.bytecode.args
+        memory = self.memory
+        count = len(handlers)
+        pc = self.pc
+        steps = 0
+        status = LIMIT
+        try:
+            while steps < max_steps:
+                if pc >= count:
+                    status = END
+                    break
+                target = handlers[pc](self, memory, args[pc])
+                steps += 1
+                if target is None:
+                    pc += 1
+                elif target >= 0:
+                    pc = target
+                else:
+                    pc += 1
+                    status = YIELD if target == _YIELD else SLEEP if target == _SLEEP else HALT
+                    break
+        except (ChipError, ValueError, OverflowError, IndexError) as e:
+            steps += 1
+            status = ERROR
+            self.error = f"Line {pc + 1}: {e}"
+        self.pc = pc
+        self.steps += steps
+        self.status = status
+        return status
+
+    def reset(self) -> None:
+        """Clear registers and stack and restart from line 0."""
+        self.memory[:] = self.bytecode.memory()
+        self.stack = self.housing.stack = [0.0] * STACK_SIZE
+        self.shared_stack = False
+        self.pc = 0
+        self.status = None
+        self.error = None
+
+
+# =============================================================================
+# Handlers
+# =============================================================================
+
+
+def _nop(chip: Chip, m: list, a: tuple) -> None:
+    return None
+
+
+def _indirect(chip: Chip, m: list, a: tuple) -> Optional[int]:
+    """Resolve rr*/dr* operands at run time, then run the real handler."""
+    handler, encoded = a
+    resolved = []
+    for arg in encoded:
+        if isinstance(arg, tuple):
+            kind, depth, index = arg
+            for _ in range(depth):
+                index = int(m[index])
+                if not 0 <= index < REGISTER_COUNT:
+                    raise ChipError(f"Register index {index} out of range")
+            if kind == "d":
+                index = int(m[index])
+                if not 0 <= index < PIN_COUNT:
+                    raise ChipError(f"Device index {index} out of range")
+            arg = index
+        resolved.append(arg)
+    return handler(chip, m, tuple(resolved))
+
+
+def _address(value: float) -> int:
+    address = int(value)
+    if address < 0:
+        raise ChipError(f"Jump to negative address {address}")
+    return address
+
+
+def _name(m: list, name: Union[str, int]) -> str:
+    """Logic type operand: a name, or a numeric slot converted to text."""
+    return name if isinstance(name, str) else str(int(m[name]))
+
+
+def _to_int(value: float) -> int:
+    """Double to signed 64-bit integer, as the bitwise instructions do."""
+    value = int(value) % _INT64
+    return value - _INT64 if value >= 1 << 63 else value
+
+
+def _safe(function: Callable[..., float]) -> Callable[..., float]:
+    """Math that yields NaN/inf like C# doubles instead of raising."""
+
+    def wrapped(*values: float) -> float:
+        try:
+            return function(*values)
+        except ValueError:
+            return math.nan
+        except OverflowError:
+            return math.inf
+        except ZeroDivisionError:
+            a = values[0]
+            return math.nan if a == 0 or a != a else math.copysign(math.inf, a)
+
+    return wrapped
+
+
+def _approx(a: float, b: float, c: float) -> bool:
+    return abs(a - b) <= max(c * max(abs(a), abs(b)), _APPROX_EPSILON)
+
+
+# --- Register moves and arithmetic (hot paths written out) ------------------
+
+
+def _move(chip, m, a):
+    m[a[0]] = m[a[1]]
+
+
+def _add(chip, m, a):
+    m[a[0]] = m[a[1]] + m[a[2]]
+
+
+def _sub(chip, m, a):
+    m[a[0]] = m[a[1]] - m[a[2]]
+
+
+def _mul(chip, m, a):
+    m[a[0]] = m[a[1]] * m[a[2]]
+
+
+def _binary(function: Callable[[float, float], float]) -> Callable:
+    def handler(chip, m, a):
+        m[a[0]] = function(m[a[1]], m[a[2]])
+
+    return handler
+
+
+def _unary(function: Callable[[float], float]) -> Callable:
+    def handler(chip, m, a):
+        m[a[0]] = function(m[a[1]])
+
+    return handler
+
+
+def _bitwise(function: Callable[[int, int], int]) -> Callable:
+    def handler(chip, m, a):
+        m[a[0]] = float(_to_int(function(_to_int(m[a[1]]), _to_int(m[a[2]]))))
+
+    return handler
+
+
+def _compare(test: Callable[[float, float], bool]) -> Callable:
+    def handler(chip, m, a):
+        m[a[0]] = 1.0 if test(m[a[1]], m[a[2]]) else 0.0
+
+    return handler
+
+
+def _compare_zero(test: Callable[[float, float], bool]) -> Callable:
+    def handler(chip, m, a):
+        m[a[0]] = 1.0 if test(m[a[1]], 0.0) else 0.0
+
+    return handler
+
+
+def _rand(chip, m, a):
+    m[a[0]] = chip.random.random()
+
+
+def _not(chip, m, a):
+    m[a[0]] = float(_to_int(~_to_int(m[a[1]])))
+
+
+def _shift_count(n: int) -> int:
+    """Clamp a shift count to 0-64 like the lockstep engine; longer shifts change nothing."""
+    return 0 if n < 0 else min(n, 64)
+
+
+def _srl(chip, m, a):
+    m[a[0]] = float(_to_int((_to_int(m[a[1]]) % _INT64) >> _shift_count(_to_int(m[a[2]]))))
+
+
+def _select(chip, m, a):
+    m[a[0]] = m[a[2]] if m[a[1]] != 0 else m[a[3]]
+
+
+def _sap(chip, m, a):
+    m[a[0]] = 1.0 if _approx(m[a[1]], m[a[2]], m[a[3]]) else 0.0
+
+
+def _sna(chip, m, a):
+    m[a[0]] = 0.0 if _approx(m[a[1]], m[a[2]], m[a[3]]) else 1.0
+
+
+def _sapz(chip, m, a):
+    m[a[0]] = 1.0 if _approx(m[a[1]], 0.0, m[a[2]]) else 0.0
+
+
+def _snaz(chip, m, a):
+    m[a[0]] = 0.0 if _approx(m[a[1]], 0.0, m[a[2]]) else 1.0
+
+
+def _sdse(chip, m, a):
+    m[a[0]] = 1.0 if chip.pins[a[1]] is not None else 0.0
+
+
+def _sdns(chip, m, a):
+    m[a[0]] = 0.0 if chip.pins[a[1]] is not None else 1.0
+
+
+# --- Branching ---------------------------------------------------------------
+# Branch args end with (target slot, own address); targets are slots so
+# labels, defines, numbers and registers (j ra) all read the same way.
+
+
+def _j(chip, m, a):
+    return _address(m[a[0]])
+
+
+def _jr(chip, m, a):
+    return _address(a[1] + m[a[0]])
+
+
+def _jal(chip, m, a):
+    m[RA] = float(a[1] + 1)
+    return _address(m[a[0]])
+
+
+def _branch(test: Callable[..., bool], arity: int, link: bool, relative: bool) -> Callable:
+    """Conditional branch over `arity` value operands."""
+    if arity == 1:
+
+        def handler(chip, m, a):
+            if test(m[a[0]]):
+                if link:
+                    m[RA] = float(a[2] + 1)
+                return _address(a[2] + m[a[1]] if relative else m[a[1]])
+
+    elif arity == 2:
+
+        def handler(chip, m, a):
+            if test(m[a[0]], m[a[1]]):
+                if link:
+                    m[RA] = float(a[3] + 1)
+                return _address(a[3] + m[a[2]] if relative else m[a[2]])
+
+    else:
+
+        def handler(chip, m, a):
+            if test(m[a[0]], m[a[1]], m[a[2]]):
+                if link:
+                    m[RA] = float(a[4] + 1)
+                return _address(a[4] + m[a[3]] if relative else m[a[3]])
+
+    return handler
+
+
+def _device_branch(is_set: bool, link: bool, relative: bool) -> Callable:
+    def handler(chip, m, a):
+        if (chip.pins[a[0]] is not None) == is_set:
+            if link:
+                m[RA] = float(a[2] + 1)
+            return _address(a[2] + m[a[1]] if relative else m[a[1]])
+
+    return handler
+
+
+def _yield(chip, m, a):
+    return _YIELD
+
+
+def _sleep(chip, m, a):
+    chip.sleep_seconds = m[a[0]]
+    return _SLEEP
+
+
+def _hcf(chip, m, a):
+    return _HALT
+
+
+# --- Stack -------------------------------------------------------------------
+
+
+def _push(chip, m, a):
+    sp = int(m[SP])
+    if sp >= STACK_SIZE:
+        raise ChipError("Stack overflow")
+    if chip.shared_stack:
+        chip.own_stack()
+    chip.stack[sp] = m[a[0]]
+    m[SP] = float(sp + 1)
+
+
+def _pop(chip, m, a):
+    sp = int(m[SP]) - 1
+    if sp < 0 or sp >= STACK_SIZE:
+        raise ChipError("Stack underflow")
+    m[SP] = float(sp)
+    m[a[0]] = chip.stack[sp]
+
+
+def _peek(chip, m, a):
+    sp = int(m[SP]) - 1
+    if sp < 0 or sp >= STACK_SIZE:
+        raise ChipError("Stack underflow")
+    m[a[0]] = chip.stack[sp]
+
+
+def _poke(chip, m, a):
+    index, value = int(m[a[0]]), m[a[1]]
+    if not 0 <= index < STACK_SIZE:
+        raise ChipError(f"Stack index {index} out of range")
+    if chip.shared_stack:
+        chip.own_stack()
+    chip.stack[index] = value
+
+
+def _get(chip, m, a):
+    stack = chip.device(a[1]).stack
+    index = int(m[a[2]])
+    if not 0 <= index < len(stack):
+        raise ChipError(f"Stack index {index} out of range")
+    m[a[0]] = stack[index]
+
+
+def _store(chip, device: Device, address: float, value: float) -> None:
+    if device is chip.housing and chip.shared_stack:
+        chip.own_stack()
+    stack = device.stack
+    index = int(address)
+    if not 0 <= index < len(stack):
+        raise ChipError(f"Stack index {index} out of range")
+    stack[index] = value
+
+
+def _put(chip, m, a):
+    _store(chip, chip.device(a[0]), m[a[1]], m[a[2]])
+
+
+def _getd(chip, m, a):
+    stack = chip.device_by_id(m[a[1]]).stack
+    index = int(m[a[2]])
+    if not 0 <= index < len(stack):
+        raise ChipError(f"Stack index {index} out of range")
+    m[a[0]] = stack[index]
+
+
+def _putd(chip, m, a):
+    _store(chip, chip.device_by_id(m[a[0]]), m[a[1]], m[a[2]])
+
+
+# --- Device logic ------------------------------------------------------------
+
+
+def _l(chip, m, a):
+    m[a[0]] = chip.device(a[1]).read(_name(m, a[2]))
+
+
+def _s(chip, m, a):
+    chip.device(a[0]).write(_name(m, a[1]), m[a[2]])
+
+
+def _ls(chip, m, a):
+    m[a[0]] = chip.device(a[1]).read_slot(m[a[2]], _name(m, a[3]))
+
+
+def _ss(chip, m, a):
+    chip.device(a[0]).write_slot(m[a[1]], _name(m, a[2]), m[a[3]])
+
+
+def _lr(chip, m, a):
+    m[a[0]] = chip.device(a[1]).reagents.get((int(m[a[2]]), int(m[a[3]])), 0.0)
+
+
+def _sr(chip, m, a):
+    chip.device(a[0]).reagents[(int(m[a[1]]), int(m[a[2]]))] = m[a[3]]
+
+
+def _ld(chip, m, a):
+    m[a[0]] = chip.device_by_id(m[a[1]]).read(_name(m, a[2]))
+
+
+def _sd(chip, m, a):
+    chip.device_by_id(m[a[0]]).write(_name(m, a[1]), m[a[2]])
+
+
+def _lb(chip, m, a):
+    m[a[0]] = chip.network.aggregate(m[a[1]], None, _name(m, a[2]), m[a[3]])
+
+
+def _lbn(chip, m, a):
+    m[a[0]] = chip.network.aggregate(m[a[1]], m[a[2]], _name(m, a[3]), m[a[4]])
+
+
+def _lbs(chip, m, a):
+    m[a[0]] = chip.network.aggregate(m[a[1]], None, _name(m, a[3]), m[a[4]], m[a[2]])
+
+
+def _lbns(chip, m, a):
+    m[a[0]] = chip.network.aggregate(m[a[1]], m[a[2]], _name(m, a[4]), m[a[5]], m[a[3]])
+
+
+def _sb(chip, m, a):
+    chip.network.store(m[a[0]], None, _name(m, a[1]), m[a[2]])
+
+
+def _sbn(chip, m, a):
+    chip.network.store(m[a[0]], m[a[1]], _name(m, a[2]), m[a[3]])
+
+
+def _sbs(chip, m, a):
+    chip.network.store(m[a[0]], None, _name(m, a[2]), m[a[3]], m[a[1]])
+
+
+def _sbns(chip, m, a):
+    chip.network.store(m[a[0]], m[a[1]], _name(m, a[3]), m[a[4]], m[a[2]])
+
+
+def _div(a: float, b: float) -> float:
+    return a / b
+
+
+def _mod(a: float, b: float) -> float:
+    return a % b
+
+
+def _round(a: float) -> float:
+    return float(round(a))
+
+
+# opcode -> (handler, operand signatures); "|" separates alternative arities
+# and "*" accepts anything (lines resolved at load time)
+HANDLERS: dict[str, tuple[Callable, str]] = {
+    # math
+    "add": (_add, "rvv"),
+    "sub": (_sub, "rvv"),
+    "mul": (_mul, "rvv"),
+    "div": (_binary(_safe(_div)), "rvv"),
+    "mod": (_binary(_safe(_mod)), "rvv"),
+    "abs": (_unary(abs), "rv"),
+    "ceil": (_unary(_safe(lambda x: float(math.ceil(x)))), "rv"),
+    "floor": (_unary(_safe(lambda x: float(math.floor(x)))), "rv"),
+    "round": (_unary(_safe(_round)), "rv"),
+    "trunc": (_unary(_safe(lambda x: float(math.trunc(x)))), "rv"),
+    "sqrt": (_unary(_safe(math.sqrt)), "rv"),
+    "exp": (_unary(_safe(math.exp)), "rv"),
+    "log": (_unary(_safe(lambda x: -math.inf if x == 0 else math.log(x))), "rv"),
+    "pow": (_binary(_safe(math.pow)), "rvv"),
+    "sin": (_unary(_safe(math.sin)), "rv"),
+    "cos": (_unary(_safe(math.cos)), "rv"),
+    "tan": (_unary(_safe(math.tan)), "rv"),
+    "asin": (_unary(_safe(math.asin)), "rv"),
+    "acos": (_unary(_safe(math.acos)), "rv"),
+    "atan": (_unary(_safe(math.atan)), "rv"),
+    "atan2": (_binary(_safe(math.atan2)), "rvv"),
+    "min": (_binary(min), "rvv"),
+    "max": (_binary(max), "rvv"),
+    "rand": (_rand, "r"),
+    # logic
+    "l": (_l, "rdt"),
+    "s": (_s, "dtv"),
+    "ls": (_ls, "rdvt"),
+    "ss": (_ss, "dvtv"),
+    "lr": (_lr, "rdmv"),
+    "sr": (_sr, "dmvv"),
+    "ld": (_ld, "rvt"),
+    "sd": (_sd, "vtv"),
+    # batch
+    "lb": (_lb, "rvtm"),
+    "sb": (_sb, "vtv"),
+    "lbn": (_lbn, "rvvtm"),
+    "sbn": (_sbn, "vvtv"),
+    "lbs": (_lbs, "rvvtm"),
+    "sbs": (_sbs, "vvtv"),
+    "lbns": (_lbns, "rvvvtm"),
+    "sbns": (_sbns, "vvvtv"),
+    # comparison
+    "seq": (_compare(operator.eq), "rvv"),
+    "sne": (_compare(operator.ne), "rvv"),
+    "sgt": (_compare(operator.gt), "rvv"),
+    "slt": (_compare(operator.lt), "rvv"),
+    "sge": (_compare(operator.ge), "rvv"),
+    "sle": (_compare(operator.le), "rvv"),
+    "seqz": (_compare_zero(operator.eq), "rv"),
+    "snez": (_compare_zero(operator.ne), "rv"),
+    "sgtz": (_compare_zero(operator.gt), "rv"),
+    "sltz": (_compare_zero(operator.lt), "rv"),
+    "sgez": (_compare_zero(operator.ge), "rv"),
+    "slez": (_compare_zero(operator.le), "rv"),
+    "sap": (_sap, "rvvv"),
+    "sna": (_sna, "rvvv"),
+    "sapz": (_sapz, "rvv"),
+    "snaz": (_snaz, "rvv"),
+    "sdse": (_sdse, "rd"),
+    "sdns": (_sdns, "rd"),
+    "select": (_select, "rvvv"),
+    # branching
+    "j": (_j, "a"),
+    "jr": (_jr, "a"),
+    "jal": (_jal, "a"),
+    "bdse": (_device_branch(True, False, False), "da"),
+    "bdns": (_device_branch(False, False, False), "da"),
+    "bdseal": (_device_branch(True, True, False), "da"),
+    "bdnsal": (_device_branch(False, True, False), "da"),
+    "brdse": (_device_branch(True, False, True), "da"),
+    "brdns": (_device_branch(False, False, True), "da"),
+    # bitwise
+    "and": (_bitwise(operator.and_), "rvv"),
+    "or": (_bitwise(operator.or_), "rvv"),
+    "xor": (_bitwise(operator.xor), "rvv"),
+    "nor": (_bitwise(lambda x, y: ~(x | y)), "rvv"),
+    "not": (_not, "rv"),
+    "sll": (_bitwise(lambda x, n: x << _shift_count(n)), "rvv"),
+    "sla": (_bitwise(lambda x, n: x << _shift_count(n)), "rvv"),
+    "srl": (_srl, "rvv"),
+    "sra": (_bitwise(lambda x, n: x >> _shift_count(n)), "rvv"),
+    # stack
+    "push": (_push, "v"),
+    "pop": (_pop, "r"),
+    "peek": (_peek, "r"),
+    "poke": (_poke, "vv"),
+    "get": (_get, "rdv"),
+    "put": (_put, "dvv"),
+    "getd": (_getd, "rvv"),
+    "putd": (_putd, "vvv"),
+    # utility: aliases, defines and labels were resolved at load time
+    "alias": (_nop, "*"),
+    "define": (_nop, "*"),
+    "label": (_nop, "*"),
+    "move": (_move, "rv"),
+    "yield": (_yield, ""),
+    "sleep": (_sleep, "v"),
+    "hcf": (_hcf, ""),
+}
+
+# Conditional branches: b<cond>, b<cond>al, br<cond> over value operands
+_CONDITIONS: dict[str, tuple[Callable[..., bool], int]] = {
+    "eq": (operator.eq, 2),
+    "ne": (operator.ne, 2),
+    "gt": (operator.gt, 2),
+    "lt": (operator.lt, 2),
+    "ge": (operator.ge, 2),
+    "le": (operator.le, 2),
+    "eqz": (lambda x: x == 0, 1),
+    "nez": (lambda x: x != 0, 1),
+    "gtz": (lambda x: x > 0, 1),
+    "ltz": (lambda x: x < 0, 1),
+    "gez": (lambda x: x >= 0, 1),
+    "lez": (lambda x: x <= 0, 1),
+    "ap": (_approx, 3),
+    "na": (lambda x, y, c: not _approx(x, y, c), 3),
+    "apz": (lambda x, c: _approx(x, 0.0, c), 2),
+    "naz": (lambda x, c: not _approx(x, 0.0, c), 2),
+}
+for _condition, (_test, _arity) in _CONDITIONS.items():
+    for _opcode, _link, _relative in (
+        (f"b{_condition}", False, False),
+        (f"b{_condition}al", True, False),
+        (f"br{_condition}", False, True),
+    ):
+        if _opcode in OPCODE_IDS:
+            HANDLERS[_opcode] = (
+                _branch(_test, _arity, _link, _relative),
+                "v" * _arity + "a",
+            )
+
+
+# =============================================================================
+# CLI Interface
+# =============================================================================
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Run an IC10 script offline")
+    parser.add_argument("file", type=Path, help="Path to IC10 file to run")
+    parser.add_argument(
+        "--ticks", type=int, default=1, help="Yields/sleeps to run through (default: 1)"
+    )
+    parser.add_argument(
+        "--max-steps",
+        type=int,
+        default=1_000_000,
+        help="Instruction budget per tick (default: 1000000)",
+    )
+    parser.add_argument(
+        "--devices",
+        action="store_true",
+        help="Attach an empty device to every pin (d0-d5)",
+    )
+    parser.add_argument(
+        "--network",
+        action="append",
+        default=[],
+        metavar="PREFAB",
+        help="Add a device to the batch network by name or prefab hash (repeatable)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for rand")
+    parser.add_argument(
+        "--jit", action="store_true", help="Run compiled blocks (tools.ic10_jit)"
+    )
+    args = parser.parse_args()
+
+    engine = Chip
+    if args.jit:
+        from .ic10_jit import JitChip as engine
+    try:
+        chip = engine(compile_program(args.file.read_text(encoding="utf-8")), args.seed)
+    except (OSError, CompileError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if args.devices:
+        for pin in range(PIN_COUNT):
+            chip.pins[pin] = Device()
+    for prefab in args.network:
+        chip.network.create(int(prefab) if prefab.lstrip("-").isdigit() else prefab)
+
+    start = time.perf_counter()
+    status = None
+    for _ in range(args.ticks):
+        status = chip.run(args.max_steps)
+        if status not in (YIELD, SLEEP):
+            break
+    elapsed = time.perf_counter() - start
+
+    print(f"Status: {status}" + (f" ({chip.error})" if chip.error else ""))
+    print(f"Line: {chip.pc + 1}")
+    print(f"Steps: {chip.steps} ({chip.steps / max(elapsed, 1e-9) / 1e6:.2f}M/s)")
+    names = [f"r{i}" for i in range(16)] + ["sp", "ra"]
+    for name, value in zip(names, chip.registers):
+        if value:
+            print(f"  {name:<3} = {value:g}")
+    sys.exit(1 if status == ERROR else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+"""Differential fuzzing of the IC10 validator against the emulator.
+
+Generates random programs within config.MAX_LINES, MAX_LINE_LENGTH and
+MAX_CODE_SIZE, with operands of the kinds each instruction takes (from the
+emulator's handler signatures), plus occasional deliberate mistakes. Each
+program is tokenized once, then checked by both tools:
+
+    crash              validator or emulator raised an unexpected exception
+    validator-accepts  no validator errors, but the emulator rejects it
+    validator-rejects  validator errors, but the emulator compiles it
+    missed-loop        no W002, but a run repeats a line without pausing
+
+A run of an acyclic stretch executes each line at most once, so a run that
+takes more steps than the program has lines has gone round a yield-free
+cycle; W002 must flag it unless some jump target is only known at runtime.
+Findings are shrunk to a minimal reproducer by deleting lines while the
+same finding persists.
+
+    uv run python -m tools.ic10_fuzz --programs 100000 --out .cache/fuzz
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from . import config
+from .ic10_cfg import build_cfg
+from .ic10_emulator import (
+    BATCH_MODES,
+    HANDLERS,
+    LIMIT,
+    PIN_COUNT,
+    REAGENT_MODES,
+    Chip,
+    CompileError,
+    Device,
+    compile_program,
+)
+from .ic10_parser import tokenize
+
+RUNS_PER_PROGRAM = 4  # yields/sleeps followed per program
+MISTAKE_RATE = 0.05  # programs with one deliberate error
+
+LOGIC_TYPES = (
+    "On",
+    "Open",
+    "Mode",
+    "Setting",
+    "Temperature",
+    "Pressure",
+    "Ratio",
+    "Quantity",
+    "Occupied",
+    "Power",
+)
+_OPCODES = tuple(name for name, (_, signatures) in HANDLERS.items() if signatures != "*")
+_REGISTERS = tuple(f"r{i}" for i in range(16)) + ("sp", "ra")
+_DEVICES = tuple(config.VALID_DEVICES)
+_LINE_PREFIX = re.compile(r"^Line \d+: ")
+_NUMBERS = re.compile(r"-?\d+(\.\d+)?")
+
+
+def _finding_key(kind: str, detail: str) -> tuple[str, str]:
+    """Groups findings that differ only in line numbers and constants."""
+    return kind, _NUMBERS.sub("#", _LINE_PREFIX.sub("", detail))
+
+
+@dataclass
+class Finding:
+    """One disagreement or crash, with its (shrunk) reproducer."""
+
+    kind: str
+    detail: str
+    program: str
+    seed: int
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return _finding_key(self.kind, self.detail)
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "detail": self.detail,
+            "seed": self.seed,
+            "program": self.program,
+        }
+
+
+@dataclass
+class FuzzReport:
+    """Programs checked and distinct findings, merged across workers."""
+
+    programs: int = 0
+    seconds: float = 0.0
+    outcomes: Counter = field(default_factory=Counter)
+    findings: dict[tuple[str, str], Finding] = field(default_factory=dict)
+    counts: Counter = field(default_factory=Counter)  # occurrences per finding key
+
+    def merge(self, programs: int, outcomes: Counter, findings: list[Finding]) -> None:
+        self.programs += programs
+        self.outcomes.update(outcomes)
+        for finding in findings:
+            self.counts[finding.key] += 1
+            self.findings.setdefault(finding.key, finding)
+
+    def to_dict(self) -> dict:
+        return {
+            "programs": self.programs,
+            "seconds": round(self.seconds, 3),
+            "programs_per_s": round(self.programs / self.seconds) if self.seconds else None,
+            "outcomes": dict(self.outcomes),
+            "findings": [
+                {**finding.to_dict(), "count": self.counts[key]}
+                for key, finding in self.findings.items()
+            ],
+        }
+
+
+# =============================================================================
+# Program Generator
+# =============================================================================
+
+
+class ProgramGenerator:
+    """Random, mostly valid IC10 programs within the game's size limits."""
+
+    def __init__(self, seed: int, max_lines: int = 16, mistake_rate: float = MISTAKE_RATE):
+        self.random = random.Random(seed)
+        self.max_lines = min(max_lines, config.MAX_LINES)
+        self.mistake_rate = mistake_rate
+
+    def generate(self) -> str:
+        rng = self.random
+        count = rng.randint(1, self.max_lines)
+        labels = [f"L{i}" for i in range(rng.randint(0, 3))]
+        label_lines = {rng.randrange(count): label for label in labels}
+        labels = list(label_lines.values())
+        defines: list[str] = []
+        aliases: dict[str, str] = {}  # name -> "r" or "d"
+
+        lines = []
+        size = 0
+        for number in range(count):
+            if number in label_lines:
+                line = f"{label_lines[number]}:"
+            else:
+                roll = rng.random()
+                if roll < 0.05:
+                    name = f"K{len(defines)}"
+                    defines.append(name)
+                    line = f"define {name} {rng.randint(-100, 100)}"
+                elif roll < 0.1:
+                    kind = rng.choice("rd")
+                    name = f"A{len(aliases)}"
+                    aliases[name] = kind
+                    target = rng.choice(_REGISTERS[:16] if kind == "r" else _DEVICES[:PIN_COUNT])
+                    line = f"alias {name} {target}"
+                else:
+                    line = self._instruction(labels, defines, aliases, count)
+            line = line[: config.MAX_LINE_LENGTH]
+            size += len(line) + 1
+            if size > config.MAX_CODE_SIZE:
+                break
+            lines.append(line)
+
+        if lines and rng.random() < self.mistake_rate:
+            self._mistake(lines)
+        return "\n".join(lines) + "\n"
+
+    def _instruction(self, labels, defines, aliases, count) -> str:
+        rng = self.random
+        opcode = rng.choice(_OPCODES)
+        signature = rng.choice(HANDLERS[opcode][1].split("|"))
+        modes = REAGENT_MODES if opcode in ("lr", "sr") else BATCH_MODES
+        operands = []
+        for letter in signature:
+            roll = rng.random()
+            if letter == "r":
+                names = [name for name, kind in aliases.items() if kind == "r"]
+                operands.append(
+                    rng.choice(names) if names and roll < 0.2 else rng.choice(_REGISTERS)
+                )
+            elif letter == "d":
+                names = [name for name, kind in aliases.items() if kind == "d"]
+                operands.append(
+                    rng.choice(names) if names and roll < 0.2 else rng.choice(_DEVICES)
+                )
+            elif letter == "t":
+                operands.append(rng.choice(LOGIC_TYPES))
+            elif letter == "m":
+                operands.append(rng.choice(tuple(modes)) if roll < 0.7 else str(rng.randint(0, 3)))
+            elif letter == "a":
+                if labels and roll < 0.7:
+                    operands.append(rng.choice(labels))
+                elif roll < 0.9:  # relative jumps (br*, jr) may go backwards
+                    low = -2 if opcode.startswith("br") or opcode == "jr" else 0
+                    operands.append(str(rng.randint(low, count)))
+                else:
+                    operands.append(rng.choice(_REGISTERS[:16]))
+            else:  # v
+                operands.append(self._value(defines, roll))
+        return " ".join([opcode, *operands])
+
+    def _value(self, defines, roll: float) -> str:
+        rng = self.random
+        if roll < 0.4:
+            return rng.choice(_REGISTERS)
+        if roll < 0.7:
+            return str(rng.randint(-10, 10))
+        if roll < 0.8:
+            return f"{rng.uniform(-1000, 1000):.3f}"
+        if roll < 0.9 and defines:
+            return rng.choice(defines)
+        if roll < 0.95:
+            return f'HASH("{rng.choice(LOGIC_TYPES)}")'
+        return f"r{rng.choice(_REGISTERS[:16])}"  # indirect, e.g. rr3
+
+    def _mistake(self, lines: list[str]) -> None:
+        rng = self.random
+        index = rng.randrange(len(lines))
+        choice = rng.randrange(4)
+        if choice == 0:
+            lines[index] = f"add r{rng.randint(16, 20)} r0 1"
+        elif choice == 1:
+            lines[index] = f"s d{rng.randint(6, 9)} On 1"
+        elif choice == 2:
+            lines[index] = "j Missing"
+        else:
+            lines[index] = "frobnicate r0"
+
+
+# =============================================================================
+# Oracles
+# =============================================================================
+
+
+def check(validator, code: str) -> tuple[str, Optional[tuple[str, str]]]:
+    """Run one program through both tools; returns (outcome, finding or None)."""
+    program = tokenize(code)
+    try:
+        result = validator.validate_program(program)
+    except Exception as e:  # noqa: BLE001 - any escape is a finding
+        return "crash", ("crash", f"validator: {type(e).__name__}: {e}")
+    errors = [issue.rule for issue in result.errors]
+
+    try:
+        bytecode = compile_program(program)
+    except CompileError as e:
+        if errors:
+            return "rejected", None
+        return "disagree", ("validator-accepts", f"emulator: {e}")
+    except Exception as e:  # noqa: BLE001
+        return "crash", ("crash", f"emulator compile: {type(e).__name__}: {e}")
+    if errors:
+        return "disagree", ("validator-rejects", f"validator: {', '.join(sorted(set(errors)))}")
+
+    chip = Chip(bytecode)
+    for pin in range(PIN_COUNT):
+        chip.pins[pin] = Device()
+    loop_warned = any(issue.rule == "W002" for issue in result.warnings)
+    budget = bytecode.lines + 1
+    try:
+        for _ in range(RUNS_PER_PROGRAM):
+            status = chip.run(budget)
+            if status == LIMIT and not loop_warned and not build_cfg(program).unresolved:
+                return "disagree", ("missed-loop", f"{budget} steps without a pause, no W002")
+            if status not in ("yield", "sleep"):
+                break
+    except Exception as e:  # noqa: BLE001
+        return "crash", ("crash", f"emulator run: {type(e).__name__}: {e}")
+    return "ran", None
+
+
+def shrink(validator, code: str, key: tuple[str, str]) -> str:
+    """Delete lines (halves, then quarters, ... then singles) while the finding persists."""
+    lines = code.splitlines()
+
+    def still_fails(candidate: list[str]) -> bool:
+        finding = check(validator, "\n".join(candidate) + "\n")[1]
+        return finding is not None and _finding_key(*finding) == key
+
+    chunk = max(1, len(lines) // 2)
+    while chunk >= 1:
+        start = 0
+        while start < len(lines):
+            candidate = lines[:start] + lines[start + chunk :]
+            if candidate and still_fails(candidate):
+                lines = candidate
+            else:
+                start += chunk
+        chunk //= 2
+    return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# Workers
+# =============================================================================
+
+_worker_validator = None
+
+
+def _init_worker() -> None:
+    global _worker_validator
+    from .ic10_validator import IC10Validator
+
+    _worker_validator = IC10Validator()
+
+
+def fuzz_batch(
+    seed: int, count: int, max_lines: int = 16
+) -> tuple[int, Counter, list[Finding]]:
+    """Generate and check `count` programs from `seed`; findings come back shrunk."""
+    if _worker_validator is None:
+        _init_worker()
+    validator = _worker_validator
+    generator = ProgramGenerator(seed, max_lines)
+    outcomes: Counter = Counter()
+    findings = []
+    seen = set()
+    for _ in range(count):
+        code = generator.generate()
+        outcome, finding = check(validator, code)
+        outcomes[outcome] += 1
+        if finding is None:
+            continue
+        found = Finding(*finding, code, seed)
+        if found.key not in seen:  # shrink the first of each kind per batch
+            seen.add(found.key)
+            found.program = shrink(validator, code, found.key)
+            found.detail = check(validator, found.program)[1][1]
+        findings.append(found)
+    return count, outcomes, findings
+
+
+def fuzz(
+    programs: int,
+    seed: int = 0,
+    jobs: Optional[int] = None,
+    batch: int = 2000,
+    max_lines: int = 16,
+) -> FuzzReport:
+    """Fuzz `programs` programs across a process pool."""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    report = FuzzReport()
+    seeds = [
+        (seed * 1_000_003 + i, min(batch, programs - i * batch))
+        for i in range(-(-programs // batch))
+    ]
+    jobs = jobs or os.cpu_count() or 1
+    start = time.perf_counter()
+    if jobs == 1:
+        for batch_seed, count in seeds:
+            report.merge(*fuzz_batch(batch_seed, count, max_lines))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+            futures = [pool.submit(fuzz_batch, s, n, max_lines) for s, n in seeds]
+            for future in as_completed(futures):
+                report.merge(*future.result())
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+# =============================================================================
+# CLI Interface
+# =============================================================================
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Fuzz the IC10 validator against the emulator")
+    parser.add_argument("--programs", type=int, default=100_000, help="Programs to generate")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed (runs are reproducible)")
+    parser.add_argument("--jobs", "-j", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-lines", type=int, default=16, help="Longest program generated")
+    parser.add_argument("--out", type=Path, help="Write reproducers and report.json here")
+    args = parser.parse_args()
+
+    report = fuzz(args.programs, args.seed, args.jobs, max_lines=args.max_lines)
+    data = report.to_dict()
+    print(
+        f"Programs: {data['programs']} in {data['seconds']}s"
+        f" ({data['programs_per_s']}/s)"
+    )
+    for outcome, count in report.outcomes.most_common():
+        print(f"  {outcome}: {count}")
+    for i, finding in enumerate(data["findings"], 1):
+        print(f"\n[{i}] {finding['kind']} x{finding['count']}: {finding['detail']}")
+        print("    " + finding["program"].rstrip("\n").replace("\n", "\n    "))
+
+    if args.out:
+        args.out.mkdir(parents=True, exist_ok=True)
+        for i, finding in enumerate(data["findings"], 1):
+            (args.out / f"{i:03d}-{finding['kind']}.ic10").write_text(finding["program"])
+        (args.out / "report.json").write_text(json.dumps(data, indent=2) + "\n")
+    sys.exit(1 if data["findings"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,657 @@
+"""Block-compiling execution mode for the IC10 emulator.
+
+`JitChip` runs the same Bytecode as `Chip`, but instead of calling one
+handler per line it translates each basic block (a straight run of lines
+ending at a branch, yield, sleep or hcf) into Python source. The blocks of
+a program become the cases of one function, compiled once with `compile()`,
+with the registers as locals: branches to a constant line chain straight to
+that block, and a block that jumps back to its own first line loops in
+place. Registers are loaded when a run enters the function and written back
+when it pauses or leaves.
+
+    chip = JitChip(compile_program(code))
+    chip.pins[0] = Device(logic={"Temperature": 293.15})
+    status = chip.run(10_000)   # same statuses, steps and errors as Chip.run
+
+Translations are cached by a hash of the program, so every chip running the
+same script shares one function. Instructions without a translation (stack,
+indirect `rr0` operands, bit shifts, ...) call their normal handler from
+inside the block. Runs that stop mid-block (step limit) and computed jumps
+into the middle of a block fall back to one handler per line, so results
+match `Chip` exactly.
+"""
+
+import hashlib
+import math
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from .ic10_emulator import (
+    _HALT,
+    _SLEEP,
+    _YIELD,
+    END,
+    ERROR,
+    HALT,
+    HANDLERS,
+    LIMIT,
+    PIN_COUNT,
+    RA,
+    REGISTER_COUNT,
+    SLEEP,
+    YIELD,
+    Bytecode,
+    Chip,
+    ChipError,
+    _address,
+    _approx,
+    _div,
+    _indirect,
+    _mod,
+    _nop,
+    _round,
+    _safe,
+    _to_int,
+)
+
+CACHE_SIZE = 256  # translated programs kept
+_WARMUP_CALLS = 8
+
+_FAULTS = (ChipError, ValueError, OverflowError, IndexError)
+
+
+class _Fault(Exception):
+    """A fault inside a block: faulting line, steps taken in the call, cause."""
+
+    def __init__(self, line: int, steps: int, error: Exception):
+        super().__init__(line, steps, error)
+        self.line = line
+        self.steps = steps
+        self.error = error
+
+
+# =============================================================================
+# Translation Tables
+# =============================================================================
+
+# Statement templates over rendered operands ({0} is the first operand).
+# Risky statements can raise and record their line before running.
+_SAFE = False
+_RISKY = True
+_STATEMENTS: dict[str, tuple[str, bool]] = {
+    "move": ("{0} = {1}", _SAFE),
+    "add": ("{0} = {1} + {2}", _SAFE),
+    "sub": ("{0} = {1} - {2}", _SAFE),
+    "mul": ("{0} = {1} * {2}", _SAFE),
+    "div": ("{0} = _div({1}, {2})", _SAFE),
+    "mod": ("{0} = _mod({1}, {2})", _SAFE),
+    "abs": ("{0} = abs({1})", _SAFE),
+    "ceil": ("{0} = _ceil({1})", _SAFE),
+    "floor": ("{0} = _floor({1})", _SAFE),
+    "round": ("{0} = _round({1})", _SAFE),
+    "trunc": ("{0} = _trunc({1})", _SAFE),
+    "sqrt": ("{0} = _sqrt({1})", _SAFE),
+    "exp": ("{0} = _exp({1})", _SAFE),
+    "log": ("{0} = _log({1})", _SAFE),
+    "pow": ("{0} = _pow({1}, {2})", _SAFE),
+    "sin": ("{0} = _sin({1})", _SAFE),
+    "cos": ("{0} = _cos({1})", _SAFE),
+    "tan": ("{0} = _tan({1})", _SAFE),
+    "asin": ("{0} = _asin({1})", _SAFE),
+    "acos": ("{0} = _acos({1})", _SAFE),
+    "atan": ("{0} = _atan({1})", _SAFE),
+    "atan2": ("{0} = _atan2({1}, {2})", _SAFE),
+    "min": ("{0} = min({1}, {2})", _SAFE),
+    "max": ("{0} = max({1}, {2})", _SAFE),
+    "rand": ("{0} = chip.random.random()", _SAFE),
+    "seq": ("{0} = 1.0 if {1} == {2} else 0.0", _SAFE),
+    "sne": ("{0} = 1.0 if {1} != {2} else 0.0", _SAFE),
+    "sgt": ("{0} = 1.0 if {1} > {2} else 0.0", _SAFE),
+    "slt": ("{0} = 1.0 if {1} < {2} else 0.0", _SAFE),
+    "sge": ("{0} = 1.0 if {1} >= {2} else 0.0", _SAFE),
+    "sle": ("{0} = 1.0 if {1} <= {2} else 0.0", _SAFE),
+    "seqz": ("{0} = 1.0 if {1} == 0.0 else 0.0", _SAFE),
+    "snez": ("{0} = 1.0 if {1} != 0.0 else 0.0", _SAFE),
+    "sgtz": ("{0} = 1.0 if {1} > 0.0 else 0.0", _SAFE),
+    "sltz": ("{0} = 1.0 if {1} < 0.0 else 0.0", _SAFE),
+    "sgez": ("{0} = 1.0 if {1} >= 0.0 else 0.0", _SAFE),
+    "slez": ("{0} = 1.0 if {1} <= 0.0 else 0.0", _SAFE),
+    "sap": ("{0} = 1.0 if _approx({1}, {2}, {3}) else 0.0", _SAFE),
+    "sna": ("{0} = 0.0 if _approx({1}, {2}, {3}) else 1.0", _SAFE),
+    "sapz": ("{0} = 1.0 if _approx({1}, 0.0, {2}) else 0.0", _SAFE),
+    "snaz": ("{0} = 0.0 if _approx({1}, 0.0, {2}) else 1.0", _SAFE),
+    "sdse": ("{0} = 1.0 if pins[{1}] is not None else 0.0", _SAFE),
+    "sdns": ("{0} = 0.0 if pins[{1}] is not None else 1.0", _SAFE),
+    "select": ("{0} = {2} if {1} != 0 else {3}", _SAFE),
+    "and": ("{0} = float(_to_int(_to_int({1}) & _to_int({2})))", _RISKY),
+    "or": ("{0} = float(_to_int(_to_int({1}) | _to_int({2})))", _RISKY),
+    "xor": ("{0} = float(_to_int(_to_int({1}) ^ _to_int({2})))", _RISKY),
+    "nor": ("{0} = float(_to_int(~(_to_int({1}) | _to_int({2}))))", _RISKY),
+    "not": ("{0} = float(_to_int(~_to_int({1})))", _RISKY),
+    # device ops run after `d` is fetched from the pin (see _Block._device)
+    "l": ("{0} = d.logic.get({2}, 0.0)", _RISKY),
+    "s": ("d.logic[{1}] = {2}", _RISKY),
+    "ls": ("{0} = d.read_slot({2}, {3})", _RISKY),
+    "ss": ("d.write_slot({1}, {2}, {3})", _RISKY),
+    "lb": ("{0} = chip.network.aggregate({1}, None, {2}, {3})", _RISKY),
+    "lbn": ("{0} = chip.network.aggregate({1}, {2}, {3}, {4})", _RISKY),
+    "lbs": ("{0} = chip.network.aggregate({1}, None, {3}, {4}, {2})", _RISKY),
+    "lbns": ("{0} = chip.network.aggregate({1}, {2}, {4}, {5}, {3})", _RISKY),
+    "sb": ("chip.network.store({0}, None, {1}, {2})", _RISKY),
+    "sbn": ("chip.network.store({0}, {1}, {2}, {3})", _RISKY),
+    "sbs": ("chip.network.store({0}, None, {2}, {3}, {1})", _RISKY),
+    "sbns": ("chip.network.store({0}, {1}, {3}, {4}, {2})", _RISKY),
+}
+
+# Branch tests over the operands before the target; None jumps always
+_CONDITIONS: dict[str, str] = {
+    "eq": "{0} == {1}",
+    "ne": "{0} != {1}",
+    "gt": "{0} > {1}",
+    "lt": "{0} < {1}",
+    "ge": "{0} >= {1}",
+    "le": "{0} <= {1}",
+    "eqz": "{0} == 0",
+    "nez": "{0} != 0",
+    "gtz": "{0} > 0",
+    "ltz": "{0} < 0",
+    "gez": "{0} >= 0",
+    "lez": "{0} <= 0",
+    "ap": "_approx({0}, {1}, {2})",
+    "na": "not _approx({0}, {1}, {2})",
+    "apz": "_approx({0}, 0.0, {1})",
+    "naz": "not _approx({0}, 0.0, {1})",
+}
+_BRANCHES: dict[str, tuple[Optional[str], bool, bool]] = {  # test, link, relative
+    "j": (None, False, False),
+    "jal": (None, True, False),
+    "jr": (None, False, True),
+    "bdse": ("pins[{0}] is not None", False, False),
+    "bdns": ("pins[{0}] is None", False, False),
+    "bdseal": ("pins[{0}] is not None", True, False),
+    "bdnsal": ("pins[{0}] is None", True, False),
+    "brdse": ("pins[{0}] is not None", False, True),
+    "brdns": ("pins[{0}] is None", False, True),
+}
+for _condition, _test in _CONDITIONS.items():
+    _BRANCHES[f"b{_condition}"] = (_test, False, False)
+    _BRANCHES[f"b{_condition}al"] = (_test, True, False)
+    _BRANCHES[f"br{_condition}"] = (_test, False, True)
+
+# Keyed by the stock handler, so mv/move share an entry and wrapped handlers
+# (profiling) are called rather than inlined
+_STATEMENT_OF = {HANDLERS[op][0]: (op, *entry) for op, entry in _STATEMENTS.items()}
+_BRANCH_OF = {HANDLERS[op][0]: (op, *entry) for op, entry in _BRANCHES.items() if op in HANDLERS}
+_STOPS = {HANDLERS["yield"][0]: _YIELD, HANDLERS["sleep"][0]: _SLEEP, HANDLERS["hcf"][0]: _HALT}
+_ENDS_BLOCK = frozenset(
+    handler
+    for handler, signatures in HANDLERS.values()
+    if "a" in signatures or handler in _STOPS
+)
+_STOCK = frozenset(handler for handler, _ in HANDLERS.values())
+
+
+_DEVICE_OPS = frozenset(("l", "s", "ls", "ss"))
+
+
+def _line(bytecode: Bytecode, pc: int) -> tuple[Callable, tuple]:
+    """Handler and operands of a line, seeing through `dr0`-style devices.
+
+    Indirect devices stay as ("d", 0, register) for the block to resolve;
+    any other indirect operand keeps the `_indirect` wrapper (a call).
+    """
+    handler = bytecode.handlers[pc]
+    args = bytecode.args[pc]
+    if handler is _indirect:
+        inner, encoded = args
+        if all(
+            not isinstance(arg, tuple) or (arg[0] == "d" and arg[1] == 0) for arg in encoded
+        ):
+            return inner, encoded
+    return handler, args
+
+
+def _ends_block(bytecode: Bytecode, pc: int) -> bool:
+    """True if line `pc` may jump or pause (or is a handler we cannot see into)."""
+    handler = bytecode.handlers[pc]
+    if handler is _indirect:
+        handler = bytecode.args[pc][0]
+    return handler in _ENDS_BLOCK or handler not in _STOCK
+
+
+def _pin(value: float) -> int:
+    """Pin index held in a register (`dr0`), as `_indirect` resolves it."""
+    index = int(value)
+    if not 0 <= index < PIN_COUNT:
+        raise ChipError(f"Device index {index} out of range")
+    return index
+
+# Helpers the generated code refers to by name
+_GLOBALS = {
+    "ChipError": ChipError,
+    "_Fault": _Fault,
+    "_FAULTS": _FAULTS,
+    "_address": _address,
+    "_pin": _pin,
+    "_approx": _approx,
+    "_to_int": _to_int,
+    "_div": _safe(_div),
+    "_mod": _safe(_mod),
+    "_round": _safe(_round),
+    "_ceil": _safe(lambda x: float(math.ceil(x))),
+    "_floor": _safe(lambda x: float(math.floor(x))),
+    "_trunc": _safe(lambda x: float(math.trunc(x))),
+    "_sqrt": _safe(math.sqrt),
+    "_exp": _safe(math.exp),
+    "_log": _safe(lambda x: -math.inf if x == 0 else math.log(x)),
+    "_pow": _safe(math.pow),
+    "_sin": _safe(math.sin),
+    "_cos": _safe(math.cos),
+    "_tan": _safe(math.tan),
+    "_asin": _safe(math.asin),
+    "_acos": _safe(math.acos),
+    "_atan": _safe(math.atan),
+    "_atan2": _safe(math.atan2),
+}
+
+
+# =============================================================================
+# Block Translation
+# =============================================================================
+
+
+class _Block:
+    """Python source for the block entered at one line.
+
+    Registers are locals of the program function (see JitProgram); the
+    block records which ones it reads and writes so the function loads and
+    stores only those.
+    """
+
+    def __init__(self, program: "JitProgram", start: int):
+        self.program = program
+        self.bytecode = program.bytecode
+        self.start = start
+        end = start
+        while end < self.bytecode.lines - 1 and not _ends_block(self.bytecode, end):
+            end += 1
+        self.end = end
+        self.length = end - start + 1
+
+    # -- Operands -----------------------------------------------------------
+
+    def value(self, slot: int) -> str:
+        if slot < REGISTER_COUNT:
+            self.program.registers.add(slot)
+            return f"r{slot}"
+        constant = self.bytecode.constants[slot - REGISTER_COUNT]
+        if math.isfinite(constant):
+            return repr(constant) if constant >= 0 else f"({constant!r})"
+        return f"m[{slot}]"  # inf/nan have no literal
+
+    def register(self, slot: int) -> str:
+        self.program.registers.add(slot)
+        self.program.written.add(slot)
+        return f"r{slot}"
+
+    def operands(self, signature: str, args: tuple) -> Optional[list[str]]:
+        """Rendered operands, or None if the line must call its handler."""
+        rendered = []
+        for letter, arg in zip(signature, args):
+            if letter == "r":
+                rendered.append(self.register(arg))
+            elif letter in "vma":
+                rendered.append(self.value(arg))
+            elif letter == "d":
+                if isinstance(arg, tuple):
+                    rendered.append(f"_pin({self.value(arg[2])})")
+                else:
+                    rendered.append(str(arg))
+            elif isinstance(arg, str):  # t: a logic type name
+                rendered.append(repr(arg))
+            else:
+                return None  # numeric logic type
+        return rendered
+
+    # -- Lines --------------------------------------------------------------
+
+    def _call(self, pc: int, out: list[str]) -> str:
+        """Call a line's own handler with the registers flushed to memory."""
+        self.program.namespace[f"h{pc}"] = self.bytecode.handlers[pc]
+        self.program.namespace[f"a{pc}"] = self.bytecode.args[pc]
+        out += [f"i = {pc}", "FLUSH", "calling = True"]
+        return f"h{pc}(chip, m, a{pc})"
+
+    def _device(self, pin: str, out: list[str]) -> None:
+        """Fetch the device on `pin` into `d`, faulting like Chip.device."""
+        if pin.isdigit():
+            out.append(f"d = pins[{pin}]")
+            message = f'"Device d{pin} not set"'
+        else:
+            out += [f"p = {pin}", "d = pins[p]"]
+            message = 'f"Device d{p} not set"'
+        out += ["if d is None:", f"    raise ChipError({message})"]
+
+    def _statement(self, pc: int, out: list[str]) -> None:
+        handler, args = _line(self.bytecode, pc)
+        if handler is _nop:
+            return
+        entry = _STATEMENT_OF.get(handler)
+        operands = None
+        if entry is not None:
+            op, template, risky = entry
+            operands = self.operands(HANDLERS[op][1], args)
+        if operands is None:
+            out.append(self._call(pc, out))
+            out += ["RELOAD", "calling = False"]
+            return
+        if risky or "_pin(" in "".join(operands):
+            out.append(f"i = {pc}")
+        if op in _DEVICE_OPS:
+            self._device(operands[HANDLERS[op][1].index("d")], out)
+        out.append(template.format(*operands))
+
+    def _target(self, pc: int, relative: bool, slot: int) -> tuple[Optional[int], str]:
+        """(constant address or None, expression computing the address)."""
+        if slot >= REGISTER_COUNT:
+            constant = self.bytecode.constants[slot - REGISTER_COUNT]
+            if math.isfinite(constant):
+                address = int(pc + constant) if relative else int(constant)
+                if address >= 0:
+                    return address, str(address)
+        value = self.value(slot)
+        return None, f"_address({pc} + {value})" if relative else f"_address({value})"
+
+    def source(self) -> list[str]:
+        """The block's statements, each path ending in `continue` or `break`.
+
+        Runs inside the program's dispatch loop: `pc` names the next line,
+        `done` counts the steps taken and `stop` is set on a pause.
+        """
+        last = self.end
+        terminator = _ends_block(self.bytecode, last)
+        body: list[str] = [f"b = {self.start}"]
+        for pc in range(self.start, last if terminator else last + 1):
+            self._statement(pc, body)
+
+        handler, args = _line(self.bytecode, last)
+        branch = _BRANCH_OF.get(handler) if terminator else None
+        count = f"done += {self.length}"
+        fall_through = [count, f"pc = {last + 1}"]
+        if not terminator:
+            return self._guarded(body + fall_through + ["continue"])
+        if branch is None and handler in _STOPS:
+            if handler is HANDLERS["sleep"][0]:
+                body.append(f"chip.sleep_seconds = {self.value(args[0])}")
+            return self._guarded(body + fall_through + [f"stop = {_STOPS[handler]}", "break"])
+        if branch is None:  # wrapped or indirect branch: let the handler decide
+            body.append(f"t = {self._call(last, body)}")
+            body += [
+                "RELOAD",
+                "calling = False",
+                count,
+                "if t is None:",
+                f"    pc = {last + 1}",
+                "elif t >= 0:",
+                "    pc = t",
+                "else:",
+                f"    pc = {last + 1}",
+                "    stop = t",
+                "    break",
+                "continue",
+            ]
+            return self._guarded(body)
+
+        op, test, link, relative = branch
+        signature = HANDLERS[op][1]
+        condition = None
+        if test is not None:
+            condition = test.format(*self.operands(signature[:-1], args[:-2]))
+            if "_pin(" in condition:
+                body.append(f"i = {last}")
+        taken: list[str] = []
+        if link:
+            taken.append(f"{self.register(RA)} = {float(last + 1)!r}")
+        constant, address = self._target(last, relative, args[-2])
+        if constant == self.start:  # a loop: stay in this block while it fits
+            loop = body[1:]
+            if condition is not None:
+                loop.append(f"if not ({condition}):")
+                loop += [f"    {line}" for line in fall_through + ["break"]]
+            loop += taken + [count]
+            return [
+                body[0],
+                f"while done + {self.length} <= limit:",
+                *(f"    {line}" for line in loop),
+                "else:",
+                "    break",
+                "continue",
+            ]
+        if constant is None:
+            taken.append(f"i = {last}")
+        taken.append(f"pc = {address}")
+        if condition is None:
+            return self._guarded(body + taken + [count, "continue"])
+        return self._guarded(
+            body
+            + [f"if {condition}:", *(f"    {line}" for line in taken + [count])]
+            + ["else:", *(f"    {line}" for line in fall_through)]
+            + ["continue"]
+        )
+
+    def _guarded(self, lines: list[str]) -> list[str]:
+        """Leave the program function if the block does not fit the budget."""
+        return [f"if done + {self.length} > limit:", "    break", *lines]
+
+
+# =============================================================================
+# Programs
+# =============================================================================
+
+
+class JitProgram:
+    """One compiled function for a program, shared by every chip running it.
+
+    Every block (entry line, line after a branch or pause, constant jump
+    target) becomes a case of a binary dispatch on `pc` inside a loop, so
+    branches chain to the next block without leaving the function. The
+    function returns `(pc, steps, stop)` when the chip pauses, the next
+    block would exceed the step budget, or a computed jump lands on a line
+    that starts no block.
+    """
+
+    def __init__(self, bytecode: Bytecode):
+        self.bytecode = bytecode
+        self.count = bytecode.lines
+        self.namespace = dict(_GLOBALS)
+        self.registers: set[int] = set()  # read or written anywhere
+        self.written: set[int] = set()
+        starts = sorted(self._leaders()) if self.count else []
+        self.blocks = len(starts)
+        self.leaders = [False] * self.count
+        for start in starts:
+            self.leaders[start] = True
+        self.source = self._source(starts)
+        code = compile(self.source, f"<ic10 program {program_digest(bytecode)[:12]}>", "exec")
+        exec(code, self.namespace)
+        self.function: Callable = self.namespace["program"]
+        # CPython specializes a function's bytecode after its first few
+        # calls; make them here (pc -1 starts no block) so a chip's first
+        # long loop does not run unspecialized
+        scratch = Chip(bytecode)
+        for _ in range(_WARMUP_CALLS):
+            self.function(scratch, scratch.memory, -1, 0)
+
+    def _leaders(self) -> set[int]:
+        leaders = {0}
+        for pc in range(self.count):
+            if not _ends_block(self.bytecode, pc):
+                continue
+            if pc + 1 < self.count:
+                leaders.add(pc + 1)
+            handler, args = _line(self.bytecode, pc)
+            branch = _BRANCH_OF.get(handler)
+            if branch is not None:
+                slot = args[-2]
+                if slot >= REGISTER_COUNT:
+                    constant = self.bytecode.constants[slot - REGISTER_COUNT]
+                    if math.isfinite(constant):
+                        address = int(pc + constant) if branch[3] else int(constant)
+                        if 0 <= address < self.count:
+                            leaders.add(address)
+        return leaders
+
+    def _dispatch(self, cases: list[tuple[int, list[str]]]) -> list[str]:
+        """Binary search on `pc` over (start, block lines) cases."""
+        if len(cases) <= 2:
+            lines = []
+            for start, block in cases:
+                lines.append(f"if pc == {start}:")
+                lines += [f"    {line}" for line in block]
+            return lines
+        middle = len(cases) // 2
+        return [
+            f"if pc < {cases[middle][0]}:",
+            *(f"    {line}" for line in self._dispatch(cases[:middle])),
+            "else:",
+            *(f"    {line}" for line in self._dispatch(cases[middle:])),
+        ]
+
+    def _source(self, starts: list[int]) -> str:
+        cases = [(start, _Block(self, start).source()) for start in starts]
+        flush = [f"m[{r}] = r{r}" for r in sorted(self.written)] or ["pass"]
+        reload = [f"r{r} = m[{r}]" for r in sorted(self.registers)]
+        lines = ["def program(chip, m, pc, limit):"]
+        lines += [f"    {line}" for line in reload]
+        lines += [
+            "    pins = chip.pins",
+            "    done = stop = i = b = 0",
+            "    calling = False",
+            "    try:",
+            "        while True:",
+            *(f"            {line}" for line in self._dispatch(cases)),
+            "            break",
+            "    except _FAULTS as e:",
+            "        if not calling:  # a failed handler may have written m",
+            "            FLUSH",
+            "        raise _Fault(i, done + i - b + 1, e) from None",
+            "    FLUSH",
+            "    return pc, done, stop",
+        ]
+        out = []
+        for line in lines:
+            stripped = line.strip()
+            if stripped in ("FLUSH", "RELOAD"):
+                prefix = line[: len(line) - len(stripped)]
+                out += [prefix + text for text in (flush if stripped == "FLUSH" else reload)]
+            else:
+                out.append(line)
+        return "\n".join(out) + "\n"
+
+
+_programs: "OrderedDict[str, JitProgram]" = OrderedDict()
+_by_id: dict[int, tuple[Bytecode, JitProgram]] = {}
+
+
+def program_digest(bytecode: Bytecode) -> str:
+    """SHA-256 over opcodes, operands, constants and handlers of a program."""
+    digest = hashlib.sha256(bytecode.ops.tobytes())
+    digest.update(repr(bytecode.args).encode())
+    digest.update(repr(bytecode.constants).encode())
+    digest.update(repr([id(handler) for handler in bytecode.handlers]).encode())
+    return digest.hexdigest()
+
+
+def translate(bytecode: Bytecode) -> JitProgram:
+    """The (cached) block translation of a program."""
+    known = _by_id.get(id(bytecode))
+    if known is not None and known[0] is bytecode:
+        return known[1]
+    key = program_digest(bytecode)
+    program = _programs.get(key)
+    if program is None:
+        program = _programs[key] = JitProgram(bytecode)
+        while len(_programs) > CACHE_SIZE:
+            _, evicted = _programs.popitem(last=False)
+            _by_id.pop(id(evicted.bytecode), None)
+    else:
+        _programs.move_to_end(key)
+    if len(_by_id) > CACHE_SIZE * 4:
+        _by_id.clear()
+    _by_id[id(bytecode)] = (bytecode, program)
+    return program
+
+
+def clear_cache() -> None:
+    _programs.clear()
+    _by_id.clear()
+
+
+# =============================================================================
+# Chip
+# =============================================================================
+
+
+class JitChip(Chip):
+    """A Chip that runs translated blocks instead of one handler per line."""
+
+    def __init__(self, bytecode: Bytecode, seed: int = 0):
+        super().__init__(bytecode, seed)
+        self.program = translate(bytecode)
+
+    def fork(self) -> "JitChip":
+        child = super().fork()
+        child.program = self.program
+        return child
+
+    def run(self, max_steps: int = 1_000_000) -> str:
+        """Execute until the chip yields, sleeps, stops or uses max_steps."""
+        program = self.program
+        if program.bytecode is not self.bytecode:  # bytecode swapped since
+            program = self.program = translate(self.bytecode)
+        function = program.function
+        leaders = program.leaders
+        handlers = self.bytecode.handlers
+        args = self.bytecode.args
+        memory = self.memory
+        count = program.count
+        pc = self.pc
+        steps = 0
+        status = LIMIT
+        try:
+            while steps < max_steps:
+                if pc >= count:
+                    status = END
+                    break
+                if leaders[pc]:
+                    pc, done, stop = function(self, memory, pc, max_steps - steps)
+                    steps += done
+                    if stop:
+                        status = YIELD if stop == _YIELD else SLEEP if stop == _SLEEP else HALT
+                        break
+                    if done:
+                        continue
+                # the next block does not fit, or a computed jump left the blocks
+                target = handlers[pc](self, memory, args[pc])
+                steps += 1
+                if target is None:
+                    pc += 1
+                elif target >= 0:
+                    pc = target
+                else:
+                    pc += 1
+                    status = YIELD if target == _YIELD else SLEEP if target == _SLEEP else HALT
+                    break
+        except _Fault as fault:
+            steps += fault.steps
+            pc = fault.line
+            status = ERROR
+            self.error = f"Line {pc + 1}: {fault.error}"
+        except _FAULTS as e:
+            steps += 1
+            status = ERROR
+            self.error = f"Line {pc + 1}: {e}"
+        self.pc = pc
+        self.steps += steps
+        self.status = status
+        return status
@@ -0,0 +1,869 @@
+"""NumPy lockstep execution of one IC10 program across thousands of chips.
+
+Every copy runs the same Bytecode from tools.ic10_emulator with its own
+state: registers are a [chips, 18] float64 array, the stack is
+[chips, 512], and device logic values are columnar arrays per logic type
+([chips, pins] for d0-d5/db, [chips, devices] for the batch network).
+
+Each step picks the lowest program counter among running chips and
+executes that one instruction for every chip sitting on it, as a vector
+operation. Branches are masked: each chip gets its own next address from
+np.where, and chips that diverge wait until the schedule reaches their line
+again. Cost per step is a handful of array operations, so throughput grows
+with the number of chips that share a line instead of with Python loops.
+
+    sim = LockstepChips(compile_program(code), chips=10_000)
+    sim.attach(0, {"Temperature": np.linspace(250, 350, 10_000)})
+    sim.run(10_000)
+    sim.registers[:, 0]
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+from .ic10_emulator import (
+    _CONDITIONS,
+    DB,
+    ERROR,
+    END,
+    HALT,
+    LIMIT,
+    OPCODES,
+    PIN_COUNT,
+    RA,
+    REGISTER_COUNT,
+    SLEEP,
+    SP,
+    STACK_SIZE,
+    YIELD,
+    Bytecode,
+    CompileError,
+    _indirect,
+    compile_program,
+)
+
+# Per-chip status codes
+RUNNING = 0
+STATUS_NAMES = ("running", YIELD, SLEEP, HALT, END, ERROR, LIMIT)
+_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+# Instructions with no lockstep implementation (reagents, and devices by ReferenceId)
+UNSUPPORTED = frozenset({"lr", "sr", "ld", "sd", "getd", "putd"})
+
+
+class LockstepChips:
+    """Many copies of one program stepped together over NumPy arrays."""
+
+    def __init__(
+        self, bytecode: Bytecode, chips: int, seed: int = 0, max_slots: int = 16
+    ):
+        self.bytecode = bytecode
+        self.chips = chips
+        self.max_slots = max_slots
+        self.code = _vectorize(bytecode)
+
+        self.registers = np.zeros((chips, REGISTER_COUNT))
+        self.constants = np.asarray(bytecode.constants, dtype=np.float64)
+        self.stack = np.zeros((chips, STACK_SIZE))
+        self.pc = np.zeros(chips, dtype=np.int64)
+        self.status = np.full(chips, RUNNING, dtype=np.int8)
+        self.steps = np.zeros(chips, dtype=np.int64)
+        self.sleep_seconds = np.zeros(chips)
+        self.errors: dict[int, str] = {}
+        self.rng = np.random.default_rng(seed)
+
+        # Device pins d0-d5 plus db; logic arrays are created on first use
+        self.pin_set = np.zeros((chips, PIN_COUNT + 1), dtype=bool)
+        self.pin_set[:, DB] = True
+        self.pin_logic: dict[str, np.ndarray] = {}
+        self.pin_slot_count = np.zeros((chips, PIN_COUNT + 1), dtype=np.int64)
+        self.pin_slot_logic: dict[str, np.ndarray] = {}
+
+        # Batch network: shared topology, per-chip values
+        self.network_prefab = np.zeros(0, dtype=np.int64)
+        self.network_name = np.zeros(0, dtype=np.int64)
+        self.network_slot_count = np.zeros(0, dtype=np.int64)
+        self.network_logic: dict[str, np.ndarray] = {}
+        self.network_slot_logic: dict[str, np.ndarray] = {}
+
+    # -------------------------------------------------------------------------
+    # Devices
+    # -------------------------------------------------------------------------
+
+    def pin_values(self, logic_type: str) -> np.ndarray:
+        """[chips, pins] values of one logic type (zeros until written)."""
+        values = self.pin_logic.get(logic_type)
+        if values is None:
+            values = self.pin_logic[logic_type] = np.zeros(self.pin_set.shape)
+        return values
+
+    def network_values(self, logic_type: str) -> np.ndarray:
+        """[chips, devices] values of one logic type on the batch network."""
+        values = self.network_logic.get(logic_type)
+        if values is None:
+            values = np.zeros((self.chips, len(self.network_prefab)))
+            self.network_logic[logic_type] = values
+        return values
+
+    def pin_slot_values(self, logic_type: str) -> np.ndarray:
+        """[chips, pins, max_slots] slot values of one logic type."""
+        values = self.pin_slot_logic.get(logic_type)
+        if values is None:
+            values = np.zeros((*self.pin_set.shape, self.max_slots))
+            self.pin_slot_logic[logic_type] = values
+        return values
+
+    def network_slot_values(self, logic_type: str) -> np.ndarray:
+        """[chips, devices, max_slots] slot values on the batch network."""
+        values = self.network_slot_logic.get(logic_type)
+        if values is None:
+            values = np.zeros((self.chips, len(self.network_prefab), self.max_slots))
+            self.network_slot_logic[logic_type] = values
+        return values
+
+    def attach(
+        self,
+        pin: int,
+        logic: Optional[dict[str, Union[float, np.ndarray]]] = None,
+        slots: int = 0,
+    ) -> None:
+        """Connect a device to a pin on every chip; values may be per chip."""
+        self.pin_set[:, pin] = True
+        self.pin_slot_count[:, pin] = min(slots, self.max_slots)
+        for logic_type, value in (logic or {}).items():
+            self.pin_values(logic_type)[:, pin] = value
+
+    def add_network_device(
+        self,
+        prefab_hash: int,
+        name_hash: int = 0,
+        logic: Optional[dict[str, Union[float, np.ndarray]]] = None,
+        slots: int = 0,
+    ) -> int:
+        """Add a device to every chip's batch network; returns its column."""
+        column = len(self.network_prefab)
+        self.network_prefab = np.append(self.network_prefab, prefab_hash)
+        self.network_name = np.append(self.network_name, name_hash)
+        self.network_slot_count = np.append(
+            self.network_slot_count, min(slots, self.max_slots)
+        )
+        for logic_type, values in self.network_logic.items():
+            self.network_logic[logic_type] = np.hstack(
+                [values, np.zeros((self.chips, 1))]
+            )
+        for logic_type, values in self.network_slot_logic.items():
+            self.network_slot_logic[logic_type] = np.concatenate(
+                [values, np.zeros((self.chips, 1, self.max_slots))], axis=1
+            )
+        for logic_type, value in (logic or {}).items():
+            self.network_values(logic_type)[:, column] = value
+        return column
+
+    # -------------------------------------------------------------------------
+    # Operand access
+    # -------------------------------------------------------------------------
+
+    def read(self, idx: np.ndarray, slot: Union[int, tuple]) -> Union[float, np.ndarray]:
+        """Values of a register/constant operand for the chips in idx."""
+        if isinstance(slot, tuple):
+            return self.registers[idx, self._indirect(idx, slot)]
+        if slot < REGISTER_COUNT:
+            return self.registers[idx, slot]
+        return self.constants[slot - REGISTER_COUNT]
+
+    def write(self, idx: np.ndarray, slot: Union[int, tuple], values) -> None:
+        """Store values into a register operand for the chips in idx."""
+        if isinstance(slot, tuple):
+            self.registers[idx, self._indirect(idx, slot)] = values
+        else:
+            self.registers[idx, slot] = values
+
+    def pins(self, idx: np.ndarray, pin: Union[int, tuple]) -> Union[int, np.ndarray]:
+        """Pin index (or per-chip indices) of a device operand."""
+        if isinstance(pin, tuple):
+            return self._indirect(idx, pin)
+        return pin
+
+    def _indirect(self, idx: np.ndarray, spec: tuple) -> np.ndarray:
+        """Per-chip register (or pin) index of an rr*/dr* operand."""
+        kind, depth, index = spec
+        index = np.full(len(idx), index, dtype=np.int64)
+        limit = PIN_COUNT if kind == "d" else REGISTER_COUNT
+        for _ in range(depth + (kind == "d")):
+            index = self.registers[idx, index].astype(np.int64)
+            bad = (index < 0) | (index >= REGISTER_COUNT)
+            if bad.any():
+                index[bad] = 0
+                self.fault(idx[bad], "Register index out of range")
+        if kind == "d":
+            bad = index >= limit
+            if bad.any():
+                index[bad] = 0
+                self.fault(idx[bad], "Device index out of range")
+        return index
+
+    def fault(self, idx: np.ndarray, message: str) -> None:
+        """Stop chips with a runtime error (they skip the rest of the step)."""
+        for chip in idx.tolist():
+            if chip not in self.errors:
+                self.errors[chip] = f"Line {self.pc[chip] + 1}: {message}"
+        self.status[idx] = _CODES[ERROR]
+
+    # -------------------------------------------------------------------------
+    # Execution
+    # -------------------------------------------------------------------------
+
+    def run(self, max_steps: int = 1_000_000) -> Counter:
+        """Run every chip until it yields, sleeps, stops or uses max_steps.
+
+        Yielded, sleeping and out-of-budget chips resume; returns a
+        status -> count Counter.
+        """
+        status = self.status
+        status[np.isin(status, (_CODES[YIELD], _CODES[SLEEP], _CODES[LIMIT]))] = RUNNING
+        count = len(self.code)
+        budget = self.steps + max_steps
+        pc = self.pc
+        code = self.code
+
+        with np.errstate(all="ignore"):
+            while True:
+                running = status == RUNNING
+                if not running.any():
+                    break
+                done = running & (pc >= count)
+                if done.any():
+                    status[done] = _CODES[END]
+                    continue
+                spent = running & (self.steps >= budget)
+                if spent.any():
+                    status[spent] = _CODES[LIMIT]
+                    continue
+
+                line = int(pc[running].min())
+                idx = np.flatnonzero(running & (pc == line))
+                handler, args = code[line]
+                next_pc = handler(self, idx, args)
+                self.steps[idx] += 1
+
+                # Chips that faulted keep their pc at the failing line
+                ok = status[idx] != _CODES[ERROR]
+                if next_pc is None:
+                    pc[idx[ok]] = line + 1
+                else:
+                    next_pc = np.broadcast_to(next_pc, idx.shape)
+                    pc[idx[ok]] = next_pc[ok]
+
+        return self.statuses()
+
+    def statuses(self) -> Counter:
+        """Status name -> number of chips."""
+        counts = np.bincount(self.status, minlength=len(STATUS_NAMES))
+        return Counter({STATUS_NAMES[code]: int(n) for code, n in enumerate(counts) if n})
+
+
+# =============================================================================
+# Vector Handlers
+# =============================================================================
+# Each handler takes (sim, idx, args) with idx the chips on this line and
+# returns None (next line) or the next address per chip.
+
+VectorHandler = Callable[[LockstepChips, np.ndarray, tuple], Optional[np.ndarray]]
+
+
+def _targets(sim: LockstepChips, idx: np.ndarray, target, relative_to=None) -> np.ndarray:
+    """Validated jump addresses for the chips in idx."""
+    address = sim.read(idx, target)
+    if relative_to is not None:
+        address = relative_to + address
+    address = np.broadcast_to(address, idx.shape)
+    valid = np.isfinite(address) & (address >= 0)
+    if not valid.all():
+        sim.fault(idx[~valid], "Jump to invalid address")
+        address = np.where(valid, address, 0)
+    return address.astype(np.int64)
+
+
+def _nop(sim, idx, a):
+    return None
+
+
+def _move(sim, idx, a):
+    sim.write(idx, a[0], sim.read(idx, a[1]))
+
+
+def _binary(function: Callable) -> VectorHandler:
+    def handler(sim, idx, a):
+        sim.write(idx, a[0], function(sim.read(idx, a[1]), sim.read(idx, a[2])))
+
+    return handler
+
+
+def _unary(function: Callable) -> VectorHandler:
+    def handler(sim, idx, a):
+        sim.write(idx, a[0], function(sim.read(idx, a[1])))
+
+    return handler
+
+
+def _compare(function: Callable) -> VectorHandler:
+    def handler(sim, idx, a):
+        sim.write(idx, a[0], function(sim.read(idx, a[1]), sim.read(idx, a[2])) * 1.0)
+
+    return handler
+
+
+def _compare_zero(function: Callable) -> VectorHandler:
+    def handler(sim, idx, a):
+        sim.write(idx, a[0], function(sim.read(idx, a[1]), 0.0) * 1.0)
+
+    return handler
+
+
+def _approx(a, b, c):
+    a = np.asarray(a, dtype=np.float64)
+    return np.abs(a - b) <= np.maximum(
+        c * np.maximum(np.abs(a), np.abs(b)), 8 * 1.401298464324817e-45
+    )
+
+
+def _int64(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64).astype(np.int64)
+
+
+def _bitwise(function: Callable) -> VectorHandler:
+    def handler(sim, idx, a):
+        result = function(_int64(sim.read(idx, a[1])), _int64(sim.read(idx, a[2])))
+        sim.write(idx, a[0], result.astype(np.float64))
+
+    return handler
+
+
+def _shift(left: bool, logical: bool) -> VectorHandler:
+    def handler(sim, idx, a):
+        value = _int64(sim.read(idx, a[1]))
+        amount = np.broadcast_to(_int64(sim.read(idx, a[2])), np.shape(value) or idx.shape)
+        clipped = np.clip(amount, 0, 63)
+        if left:
+            result = np.left_shift(value, clipped)
+        elif logical:
+            result = np.right_shift(value.view(np.uint64), clipped.astype(np.uint64)).view(
+                np.int64
+            )
+        else:
+            result = np.right_shift(value, clipped)
+        if left or logical:
+            result = np.where(amount >= 64, 0, result)
+        sim.write(idx, a[0], result.astype(np.float64))
+
+    return handler
+
+
+def _not(sim, idx, a):
+    sim.write(idx, a[0], np.invert(_int64(sim.read(idx, a[1]))).astype(np.float64))
+
+
+def _rand(sim, idx, a):
+    sim.write(idx, a[0], sim.rng.random(len(idx)))
+
+
+def _select(sim, idx, a):
+    condition = sim.read(idx, a[1]) != 0
+    sim.write(idx, a[0], np.where(condition, sim.read(idx, a[2]), sim.read(idx, a[3])))
+
+
+def _sap(sim, idx, a):
+    sim.write(
+        idx, a[0], _approx(sim.read(idx, a[1]), sim.read(idx, a[2]), sim.read(idx, a[3])) * 1.0
+    )
+
+
+def _sna(sim, idx, a):
+    sim.write(
+        idx, a[0], ~_approx(sim.read(idx, a[1]), sim.read(idx, a[2]), sim.read(idx, a[3])) * 1.0
+    )
+
+
+def _sapz(sim, idx, a):
+    sim.write(idx, a[0], _approx(sim.read(idx, a[1]), 0.0, sim.read(idx, a[2])) * 1.0)
+
+
+def _snaz(sim, idx, a):
+    sim.write(idx, a[0], ~_approx(sim.read(idx, a[1]), 0.0, sim.read(idx, a[2])) * 1.0)
+
+
+def _sdse(sim, idx, a):
+    sim.write(idx, a[0], sim.pin_set[idx, sim.pins(idx, a[1])] * 1.0)
+
+
+def _sdns(sim, idx, a):
+    sim.write(idx, a[0], ~sim.pin_set[idx, sim.pins(idx, a[1])] * 1.0)
+
+
+# --- Branching ---------------------------------------------------------------
+
+
+def _j(sim, idx, a):
+    return _targets(sim, idx, a[0])
+
+
+def _jr(sim, idx, a):
+    return _targets(sim, idx, a[0], relative_to=a[1])
+
+
+def _jal(sim, idx, a):
+    sim.registers[idx, RA] = a[1] + 1
+    return _targets(sim, idx, a[0])
+
+
+def _branch(test: Callable, arity: int, link: bool, relative: bool) -> VectorHandler:
+    """Masked conditional branch: each chip jumps or falls through."""
+
+    def handler(sim, idx, a):
+        line = a[arity + 1]
+        taken = np.broadcast_to(
+            test(*(sim.read(idx, slot) for slot in a[:arity])), idx.shape
+        )
+        if not taken.any():
+            return None
+        target = _targets(sim, idx, a[arity], relative_to=line if relative else None)
+        if link:
+            sim.registers[idx[taken], RA] = line + 1
+        return np.where(taken, target, line + 1)
+
+    return handler
+
+
+def _device_branch(is_set: bool, link: bool, relative: bool) -> VectorHandler:
+    def handler(sim, idx, a):
+        line = a[2]
+        taken = sim.pin_set[idx, sim.pins(idx, a[0])] == is_set
+        if not taken.any():
+            return None
+        target = _targets(sim, idx, a[1], relative_to=line if relative else None)
+        if link:
+            sim.registers[idx[taken], RA] = line + 1
+        return np.where(taken, target, line + 1)
+
+    return handler
+
+
+def _pause(code: str) -> VectorHandler:
+    def handler(sim, idx, a):
+        if a:
+            sim.sleep_seconds[idx] = sim.read(idx, a[0])
+        sim.status[idx] = _CODES[code]  # pc still advances in run()
+
+    return handler
+
+
+# --- Stack -------------------------------------------------------------------
+
+
+def _stack_index(
+    sim, idx, index, message: str
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Chips in idx with a valid stack index, those indices, and the mask.
+
+    Chips with an out-of-range index are faulted.
+    """
+    index = np.broadcast_to(_int64(index), idx.shape)
+    valid = (index >= 0) & (index < STACK_SIZE)
+    if not valid.all():
+        sim.fault(idx[~valid], message)
+    return idx[valid], index[valid], valid
+
+
+def _push(sim, idx, a):
+    values = np.broadcast_to(sim.read(idx, a[0]), idx.shape)
+    ok, index, valid = _stack_index(sim, idx, sim.registers[idx, SP], "Stack overflow")
+    sim.stack[ok, index] = values[valid]
+    sim.registers[ok, SP] = index + 1
+
+
+def _pop(sim, idx, a):
+    ok, index, _ = _stack_index(sim, idx, sim.registers[idx, SP] - 1, "Stack underflow")
+    sim.registers[ok, SP] = index
+    sim.write(ok, a[0], sim.stack[ok, index])
+
+
+def _peek(sim, idx, a):
+    ok, index, _ = _stack_index(sim, idx, sim.registers[idx, SP] - 1, "Stack underflow")
+    sim.write(ok, a[0], sim.stack[ok, index])
+
+
+def _poke(sim, idx, a):
+    address, values = sim.read(idx, a[0]), sim.read(idx, a[1])
+    values = np.broadcast_to(values, idx.shape)
+    ok, index, valid = _stack_index(sim, idx, address, "Stack index out of range")
+    sim.stack[ok, index] = values[valid]
+
+
+def _get(sim, idx, a):
+    ok, index, _ = _stack_index(sim, idx, sim.read(idx, a[2]), "Stack index out of range")
+    sim.write(ok, a[0], sim.stack[ok, index])
+
+
+def _put(sim, idx, a):
+    values = np.broadcast_to(sim.read(idx, a[2]), idx.shape)
+    ok, index, valid = _stack_index(sim, idx, sim.read(idx, a[1]), "Stack index out of range")
+    sim.stack[ok, index] = values[valid]
+
+
+# --- Device logic ------------------------------------------------------------
+
+
+def _logic_type(sim, idx, name) -> str:
+    """Logic type name; numeric ones are taken from the first chip."""
+    if isinstance(name, str):
+        return name
+    return str(int(np.broadcast_to(sim.read(idx, name), idx.shape)[0]))
+
+
+def _connected(sim, idx, pin) -> tuple[np.ndarray, Union[int, np.ndarray]]:
+    """Chips in idx whose pin is set; faults the others."""
+    pins = sim.pins(idx, pin)
+    connected = sim.pin_set[idx, pins]
+    if not connected.all():
+        sim.fault(idx[~connected], "Device not set")
+        if not isinstance(pins, int):
+            pins = pins[connected]
+    return idx[connected], pins
+
+
+def _l(sim, idx, a):
+    ok, pins = _connected(sim, idx, a[1])
+    sim.write(ok, a[0], sim.pin_values(_logic_type(sim, idx, a[2]))[ok, pins])
+
+
+def _s(sim, idx, a):
+    values = np.broadcast_to(sim.read(idx, a[2]), idx.shape)
+    connected = sim.pin_set[idx, sim.pins(idx, a[0])]
+    ok, pins = _connected(sim, idx, a[0])
+    sim.pin_values(_logic_type(sim, idx, a[1]))[ok, pins] = values[connected]
+
+
+def _slot_index(sim, idx, slot, counts) -> tuple[np.ndarray, np.ndarray]:
+    """Per-chip slot index and whether it exists (reads 0, writes ignored)."""
+    index = np.broadcast_to(_int64(sim.read(idx, slot)), idx.shape)
+    valid = (index >= 0) & (index < counts)
+    return np.where(valid, index, 0), valid
+
+
+def _ls(sim, idx, a):
+    ok, pins = _connected(sim, idx, a[1])
+    index, valid = _slot_index(sim, ok, a[2], sim.pin_slot_count[ok, pins])
+    values = sim.pin_slot_values(_logic_type(sim, idx, a[3]))[ok, pins, index]
+    sim.write(ok, a[0], np.where(valid, values, 0.0))
+
+
+def _ss(sim, idx, a):
+    connected = sim.pin_set[idx, sim.pins(idx, a[0])]
+    values = np.broadcast_to(sim.read(idx, a[3]), idx.shape)[connected]
+    ok, pins = _connected(sim, idx, a[0])
+    index, valid = _slot_index(sim, ok, a[1], sim.pin_slot_count[ok, pins])
+    slots = sim.pin_slot_values(_logic_type(sim, idx, a[2]))
+    pins = np.broadcast_to(pins, ok.shape)
+    slots[ok[valid], pins[valid], index[valid]] = values[valid]
+
+
+def _matches(sim, idx, prefab_slot, name_slot=None) -> np.ndarray:
+    """[len(idx), devices] mask of network devices matching the hashes."""
+    prefab = np.broadcast_to(sim.read(idx, prefab_slot), idx.shape)[:, None]
+    mask = sim.network_prefab[None, :] == prefab
+    if name_slot is not None:
+        name = np.broadcast_to(sim.read(idx, name_slot), idx.shape)[:, None]
+        mask &= sim.network_name[None, :] == name
+    return mask
+
+
+def _aggregate(values: np.ndarray, mask: np.ndarray, modes) -> np.ndarray:
+    """Per-chip batch aggregate of the masked columns (0 when none match)."""
+    count = mask.sum(axis=1)
+    total = np.where(mask, values, 0.0).sum(axis=1)
+    modes = np.broadcast_to(_int64(modes), count.shape)
+    result = np.select(
+        [modes == 0, modes == 1, modes == 2, modes == 3],
+        [
+            total / np.maximum(count, 1),
+            total,
+            np.where(mask, values, np.inf).min(axis=1, initial=np.inf),
+            np.where(mask, values, -np.inf).max(axis=1, initial=-np.inf),
+        ],
+        np.nan,
+    )
+    return np.where(count > 0, result, 0.0)
+
+
+def _lb(sim, idx, a):
+    mask = _matches(sim, idx, a[1])
+    values = sim.network_values(_logic_type(sim, idx, a[2]))[idx]
+    sim.write(idx, a[0], _aggregate(values, mask, sim.read(idx, a[3])))
+
+
+def _lbn(sim, idx, a):
+    mask = _matches(sim, idx, a[1], a[2])
+    values = sim.network_values(_logic_type(sim, idx, a[3]))[idx]
+    sim.write(idx, a[0], _aggregate(values, mask, sim.read(idx, a[4])))
+
+
+def _batch_slots(sim, idx, mask, slot, logic_type) -> tuple[np.ndarray, np.ndarray]:
+    """[len(idx), devices] slot values and mask narrowed to existing slots."""
+    index = np.broadcast_to(_int64(sim.read(idx, slot)), idx.shape)[:, None]
+    mask = mask & (index >= 0) & (index < sim.network_slot_count[None, :])
+    index = np.clip(index, 0, sim.max_slots - 1)
+    values = sim.network_slot_values(logic_type)[idx]  # [n, devices, max_slots]
+    values = np.take_along_axis(values, index[:, :, None], axis=2)[:, :, 0]
+    return values, mask
+
+
+def _lbs(sim, idx, a):
+    mask = _matches(sim, idx, a[1])
+    values, mask = _batch_slots(sim, idx, mask, a[2], _logic_type(sim, idx, a[3]))
+    sim.write(idx, a[0], _aggregate(values, mask, sim.read(idx, a[4])))
+
+
+def _lbns(sim, idx, a):
+    mask = _matches(sim, idx, a[1], a[2])
+    values, mask = _batch_slots(sim, idx, mask, a[3], _logic_type(sim, idx, a[4]))
+    sim.write(idx, a[0], _aggregate(values, mask, sim.read(idx, a[5])))
+
+
+def _store_batch_slots(sim, idx, mask, slot, logic_type, value_slot) -> None:
+    index = np.broadcast_to(_int64(sim.read(idx, slot)), idx.shape)
+    mask = mask & ((index >= 0)[:, None] & (index[:, None] < sim.network_slot_count[None, :]))
+    chips, devices = np.nonzero(mask)
+    new = np.broadcast_to(sim.read(idx, value_slot), idx.shape)
+    sim.network_slot_values(logic_type)[idx[chips], devices, index[chips]] = new[chips]
+
+
+def _sbs(sim, idx, a):
+    mask = _matches(sim, idx, a[0])
+    _store_batch_slots(sim, idx, mask, a[1], _logic_type(sim, idx, a[2]), a[3])
+
+
+def _sbns(sim, idx, a):
+    mask = _matches(sim, idx, a[0], a[1])
+    _store_batch_slots(sim, idx, mask, a[2], _logic_type(sim, idx, a[3]), a[4])
+
+
+def _store_batch(sim, idx, mask, logic_type, value_slot) -> None:
+    values = sim.network_values(logic_type)
+    new = np.broadcast_to(sim.read(idx, value_slot), idx.shape)[:, None]
+    values[idx] = np.where(mask, new, values[idx])
+
+
+def _sb(sim, idx, a):
+    _store_batch(sim, idx, _matches(sim, idx, a[0]), _logic_type(sim, idx, a[1]), a[2])
+
+
+def _sbn(sim, idx, a):
+    _store_batch(sim, idx, _matches(sim, idx, a[0], a[1]), _logic_type(sim, idx, a[2]), a[3])
+
+
+def _round(values):
+    return np.round(values)
+
+
+VECTOR_HANDLERS: dict[str, VectorHandler] = {
+    # math
+    "add": _binary(np.add),
+    "sub": _binary(np.subtract),
+    "mul": _binary(np.multiply),
+    "div": _binary(np.divide),
+    "mod": _binary(np.mod),
+    "abs": _unary(np.abs),
+    "ceil": _unary(np.ceil),
+    "floor": _unary(np.floor),
+    "round": _unary(_round),
+    "trunc": _unary(np.trunc),
+    "sqrt": _unary(np.sqrt),
+    "exp": _unary(np.exp),
+    "log": _unary(np.log),
+    "pow": _binary(np.power),
+    "sin": _unary(np.sin),
+    "cos": _unary(np.cos),
+    "tan": _unary(np.tan),
+    "asin": _unary(np.arcsin),
+    "acos": _unary(np.arccos),
+    "atan": _unary(np.arctan),
+    "atan2": _binary(np.arctan2),
+    "min": _binary(np.minimum),
+    "max": _binary(np.maximum),
+    "rand": _rand,
+    # logic and batch
+    "l": _l,
+    "s": _s,
+    "lb": _lb,
+    "sb": _sb,
+    "lbn": _lbn,
+    "sbn": _sbn,
+    "ls": _ls,
+    "ss": _ss,
+    "lbs": _lbs,
+    "sbs": _sbs,
+    "lbns": _lbns,
+    "sbns": _sbns,
+    # comparison
+    "seq": _compare(np.equal),
+    "sne": _compare(np.not_equal),
+    "sgt": _compare(np.greater),
+    "slt": _compare(np.less),
+    "sge": _compare(np.greater_equal),
+    "sle": _compare(np.less_equal),
+    "seqz": _compare_zero(np.equal),
+    "snez": _compare_zero(np.not_equal),
+    "sgtz": _compare_zero(np.greater),
+    "sltz": _compare_zero(np.less),
+    "sgez": _compare_zero(np.greater_equal),
+    "slez": _compare_zero(np.less_equal),
+    "sap": _sap,
+    "sna": _sna,
+    "sapz": _sapz,
+    "snaz": _snaz,
+    "sdse": _sdse,
+    "sdns": _sdns,
+    "select": _select,
+    # branching
+    "j": _j,
+    "jr": _jr,
+    "jal": _jal,
+    "bdse": _device_branch(True, False, False),
+    "bdns": _device_branch(False, False, False),
+    "bdseal": _device_branch(True, True, False),
+    "bdnsal": _device_branch(False, True, False),
+    "brdse": _device_branch(True, False, True),
+    "brdns": _device_branch(False, False, True),
+    # bitwise
+    "and": _bitwise(np.bitwise_and),
+    "or": _bitwise(np.bitwise_or),
+    "xor": _bitwise(np.bitwise_xor),
+    "nor": _bitwise(lambda x, y: np.invert(np.bitwise_or(x, y))),
+    "not": _not,
+    "sll": _shift(left=True, logical=True),
+    "sla": _shift(left=True, logical=False),
+    "srl": _shift(left=False, logical=True),
+    "sra": _shift(left=False, logical=False),
+    # stack (get/put on db only)
+    "push": _push,
+    "pop": _pop,
+    "peek": _peek,
+    "poke": _poke,
+    "get": _get,
+    "put": _put,
+    # utility
+    "nop": _nop,
+    "alias": _nop,
+    "define": _nop,
+    "label": _nop,
+    "move": _move,
+    "mv": _move,
+    "yield": _pause(YIELD),
+    "sleep": _pause(SLEEP),
+    "hcf": _pause(HALT),
+}
+
+_NUMPY_TESTS: dict[str, Callable] = {
+    "eq": np.equal,
+    "ne": np.not_equal,
+    "gt": np.greater,
+    "lt": np.less,
+    "ge": np.greater_equal,
+    "le": np.less_equal,
+    "eqz": lambda x: np.equal(x, 0),
+    "nez": lambda x: np.not_equal(x, 0),
+    "gtz": lambda x: np.greater(x, 0),
+    "ltz": lambda x: np.less(x, 0),
+    "gez": lambda x: np.greater_equal(x, 0),
+    "lez": lambda x: np.less_equal(x, 0),
+    "ap": _approx,
+    "na": lambda x, y, c: ~_approx(x, y, c),
+    "apz": lambda x, c: _approx(x, 0.0, c),
+    "naz": lambda x, c: ~_approx(x, 0.0, c),
+}
+for _condition, (_, _arity) in _CONDITIONS.items():
+    for _prefix, _suffix, _link, _relative in (
+        ("b", "", False, False),
+        ("b", "al", True, False),
+        ("br", "", False, True),
+    ):
+        _opcode = f"{_prefix}{_condition}{_suffix}"
+        if _opcode in OPCODES:
+            VECTOR_HANDLERS[_opcode] = _branch(
+                _NUMPY_TESTS[_condition], _arity, _link, _relative
+            )
+
+
+def _vectorize(bytecode: Bytecode) -> list[tuple[VectorHandler, tuple]]:
+    """Per-line (vector handler, operand tuple) for a compiled program."""
+    code = []
+    for line, (op, args, handler) in enumerate(
+        zip(bytecode.ops, bytecode.args, bytecode.handlers), 1
+    ):
+        name = OPCODES[op]
+        if handler is _indirect:
+            args = args[1]
+        if name in UNSUPPORTED or (
+            name in ("get", "put") and args[1 if name == "get" else 0] != DB
+        ):
+            raise CompileError(line, f"'{name}' is not supported in lockstep mode")
+        code.append((VECTOR_HANDLERS[name], args))
+    return code
+
+
+# =============================================================================
+# CLI Interface
+# =============================================================================
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description="Run many copies of an IC10 script in NumPy lockstep"
+    )
+    parser.add_argument("file", type=Path, help="Path to IC10 file to run")
+    parser.add_argument("--chips", type=int, default=1000, help="Copies to run")
+    parser.add_argument("--ticks", type=int, default=1, help="Yields to run through")
+    parser.add_argument(
+        "--max-steps", type=int, default=10_000, help="Instruction budget per tick"
+    )
+    parser.add_argument(
+        "--devices", action="store_true", help="Attach a device to every pin (d0-d5)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for rand")
+    args = parser.parse_args()
+
+    try:
+        bytecode = compile_program(args.file.read_text(encoding="utf-8"))
+        sim = LockstepChips(bytecode, args.chips, args.seed)
+    except (OSError, CompileError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if args.devices:
+        for pin in range(PIN_COUNT):
+            sim.attach(pin)
+
+    start = time.perf_counter()
+    statuses: Counter = Counter()
+    for _ in range(args.ticks):
+        statuses = sim.run(args.max_steps)
+        if not statuses[YIELD] and not statuses[SLEEP]:
+            break
+    elapsed = time.perf_counter() - start
+
+    steps = int(sim.steps.sum())
+    print(f"Chips: {args.chips}")
+    print("Status: " + ", ".join(f"{name}={n}" for name, n in sorted(statuses.items())))
+    print(f"Steps: {steps} ({steps / max(elapsed, 1e-9) / 1e6:.2f}M chip-instructions/s)")
+    for chip, message in list(sim.errors.items())[:5]:
+        print(f"  chip {chip}: {message}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+"""Size-driven minifier for IC10 scripts, with a source map back to the original.
+
+Scripts that outgrow the 128-line and 4096-byte limits can be written
+readably and shipped minified:
+
+    comments      stripped; blank and comment-only lines dropped
+    defines       numeric and HASH/STR defines substituted into every use
+                  (HASH("...") becomes its number when that is shorter)
+    aliases       register and db aliases substituted and their lines
+                  dropped; device aliases to d0-d5 keep their line, since the
+                  housing shows the name on the pin, but uses become the pin
+    labels        renamed to the shortest free names, the ones taking the
+                  most bytes first
+    whitespace    one space between tokens, opcodes lowercased
+
+Lines are only dropped when every jump target is known statically (the
+optimizer's rule); otherwise they stay as empty lines. A name declared more
+than once is left alone. The result must not fail any validator rule the
+original passes.
+
+The source map records the original line of every minified line and the
+original name of every renamed label. Validator results and profiles of the
+minified script can be reported against the readable source with it:
+
+    result = minify(code, source="script.ic10")
+    result.source_map.save(Path("script.min.ic10.map"))
+    SourceMap.load(Path("script.min.ic10.map")).map_result(validator.validate(result.code))
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from itertools import count, product
+from pathlib import Path
+from string import ascii_lowercase
+from typing import Iterable, Iterator, Optional
+
+from . import config
+from .ic10_cfg import resolve_operand
+from .ic10_emulator import hash_string, pack_string
+from .ic10_optimizer import issue_counts, splice, unmovable, worst_tick
+from .ic10_parser import DEVICE, HASH, IDENTIFIER, NUMBER, Line, Program, classify_operand
+from .ic10_validator import IC10Validator, ValidationIssue, ValidationResult, collect_files
+
+SOURCE_MAP_VERSION = 1
+
+_DECLARATIONS = ("alias", "define")
+
+# What an alias may be substituted with
+_TARGETS = frozenset(config.VALID_REGISTERS + config.VALID_DEVICES)
+
+# "line 12", "lines 4-9" in validator messages
+_LINE_REF_RE = re.compile(r"\b([Ll]ines?) (\d+)(?:-(\d+))?")
+_NAME_REF_RE = re.compile(r"'(\w+)'")
+
+
+class MinifyError(Exception):
+    """The minified script fails a validator rule the original passes."""
+
+
+# =============================================================================
+# Data Classes
+# =============================================================================
+
+
+@dataclass
+class SourceMap:
+    """Where each line and name of a minified script came from."""
+
+    lines: list[int] = field(default_factory=list)  # 1-indexed source line per output line
+    names: dict[str, str] = field(default_factory=dict)  # short label -> original
+    source: Optional[str] = None  # path of the readable source, if known
+    aliases: list[str] = field(default_factory=list)  # kept device aliases the source uses
+
+    def original(self, line: int) -> int:
+        """The 1-indexed source line of a 1-indexed minified line."""
+        if 1 <= line <= len(self.lines):
+            return self.lines[line - 1]
+        return line
+
+    def _message(self, message: str) -> str:
+        def lines(match: re.Match) -> str:
+            start = self.original(int(match.group(2)))
+            if match.group(3) is None:
+                return f"{match.group(1)} {start}"
+            return f"{match.group(1)} {start}-{self.original(int(match.group(3)))}"
+
+        def names(match: re.Match) -> str:
+            return f"'{self.names.get(match.group(1), match.group(1))}'"
+
+        return _NAME_REF_RE.sub(names, _LINE_REF_RE.sub(lines, message))
+
+    def _issues(self, issues: list[ValidationIssue]) -> list[ValidationIssue]:
+        # Columns are positions in the packed text, so they are dropped
+        return [
+            ValidationIssue(
+                issue.severity,
+                self.original(issue.line),
+                None,
+                self._message(issue.message),
+                issue.rule,
+            )
+            for issue in issues
+        ]
+
+    def _used(self, issue: ValidationIssue) -> bool:
+        """True for an I004 on a kept device alias whose uses became the pin."""
+        if issue.rule != "I004":
+            return False
+        match = _NAME_REF_RE.search(issue.message)
+        return match is not None and match.group(1) in self.aliases
+
+    def map_result(self, result: ValidationResult) -> ValidationResult:
+        """A validation result of the minified script, in source lines and names."""
+        return replace(
+            result,
+            stats=replace(
+                result.stats,
+                labels_defined=[self.names.get(n, n) for n in result.stats.labels_defined],
+            ),
+            errors=self._issues(result.errors),
+            warnings=self._issues(result.warnings),
+            info=self._issues([issue for issue in result.info if not self._used(issue)]),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "version": SOURCE_MAP_VERSION,
+            "source": self.source,
+            "lines": list(self.lines),
+            "names": dict(self.names),
+            "aliases": list(self.aliases),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SourceMap":
+        """Rebuild a map from to_dict() output."""
+        if data.get("version") != SOURCE_MAP_VERSION:
+            raise ValueError(f"unsupported source map version: {data.get('version')!r}")
+        return cls(
+            lines=list(data["lines"]),
+            names=dict(data["names"]),
+            source=data["source"],
+            aliases=list(data.get("aliases", ())),
+        )
+
+    def save(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_dict(), sort_keys=True) + "\n", encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "SourceMap":
+        return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+@dataclass
+class MinifyResult:
+    """The minified source, its source map and what it saved."""
+
+    code: str
+    source_map: SourceMap
+    bytes_before: int
+    bytes_after: int
+    lines_before: int
+    lines_after: int
+    tick_before: int  # worst-case instructions per tick (0 if none bounded)
+    tick_after: int
+
+    def to_dict(self) -> dict:
+        return {
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "lines_before": self.lines_before,
+            "lines_after": self.lines_after,
+            "tick_before": self.tick_before,
+            "tick_after": self.tick_after,
+            "renamed": dict(self.source_map.names),
+            "code": self.code,
+        }
+
+    def report(self) -> str:
+        out = [
+            f"Bytes: {self.bytes_before} -> {self.bytes_after} "
+            f"(saved {self.bytes_before - self.bytes_after})",
+            f"Lines: {self.lines_before} -> {self.lines_after} "
+            f"(saved {self.lines_before - self.lines_after})",
+        ]
+        if self.tick_before or self.tick_after:
+            out.append(f"Worst-case instructions per tick: {self.tick_before} -> {self.tick_after}")
+        if self.source_map.names:
+            out.append("Renamed labels:")
+            out.extend(f"  {new} <- {old}" for new, old in self.source_map.names.items())
+        return "\n".join(out)
+
+
+# =============================================================================
+# Minification
+# =============================================================================
+
+
+def _number_text(operand) -> str:
+    """The shorter of a HASH/STR operand and its numeric value."""
+    text = operand.text
+    inner = text[text.index('"') + 1 : text.rindex('"')]
+    value = pack_string(inner) if text.startswith("STR") else hash_string(inner)
+    return min(text, str(value), key=len)
+
+
+def _declared(program: Program) -> Counter:
+    """How often each name is declared (label, alias or define)."""
+    declared = Counter(line.label for line in program.lines if line.label is not None)
+    for line in program.lines:
+        if line.opcode in _DECLARATIONS and len(line.operands) >= 2:
+            declared[line.operands[0].text] += 1
+    return declared
+
+
+def _substitutions(program: Program, declared: Counter) -> tuple[dict[str, str], set[str]]:
+    """Text to put in place of each define and alias, and the alias lines to keep."""
+    substitute: dict[str, str] = {}
+    keep: set[str] = set()
+    for line in program.lines:
+        if line.opcode not in _DECLARATIONS or len(line.operands) < 2:
+            continue
+        name, value = line.operands[0].text, line.operands[1]
+        if declared[name] != 1:
+            continue
+        if line.opcode == "define":
+            if value.kind == NUMBER:
+                substitute[name] = value.text
+            elif value.kind == HASH:
+                substitute[name] = _number_text(value)
+            continue
+        target, _ = resolve_operand(program, value)
+        if target.text not in _TARGETS:
+            continue  # undeclared or invalid, reported once on the alias line
+        substitute[name] = target.text
+        if target.kind == DEVICE and target.index is not None:
+            keep.add(name)
+    return substitute, keep
+
+
+def _referenced(program: Program) -> set[str]:
+    """Names used anywhere other than where they are declared."""
+    return {
+        operand.text
+        for line in program.lines
+        for operand in (line.operands[1:] if line.opcode in _DECLARATIONS else line.operands)
+        if operand.kind == IDENTIFIER
+    }
+
+
+def _short_names(reserved: set[str]) -> Iterator[str]:
+    """Lowercase names by length, skipping reserved words and register/device names."""
+    for length in count(1):
+        for letters in product(ascii_lowercase, repeat=length):
+            name = "".join(letters)
+            if name in reserved or classify_operand(name, 1).kind != IDENTIFIER:
+                continue
+            yield name
+
+
+def _renames(program: Program, declared: Counter) -> dict[str, str]:
+    """Original label -> shorter name; the labels that take the most bytes go first."""
+    references: Counter = Counter()
+    reserved = set(config.ALL_INSTRUCTIONS) | set(declared)
+    for line in program.lines:
+        for operand in line.operands:
+            if operand.kind != IDENTIFIER:
+                continue
+            if operand.text in program.labels:
+                references[operand.text] += 1
+            reserved.add(operand.text)
+            reserved.add(operand.text.lower())  # logic types and modes
+
+    labels = [name for name in program.labels if declared[name] == 1]
+    labels.sort(key=lambda name: -(references[name] + 1) * len(name))
+    names = _short_names(reserved)
+    renames = {}
+    short = next(names)
+    for label in labels:
+        if len(short) < len(label):
+            renames[label] = short
+            short = next(names)
+    return renames
+
+
+def _pack(line: Line, substitute: dict[str, str], keep: set[str], renames: dict[str, str]) -> str:
+    """One line with its comment, spacing and inlined declarations removed."""
+    label = renames.get(line.label, line.label)
+    prefix = f"{label}:" if label is not None else ""
+    if line.opcode is None:
+        return prefix
+    operands = line.operands
+    if line.opcode in _DECLARATIONS and operands:
+        name = operands[0].text
+        if name in substitute and name not in keep:
+            return prefix
+        texts, operands = [name], operands[1:]
+    else:
+        texts = []
+    for operand in operands:
+        text = operand.text
+        if operand.kind == IDENTIFIER:
+            text = substitute.get(text) or renames.get(text, text)
+        elif operand.kind == HASH:
+            text = _number_text(operand)
+        texts.append(text)
+    instruction = " ".join([line.opcode, *texts])
+    return f"{prefix} {instruction}" if prefix else instruction
+
+
+def minify(
+    code: str, validator: Optional[IC10Validator] = None, source: Optional[str] = None
+) -> MinifyResult:
+    """Shrink a script and map each of its lines back to the original."""
+    validator = validator or IC10Validator()
+    program = validator.parse(code)
+    declared = _declared(program)
+    substitute, keep = _substitutions(program, declared)
+    renames = _renames(program, declared)
+
+    texts = [_pack(line, substitute, keep, renames) for line in program.lines]
+    packed = validator.parse("\n".join(texts))
+    kept = list(range(len(texts)))
+    if unmovable(packed) is None:
+        kept = [i for i, text in enumerate(texts) if text]
+        texts = splice(packed, [i for i, text in enumerate(texts) if not text])
+    minified = "\n".join(texts)
+
+    baseline = issue_counts(validator.validate(code))
+    validation = validator.validate(minified)
+    counts = issue_counts(validation)
+    for issue in validation.errors + validation.warnings:
+        if counts[issue.rule] > baseline[issue.rule]:
+            raise MinifyError(
+                f"the result fails {issue.rule} on line {issue.line}: {issue.message}"
+            )
+
+    result = validator.parse(minified)
+    return MinifyResult(
+        code=minified,
+        source_map=SourceMap(
+            lines=[i + 1 for i in kept],
+            names={short: label for label, short in renames.items()},
+            source=source,
+            aliases=sorted(keep & _referenced(program)),
+        ),
+        bytes_before=program.size,
+        bytes_after=result.size,
+        lines_before=len(program.lines),
+        lines_after=len(result.lines),
+        tick_before=worst_tick(program),
+        tick_after=worst_tick(result),
+    )
+
+
+# =============================================================================
+# Batch Minification
+# =============================================================================
+
+# One validator per worker process (set by _init_worker)
+_worker_validator: Optional[IC10Validator] = None
+
+
+def _init_worker() -> None:
+    global _worker_validator
+    _worker_validator = IC10Validator()
+
+
+def output_path(path: Path, out_dir: Path, root: Optional[Path] = None) -> Path:
+    """Where the minified copy of a file goes: <out_dir>/<relative path>.min.ic10."""
+    relative = path.relative_to(root) if root is not None else Path(path.name)
+    return out_dir / relative.with_suffix(".min.ic10")
+
+
+def write_output(result: MinifyResult, path: Path) -> None:
+    """Write the minified script and its source map (<path>.map) beside it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(result.code, encoding="utf-8")
+    result.source_map.save(path.with_name(path.name + ".map"))
+
+
+def _minify_path(path: str, output: str) -> dict:
+    """Minify one file in a worker and write it out, returning its NDJSON record."""
+    try:
+        code = Path(path).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as e:
+        return {"file": path, "error": str(e)}
+    try:
+        result = minify(code, _worker_validator, source=path)
+    except MinifyError as e:
+        return {"file": path, "error": str(e)}
+    write_output(result, Path(output))
+    record = {"file": path, "output": output, **result.to_dict()}
+    del record["code"]
+    return record
+
+
+def minify_files(pairs: Iterable[tuple[Path, Path]], jobs: Optional[int] = None) -> Iterator[dict]:
+    """Minify (source, output) pairs across a process pool, in input order."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    pairs = [(str(source), str(output)) for source, output in pairs]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(pairs) <= 1:
+        _init_worker()
+        for source, output in pairs:
+            yield _minify_path(source, output)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(pairs)), initializer=_init_worker) as pool:
+        yield from pool.map(_minify_path, *zip(*pairs), chunksize=8)
+
+
+# =============================================================================
+# CLI Interface
+# =============================================================================
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Minify IC10 scripts with a source map")
+    parser.add_argument("paths", type=Path, nargs="+", help="IC10 files or directories")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="Write the minified script (and <output>.map) here"
+    )
+    parser.add_argument(
+        "--out-dir",
+        type=Path,
+        help="Minify every file into this directory as *.min.ic10 (NDJSON output)",
+    )
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    single = len(args.paths) == 1 and args.paths[0].is_file()
+    if not single or args.out_dir:
+        if args.output or not args.out_dir:
+            parser.error("several files or a directory need --out-dir (and no --output)")
+        pairs = []
+        for path in args.paths:
+            if path.is_dir():
+                pairs += [(p, output_path(p, args.out_dir, path)) for p in collect_files([path])]
+            else:
+                pairs.append((path, output_path(path, args.out_dir)))
+        summary = {"files": 0, "minified": 0, "failed": 0, "bytes_before": 0, "bytes_after": 0}
+        for record in minify_files(pairs, args.jobs):
+            summary["files"] += 1
+            if "error" in record:
+                summary["failed"] += 1
+            else:
+                summary["minified"] += 1
+                summary["bytes_before"] += record["bytes_before"]
+                summary["bytes_after"] += record["bytes_after"]
+            print(json.dumps(record))
+        print(json.dumps({"summary": summary}))
+        sys.exit(1 if summary["failed"] else 0)
+
+    path = args.paths[0]
+    try:
+        code = path.read_text(encoding="utf-8")
+        result = minify(code, source=str(path))
+    except (OSError, MinifyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    elif args.output:
+        print(result.report())
+    else:
+        print(result.code)
+    if args.output:
+        write_output(result, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""Simulated device network for IC10 batch instructions.
+
+Batch instructions (lb, sbn, lbs, ...) read or write every device on the
+network with a given prefab hash, optionally narrowed to one name hash.
+Devices are indexed by prefab hash and by name hash, and every logic type is
+stored as a column per prefab group with a running sum, minimum and maximum,
+so batch reads are O(1) amortized on networks with hundreds of devices.
+
+    network = DeviceNetwork()
+    network.create("Active Vent", name="Vent 1", logic={"On": 0.0})
+    network.store(-842048328, None, "On", 1.0)              # sb
+    network.aggregate(-842048328, None, "On", 1)            # lb ... Sum
+
+Adding a device turns its `logic` dict and `slots` dicts into views of the
+network's columns, so `s d0 On 1` on a pin that is also on the network keeps
+the batch aggregates current.
+"""
+
+import re
+from collections.abc import MutableMapping
+from functools import lru_cache
+from typing import Any, Iterator, Optional, Union
+
+from . import config
+
+_TABLE_ROW = re.compile(r"^\|\s*([^|]+?)\s*\|\s*(-?\d+)\s*\|")
+_FRONTMATTER = re.compile(r"\A---\n(.*?)\n---", re.DOTALL)
+
+
+# =============================================================================
+# Prefab Hashes
+# =============================================================================
+
+
+@lru_cache(maxsize=1)
+def load_prefab_hashes() -> dict[str, int]:
+    """Device name -> prefab hash from the hash tables and device docs."""
+    hashes: dict[str, int] = {}
+    if config.DEVICE_HASHES_PATH.exists():
+        for line in config.DEVICE_HASHES_PATH.read_text(encoding="utf-8").splitlines():
+            match = _TABLE_ROW.match(line)
+            if match:
+                hashes[match.group(1)] = int(match.group(2))
+    for path in sorted(config.DEVICE_OUTPUT.glob("**/*.md")):
+        match = _FRONTMATTER.match(path.read_text(encoding="utf-8"))
+        if not match:
+            continue
+        fields = dict(
+            line.split(":", 1) for line in match.group(1).splitlines() if ":" in line
+        )
+        title = fields.get("title", "").strip()
+        prefab_hash = fields.get("prefab_hash", "").strip()
+        if title and prefab_hash.lstrip("-").isdigit():
+            hashes.setdefault(title, int(prefab_hash))
+    return hashes
+
+
+def prefab_hash(prefab: Union[str, int]) -> int:
+    """Resolve a device name ("Active Vent"), prefab name or hash to a hash.
+
+    Names not in the hash tables are hashed as prefab names
+    ("StructureActiveVent"), matching HASH("...") in scripts.
+    """
+    if isinstance(prefab, int):
+        return prefab
+    known = load_prefab_hashes().get(prefab)
+    if known is not None:
+        return known
+    from .ic10_emulator import hash_string
+
+    return hash_string(prefab)
+
+
+# =============================================================================
+# Columns
+# =============================================================================
+
+
+class _Stats:
+    """Running sum/min/max of one column over a group or name subgroup."""
+
+    __slots__ = ("members", "total", "low", "high", "updates", "stale")
+
+    def __init__(self, members: Optional[list[int]]):
+        self.members = members  # member indices, or None for the whole group
+        self.stale = True
+
+    def refresh(self, values: list[float]) -> None:
+        if self.members is not None:
+            values = [values[i] for i in self.members]
+        self.total = sum(values)
+        self.low = min(values)
+        self.high = max(values)
+        self.updates = 0
+        self.stale = False
+
+    def update(self, old: float, new: float, size: int) -> None:
+        self.total += new - old
+        self.updates += 1
+        if self.updates > size or self.total != self.total:
+            self.stale = True  # re-add after `size` updates (drift) or inf - inf
+        if new <= self.low:
+            self.low = new
+        elif old == self.low:
+            self.stale = True
+        if new >= self.high:
+            self.high = new
+        elif old == self.high:
+            self.stale = True
+
+
+class _Column:
+    """One logic type across a prefab group, in member order."""
+
+    __slots__ = ("values", "present", "stats")
+
+    def __init__(self, size: int):
+        self.values = [0.0] * size
+        self.present = bytearray(size)  # keys the device actually has
+        self.stats: dict[Optional[float], _Stats] = {}
+
+
+class _Group:
+    """All network devices sharing one prefab hash."""
+
+    def __init__(self):
+        self.devices: list[Any] = []
+        self.names: list[float] = []
+        self.slot_counts: list[int] = []
+        self.by_name: dict[float, list[int]] = {}
+        # logic type -> column; (slot, logic type) -> column for slot values
+        self.columns: dict[Union[str, tuple[int, str]], _Column] = {}
+
+    def add(self, device) -> int:
+        member = len(self.devices)
+        self.devices.append(device)
+        self.names.append(device.name_hash)
+        self.slot_counts.append(len(device.slots))
+        self.by_name.setdefault(device.name_hash, []).append(member)
+        for column in self.columns.values():
+            column.values.append(0.0)
+            column.present.append(0)
+            column.stats.clear()
+        return member
+
+    def set(self, key, member: int, value: float) -> None:
+        column = self.columns.get(key)
+        if column is None:
+            column = self.columns[key] = _Column(len(self.devices))
+        old = column.values[member]
+        column.values[member] = value
+        column.present[member] = 1
+        if column.stats:
+            for name in (None, self.names[member]):
+                stats = column.stats.get(name)
+                if stats is not None and not stats.stale:
+                    members = stats.members
+                    stats.update(old, value, len(self.devices if members is None else members))
+
+    def stats(self, key, name_hash: Optional[float]) -> Optional[_Stats]:
+        """Current stats of a column, or None if no member has the key."""
+        column = self.columns.get(key)
+        if column is None:
+            return None
+        stats = column.stats.get(name_hash)
+        if stats is None:
+            members = None if name_hash is None else self.by_name[name_hash]
+            stats = column.stats[name_hash] = _Stats(members)
+        if stats.stale:
+            stats.refresh(column.values)
+        return stats
+
+
+class _ColumnView(MutableMapping):
+    """A device's logic values (or one slot's) backed by network columns."""
+
+    __slots__ = ("_group", "_member", "_slot")
+
+    def __init__(self, group: _Group, member: int, slot: Optional[int] = None):
+        self._group = group
+        self._member = member
+        self._slot = slot
+
+    def _key(self, logic_type: str):
+        return logic_type if self._slot is None else (self._slot, logic_type)
+
+    def get(self, logic_type: str, default: Any = None) -> Any:
+        column = self._group.columns.get(self._key(logic_type))
+        if column is None or not column.present[self._member]:
+            return default
+        return column.values[self._member]
+
+    def __getitem__(self, logic_type: str) -> float:
+        value = self.get(logic_type, self)
+        if value is self:
+            raise KeyError(logic_type)
+        return value
+
+    def __setitem__(self, logic_type: str, value: float) -> None:
+        self._group.set(self._key(logic_type), self._member, value)
+
+    def __delitem__(self, logic_type: str) -> None:
+        self[logic_type]  # KeyError if missing
+        key = self._key(logic_type)
+        self._group.set(key, self._member, 0.0)  # absent keys read as 0
+        self._group.columns[key].present[self._member] = 0
+
+    def __iter__(self) -> Iterator[str]:
+        member = self._member
+        for key, column in list(self._group.columns.items()):
+            if not column.present[member]:
+                continue
+            if self._slot is None and isinstance(key, str):
+                yield key
+            elif self._slot is not None and isinstance(key, tuple) and key[0] == self._slot:
+                yield key[1]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+# =============================================================================
+# Network
+# =============================================================================
+
+
+class DeviceNetwork:
+    """Devices reachable by batch instructions, indexed by prefab and name hash."""
+
+    def __init__(self, devices=()):
+        self.devices: list[Any] = []
+        self._groups: dict[float, _Group] = {}
+        for device in devices:
+            self.add(device)
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def __iter__(self):
+        return iter(self.devices)
+
+    def add(self, device):
+        """Put a Device on the network; its logic and slots become column views.
+
+        Set `prefab_hash`, `name_hash` and the number of slots before adding.
+        """
+        if isinstance(device.logic, _ColumnView):
+            raise ValueError("Device is already on a network")
+        group = self._groups.get(device.prefab_hash)
+        if group is None:
+            group = self._groups[device.prefab_hash] = _Group()
+        member = group.add(device)
+        for logic_type, value in device.logic.items():
+            group.set(logic_type, member, value)
+        for slot, values in enumerate(device.slots):
+            for logic_type, value in values.items():
+                group.set((slot, logic_type), member, value)
+        device.logic = _ColumnView(group, member)
+        device.slots = [_ColumnView(group, member, slot) for slot in range(len(device.slots))]
+        self.devices.append(device)
+        return device
+
+    def create(
+        self,
+        prefab: Union[str, int],
+        name: Optional[str] = None,
+        logic: Optional[dict[str, float]] = None,
+        slots: int = 0,
+    ):
+        """Add a new device by name ("Active Vent") or prefab hash."""
+        from .ic10_emulator import Device, hash_string
+
+        device = Device(
+            prefab_hash=prefab_hash(prefab),
+            name_hash=hash_string(name) if name else 0,
+            logic=dict(logic or {}),
+            slots=[{} for _ in range(slots)],
+        )
+        return self.add(device)
+
+    def batch(self, prefab_hash: float, name_hash: Optional[float] = None) -> list:
+        """Devices with a prefab hash (and name hash, if given)."""
+        group = self._groups.get(prefab_hash)
+        if group is None:
+            return []
+        if name_hash is None:
+            return list(group.devices)
+        return [group.devices[i] for i in group.by_name.get(name_hash, ())]
+
+    def aggregate(
+        self,
+        prefab_hash: float,
+        name_hash: Optional[float],
+        logic_type: str,
+        mode: float,
+        slot: Optional[float] = None,
+    ) -> float:
+        """Batch read: 0 average, 1 sum, 2 minimum, 3 maximum; 0 if none match."""
+        group = self._groups.get(prefab_hash)
+        if group is None or (name_hash is not None and name_hash not in group.by_name):
+            return 0.0
+        mode = int(mode)
+        if not 0 <= mode <= 3:
+            raise ValueError(f"Unknown batch mode {mode}")
+        key = logic_type if slot is None else (int(slot), logic_type)
+        stats = group.stats(key, name_hash)
+        if stats is None:
+            return 0.0  # no member has the value; all read as 0
+        if mode == 0:
+            members = group.devices if name_hash is None else group.by_name[name_hash]
+            return stats.total / len(members)
+        if mode == 1:
+            return stats.total
+        return stats.low if mode == 2 else stats.high
+
+    def store(
+        self,
+        prefab_hash: float,
+        name_hash: Optional[float],
+        logic_type: str,
+        value: float,
+        slot: Optional[float] = None,
+    ) -> None:
+        """Batch write to every matching device (slot writes skip short devices)."""
+        group = self._groups.get(prefab_hash)
+        if group is None:
+            return
+        if name_hash is None:
+            members = range(len(group.devices))
+        else:
+            members = group.by_name.get(name_hash, ())
+        if slot is None:
+            for member in members:
+                group.set(logic_type, member, value)
+            return
+        index = int(slot)
+        key = (index, logic_type)
+        counts = group.slot_counts
+        for member in members:
+            if 0 <= index < counts[member]:
+                group.set(key, member, value)
@@ -0,0 +1,894 @@
+"""Peephole optimizer for IC10 scripts.
+
+Rewrites a script in small steps, each one checked by re-running the
+validator on the result:
+
+    unreachable      drop lines no path reaches (validator I003)
+    unused-name      drop labels, defines and aliases nothing uses (I004)
+    dead-store       drop math and moves whose result is never read (I005)
+    fold-define      substitute a `define` into every use and drop its line
+    redundant-move   drop `move r0 r0`, a move overwritten by the next
+                     instruction, and `move a b` right after `move b a`
+    thread-branch    aim a branch at a `j` straight at that jump's target
+    select-diamond   turn `b<cc> .. else / move / j end / else: move / end:`
+                     into `s<cc>` plus `select`
+    reuse-load       turn a device load repeated within a tick into a `move`
+                     from the register that still holds it (or drop it)
+    repeated-store   drop an `s` that writes what the tick already wrote
+
+A rewrite that makes the validator report more errors or warnings of any
+rule than the original did is rejected and not retried. Info findings may
+rise in between: a rewrite that orphans a label leaves it to unused-name.
+
+IC10 addresses are line numbers, so rewrites that delete lines renumber
+numeric and relative jump targets, and are skipped when a jump target is
+only known at runtime (`j r0`) or an address is used as a number (a label
+as a value, `ra` in arithmetic).
+
+    result = optimize(code)
+    print(result.report())
+    Path("out.ic10").write_text(result.code)
+
+The report compares the static worst-case instructions per tick (the W004
+analysis) before and after.
+"""
+
+import argparse
+import difflib
+import json
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+from . import config
+from .ic10_cfg import (
+    BRANCH_OPCODES,
+    RELATIVE_OPCODES,
+    RETURN,
+    YIELD_OPCODES,
+    CFG,
+    Liveness,
+    build_cfg,
+    jump_target,
+    resolve_operand,
+)
+from .ic10_deadcode import PURE_OPCODES, find_dead_code
+from .ic10_parser import (
+    DEVICE,
+    HASH,
+    IDENTIFIER,
+    INDIRECT_DEVICE,
+    INDIRECT_REGISTER,
+    NUMBER,
+    REGISTER,
+    Line,
+    Operand,
+    Program,
+)
+from .ic10_validator import IC10Validator, ValidationResult
+
+MOVE_OPCODES = frozenset(("move", "mv"))
+
+# Conditional branch -> set instruction with the same condition operands
+SELECT_OPCODES = {
+    op: f"s{op[1:]}"
+    for op in sorted(BRANCH_OPCODES)
+    if op.startswith("b")
+    and not op.startswith("br")
+    and not op.endswith("al")
+    and f"s{op[1:]}" in config.INSTRUCTION_CATEGORIES["comparison"]
+}
+
+# Instructions that may move `ra` through the stack without exposing its value
+_SAVES_RA = frozenset(("push", "pop", "peek"))
+
+_CATEGORIES = config.INSTRUCTION_CATEGORIES
+LOAD_OPCODES = frozenset(
+    op for op in _CATEGORIES["logic"] + _CATEGORIES["batch"] if op.startswith("l")
+)
+STORE_OPCODES = frozenset(_CATEGORIES["logic"] + _CATEGORIES["batch"]) - LOAD_OPCODES
+
+# Instructions that neither write to a device nor end the tick
+_DEVICE_NEUTRAL = (
+    LOAD_OPCODES
+    | BRANCH_OPCODES
+    | PURE_OPCODES
+    | frozenset(_CATEGORIES["bitwise"])
+    | {"rand", "alias", "define", "label", "push", "pop", "peek", "get", "getd"}
+)
+
+
+# =============================================================================
+# Data Classes
+# =============================================================================
+
+
+@dataclass(slots=True)
+class Rewrite:
+    """One applied (or rejected) rewrite."""
+
+    kind: str  # fold-define, dead-store, reuse-load, ... (see the module docstring)
+    line: int  # 1-indexed line in the source it was applied to
+    detail: str
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "line": self.line, "detail": self.detail}
+
+
+@dataclass
+class OptimizeResult:
+    """The optimized source and what changed."""
+
+    code: str
+    lines_before: int
+    lines_after: int
+    tick_before: int  # worst-case instructions per tick (0 if none bounded)
+    tick_after: int
+    rewrites: list[Rewrite] = field(default_factory=list)
+    rejected: list[Rewrite] = field(default_factory=list)  # failed validation
+
+    @property
+    def saved_per_tick(self) -> int:
+        return self.tick_before - self.tick_after
+
+    def to_dict(self) -> dict:
+        return {
+            "lines_before": self.lines_before,
+            "lines_after": self.lines_after,
+            "tick_before": self.tick_before,
+            "tick_after": self.tick_after,
+            "saved_per_tick": self.saved_per_tick,
+            "rewrites": [rewrite.to_dict() for rewrite in self.rewrites],
+            "rejected": [rewrite.to_dict() for rewrite in self.rejected],
+            "code": self.code,
+        }
+
+    def report(self) -> str:
+        out = [f"Rewrites applied: {len(self.rewrites)}"]
+        out += [f"  line {r.line:>3}  {r.kind:<15} {r.detail}" for r in self.rewrites]
+        if self.rejected:
+            out.append(f"Rejected by the validator: {len(self.rejected)}")
+            out += [f"  line {r.line:>3}  {r.kind:<15} {r.detail}" for r in self.rejected]
+        out.append(f"Lines: {self.lines_before} -> {self.lines_after}")
+        if self.tick_before or self.tick_after:
+            out.append(
+                f"Worst-case instructions per tick: {self.tick_before} -> {self.tick_after}"
+                f" (saved {self.saved_per_tick})"
+            )
+        else:
+            out.append("Worst-case instructions per tick: unbounded (see W002)")
+        return "\n".join(out)
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+
+def _register(program: Program, operand: Operand) -> Optional[str]:
+    """The register an operand names, through aliases ("r3", "sp"), or None."""
+    operand, _ = resolve_operand(program, operand)
+    return operand.text if operand.kind == REGISTER else None
+
+
+def _indirect(program: Program, operand: Operand) -> bool:
+    """True for `rr1` (through aliases), which may read any register."""
+    operand, _ = resolve_operand(program, operand)
+    return operand.kind == INDIRECT_REGISTER
+
+
+def replace_operand(text: str, operand: Operand, new: str) -> str:
+    """Line text with one operand replaced (operands keep their columns)."""
+    start = operand.column - 1
+    return text[:start] + new + text[start + len(operand.text) :]
+
+
+def _without_comment(line: Line) -> str:
+    if line.comment_column is None:
+        return line.text.rstrip()
+    return line.text[: line.comment_column - 1].rstrip()
+
+
+def _next_instruction(program: Program, index: int) -> Optional[int]:
+    """First line at or after `index` carrying an instruction."""
+    lines = program.lines
+    while index < len(lines):
+        if lines[index].opcode is not None:
+            return index
+        index += 1
+    return None
+
+
+def unmovable(program: Program) -> Optional[str]:
+    """Why lines cannot be deleted (addresses only known at runtime), or None."""
+    for line in program.lines:
+        if line.opcode in BRANCH_OPCODES and line.operands:
+            operand = line.operands[-1]
+            if jump_target(program, line, operand) is None:
+                return f"line {line.number} jumps to a computed address"
+            if operand.kind == IDENTIFIER and operand.text not in program.labels:
+                return f"line {line.number} jumps to define '{operand.text}'"
+            if operand.kind == IDENTIFIER and line.opcode in RELATIVE_OPCODES:
+                return f"line {line.number} uses label '{operand.text}' as an offset"
+    for line in program.lines:
+        if line.opcode in ("alias", "define", "label") or line.opcode in _SAVES_RA:
+            continue
+        branch = line.opcode in BRANCH_OPCODES
+        for operand in line.operands[:-1] if branch else line.operands:
+            if operand.kind == IDENTIFIER and operand.text in program.labels:
+                return f"line {line.number} uses label '{operand.text}' as a value"
+            if _register(program, operand) == "ra":
+                return f"line {line.number} uses ra as a value"
+    return None
+
+
+def _numeric_targets(program: Program) -> set[int]:
+    """0-indexed lines reached by numeric (absolute or relative) jumps."""
+    targets = set()
+    for line in program.lines:
+        if line.opcode in BRANCH_OPCODES and line.operands and line.operands[-1].kind == NUMBER:
+            target = jump_target(program, line, line.operands[-1])
+            if target is not None and target != RETURN:
+                targets.add(target)
+    return targets
+
+
+def splice(
+    program: Program,
+    remove: Iterable[int] = (),
+    replace: Optional[dict[int, str]] = None,
+    before: Optional[dict[int, list[str]]] = None,
+    after: Optional[dict[int, list[str]]] = None,
+) -> list[str]:
+    """Line texts with lines removed or inserted, numeric jump targets renumbered.
+
+    Lines in `replace` get the new text as is. Lines in `before` and `after`
+    are inserted around a line; a numeric jump to the line lands on the first
+    one inserted before it, and a jump to a removed line on the next kept one.
+    Labels stay where they are, so a jump to a label skips the lines inserted
+    before its line unless the caller moves the label onto the first of them.
+    """
+    lines = program.lines
+    remove = set(remove)
+    before = before or {}
+    after = after or {}
+    start = []  # new index a jump to each old line lands on
+    position = []  # new index of each kept old line itself
+    count = 0
+    for i in range(len(lines)):
+        start.append(count)
+        if i in remove:
+            position.append(count)
+            continue
+        count += len(before.get(i, ()))
+        position.append(count)
+        count += 1 + len(after.get(i, ()))
+    start.append(count)
+    for i in reversed(range(len(lines))):
+        if i in remove:
+            start[i] = start[i + 1]
+
+    def moved(address: int) -> int:
+        if address < 0:
+            return address
+        if address >= len(lines):
+            return address - len(lines) + count
+        return start[address]
+
+    texts = []
+    for i, line in enumerate(lines):
+        if i in remove:
+            continue
+        texts.extend(before.get(i, ()))
+        text = line.text
+        if replace and i in replace:
+            text = replace[i]
+        elif line.opcode in BRANCH_OPCODES and line.operands:
+            operand = line.operands[-1]
+            target = jump_target(program, line, operand) if operand.kind == NUMBER else None
+            if target is not None and target != RETURN:
+                if line.opcode in RELATIVE_OPCODES:
+                    address = moved(target) - position[i]
+                else:
+                    address = moved(target)
+                if address != operand.value:
+                    text = replace_operand(text, operand, str(address))
+        texts.append(text)
+        texts.extend(after.get(i, ()))
+    return texts
+
+
+# =============================================================================
+# Device I/O
+# =============================================================================
+
+# What a tick has read from or written to its devices: (opcode, operand
+# texts) -> (register holding the loaded value or -1 for a store, text of
+# that register or of the stored value, mask of the registers it depends on)
+Facts = dict[tuple[str, ...], tuple[int, str, int]]
+
+
+def _io_key(program: Program, line: Line) -> Optional[tuple[tuple[str, ...], int]]:
+    """Identity of a load or `s` (aliases resolved) and its register mask."""
+    operands = line.operands[1:] if line.opcode in LOAD_OPCODES else line.operands[:2]
+    texts = [line.opcode]
+    depends = 0
+    for operand in operands:
+        resolved, _ = resolve_operand(program, operand)
+        if resolved.kind in (REGISTER, INDIRECT_DEVICE, INDIRECT_REGISTER):
+            if resolved.kind == INDIRECT_REGISTER or resolved.index is None:
+                return None  # rr0, sp and ra are not worth following
+            depends |= 1 << resolved.index
+        texts.append(resolved.text)
+    return tuple(texts), depends
+
+
+def _io_fact(program: Program, line: Line) -> Optional[tuple[tuple[str, ...], int, str, int]]:
+    """(key, register, text, mask) a load or `s` leaves behind, if trackable."""
+    if line.opcode not in LOAD_OPCODES and line.opcode != "s" or len(line.operands) < 3:
+        return None
+    identity = _io_key(program, line)
+    if identity is None:
+        return None
+    key, depends = identity
+    load = line.opcode in LOAD_OPCODES
+    value = line.operands[0] if load else line.operands[2]
+    resolved, _ = resolve_operand(program, value)
+    if resolved.kind == REGISTER and resolved.index is not None:
+        if load and depends & (1 << resolved.index):
+            return None  # `l r0 dr0 ...` reads through the register it overwrites
+        register = resolved.index if load else -1
+        return key, register, value.text if load else resolved.text, depends | 1 << resolved.index
+    if load or resolved.kind not in (NUMBER, HASH, IDENTIFIER):
+        return None
+    return key, -1, resolved.text, depends
+
+
+def _io_step(program: Program, liveness: Liveness, i: int, facts: Facts) -> None:
+    """Update `facts` for line i running."""
+    line = program.lines[i]
+    opcode = line.opcode
+    if opcode is None:
+        return
+    if opcode not in _DEVICE_NEUTRAL or i in liveness.indirect:
+        facts.clear()  # a device write, a pause, or anything unknown
+    else:
+        written = liveness.defs[i]
+        if written:
+            for key in [key for key, fact in facts.items() if fact[2] & written]:
+                del facts[key]
+    fact = _io_fact(program, line)
+    if fact is not None:
+        key, register, text, depends = fact
+        facts[key] = (register, text, depends)
+
+
+def _overrun_lines(cfg: CFG) -> set[int]:
+    """0-indexed lines a tick may be cut off at or after.
+
+    These are the lines reachable without a pause from a resume point whose
+    run can pass the per-tick instruction cap, or never pauses at all (a
+    yield-free cycle). The chip carries on there next tick, so nothing
+    loaded or stored before holds. `j ra` is followed to every return site.
+    """
+    lines = cfg.program.lines
+    blocks = cfg.blocks
+    bounded = {
+        path.start
+        for path in cfg.tick_paths()
+        if path.instructions <= config.MAX_INSTRUCTIONS_PER_TICK
+    }
+    reachable = cfg.reachable()
+    resumes = [0] + [
+        i + 1
+        for i, line in enumerate(lines)
+        if line.opcode in YIELD_OPCODES
+        and i + 1 < len(lines)
+        and cfg.block_of_line[i] in reachable
+    ]
+    return_sites = [
+        block.index + 1
+        for block in blocks
+        if block.calls is not None and block.index + 1 < len(blocks)
+    ]
+    overrun: set[int] = set()
+    seen: set[int] = set()
+    stack = [start for start in resumes if start not in bounded]
+    while stack:
+        start = stack.pop()
+        block = blocks[cfg.block_of_line[start]]
+        for i in range(start, block.end + 1):
+            overrun.add(i)
+            if lines[i].opcode in YIELD_OPCODES:
+                break
+        else:
+            for succ in block.successors + (return_sites if block.returns else []):
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append(blocks[succ].start)
+    return overrun
+
+
+def _available_io(program: Program, cfg: CFG, liveness: Liveness) -> Iterator[tuple[int, Facts]]:
+    """(line, facts holding before it) for every load and `s` line.
+
+    A must-analysis over the CFG: a fact holds where it holds on every path
+    since the last pause. Calls and returns drop everything, since the other
+    side may write to devices. So does every line a tick may be cut off at
+    (`_overrun_lines`), since the rest runs next tick.
+    """
+    blocks = cfg.blocks
+    overrun = _overrun_lines(cfg)
+    outs: list[Optional[Facts]] = [None] * len(blocks)  # None: no path seen yet
+
+    def entry(block) -> Optional[Facts]:
+        facts: Optional[Facts] = {} if block.index == 0 else None
+        for pred in block.predecessors:
+            out = outs[pred]
+            if out is None:
+                continue
+            if blocks[pred].calls is not None and blocks[pred].calls != block.index:
+                out = {}  # return site of a call
+            facts = dict(out) if facts is None else {
+                key: fact for key, fact in facts.items() if out.get(key) == fact
+            }
+        return facts
+
+    changed = True
+    while changed:
+        changed = False
+        for block in blocks:
+            facts = entry(block)
+            if facts is None:
+                continue
+            for i in range(block.start, block.end + 1):
+                if i in overrun:
+                    facts.clear()
+                _io_step(program, liveness, i, facts)
+            if facts != outs[block.index]:
+                outs[block.index] = facts
+                changed = True
+
+    for block in blocks:
+        facts = entry(block)
+        if facts is None:
+            continue
+        for i in range(block.start, block.end + 1):
+            if i in overrun:
+                facts.clear()
+            if program.lines[i].opcode in LOAD_OPCODES or program.lines[i].opcode == "s":
+                yield i, dict(facts)
+            _io_step(program, liveness, i, facts)
+
+
+def _instruction(line: Line) -> str:
+    """A line's instruction, without label or comment."""
+    return _without_comment(line)[line.opcode_column - 1 :]
+
+
+# =============================================================================
+# Rewrites
+# =============================================================================
+
+# Each pass yields (rewrite, new line texts) candidates for one program
+Pass = Callable[[Program, Callable[[str], Program]], Iterator[tuple[Rewrite, list[str]]]]
+
+
+def fold_defines(
+    program: Program, parse: Callable[[str], Program]
+) -> Iterator[tuple[Rewrite, list[str]]]:
+    """Substitute each numeric/hash `define` into its uses and drop its line."""
+    lines = program.lines
+    names = Counter(
+        line.operands[0].text for line in lines if line.opcode == "define" and line.operands
+    )
+    for i, line in enumerate(lines):
+        if line.opcode != "define" or len(line.operands) != 2 or line.label is not None:
+            continue
+        name, value = line.operands
+        if (
+            names[name.text] > 1
+            or name.text in program.labels
+            or name.text in program.aliases
+            or value.kind not in (NUMBER, HASH)
+        ):
+            continue
+        texts = []
+        for other in lines:
+            text = other.text
+            if other is not line:
+                for operand in reversed(other.operands):  # keeps earlier columns valid
+                    if operand.kind == IDENTIFIER and operand.text == name.text:
+                        text = replace_operand(text, operand, value.text)
+            texts.append(text)
+        folded = parse("\n".join(texts))
+        if unmovable(folded) is None:
+            rewrite = Rewrite("fold-define", line.number, f"define {name.text} {value.text}")
+            yield rewrite, splice(folded, {i})
+
+
+def remove_redundant_moves(
+    program: Program, parse: Callable[[str], Program]
+) -> Iterator[tuple[Rewrite, list[str]]]:
+    """Drop moves whose effect is nil or overwritten before it is read."""
+    if unmovable(program) is not None:
+        return
+    lines = program.lines
+    for i, line in enumerate(lines):
+        if line.opcode not in MOVE_OPCODES or len(line.operands) != 2:
+            continue
+        destination = _register(program, line.operands[0])
+        source = _register(program, line.operands[1])
+        if destination is None:
+            continue
+        text = _without_comment(line).strip()
+        if source == destination and line.label is None:
+            rewrite = Rewrite("redundant-move", line.number, f"'{text}' moves a register to itself")
+            yield rewrite, splice(program, {i})
+            continue
+
+        j = _next_instruction(program, i + 1)
+        if j is None:
+            continue
+        following = lines[j]
+        if following.opcode not in MOVE_OPCODES or len(following.operands) != 2:
+            continue
+        if _register(program, following.operands[0]) != destination:
+            if (
+                source is not None
+                and _register(program, following.operands[0]) == source
+                and _register(program, following.operands[1]) == destination
+                and following.label is None
+                and all(lines[k].label is None for k in range(i + 1, j))
+            ):
+                again = _without_comment(following).strip()
+                detail = f"'{again}' undoes line {line.number}"
+                yield Rewrite("redundant-move", following.number, detail), splice(program, {j})
+            continue
+        overwrite = following.operands[1]
+        if line.label is None and overwrite.kind in (NUMBER, HASH, REGISTER, IDENTIFIER):
+            reads = _register(program, overwrite) == destination or _indirect(program, overwrite)
+            if not reads:
+                detail = f"'{text}' is overwritten by line {following.number}"
+                yield Rewrite("redundant-move", line.number, detail), splice(program, {i})
+
+
+def thread_branches(
+    program: Program, parse: Callable[[str], Program]
+) -> Iterator[tuple[Rewrite, list[str]]]:
+    """Point branches that land on a `j` at that jump's own target."""
+    lines = program.lines
+    count = len(lines)
+    for i, line in enumerate(lines):
+        if line.opcode not in BRANCH_OPCODES or line.opcode in RELATIVE_OPCODES:
+            continue
+        if not line.operands or line.operands[-1].kind not in (IDENTIFIER, NUMBER):
+            continue
+        operand = line.operands[-1]
+        target = jump_target(program, line, operand)
+        if target is None or target == RETURN or not 0 <= target < count:
+            continue
+        final = None
+        seen = {i}
+        while True:
+            landing = _next_instruction(program, target)
+            if landing is None or landing in seen:
+                break
+            seen.add(landing)
+            jump = lines[landing]
+            if jump.opcode != "j" or len(jump.operands) != 1:
+                break
+            target = jump_target(program, jump, jump.operands[0])
+            if target is None or target == RETURN or not 0 <= target < count:
+                break
+            final = jump.operands[0].text
+        if final is None or final == operand.text:
+            continue
+        texts = [other.text for other in lines]
+        texts[i] = replace_operand(line.text, operand, final)
+        detail = f"{line.opcode} {operand.text} -> {final}"
+        yield Rewrite("thread-branch", line.number, detail), texts
+
+
+def select_diamonds(
+    program: Program, parse: Callable[[str], Program]
+) -> Iterator[tuple[Rewrite, list[str]]]:
+    """Replace an if/else that only sets one register by `s<cc>` + `select`.
+
+        b<cc> a b else         s<cc> r0 a b
+        move r0 x              select r0 r0 y x
+        j end
+        else:
+        move r0 y
+        end:
+    """
+    if unmovable(program) is not None:
+        return
+    lines = program.lines
+    count = len(lines)
+    references = Counter(
+        operand.text for line in lines for operand in line.operands if operand.kind == IDENTIFIER
+    )
+    numeric = _numeric_targets(program)
+
+    def move(index: int) -> Optional[tuple[str, str, Operand]]:
+        """(destination register, destination text, source) of a plain move."""
+        if index >= count:
+            return None
+        line = lines[index]
+        if line.opcode not in MOVE_OPCODES or len(line.operands) != 2:
+            return None
+        destination = _register(program, line.operands[0])
+        if destination is None or destination in ("sp", "ra"):
+            return None
+        return destination, line.operands[0].text, line.operands[1]
+
+    for i, line in enumerate(lines):
+        if line.opcode not in SELECT_OPCODES or len(line.operands) < 2:
+            continue
+        branch = line.operands[-1]
+        if branch.kind != IDENTIFIER or branch.text not in program.labels:
+            continue
+        if references[branch.text] != 1:
+            continue
+        then = move(i + 1)
+        if then is None or lines[i + 1].label is not None or i + 2 >= count:
+            continue
+        jump = lines[i + 2]
+        if (
+            jump.opcode != "j"
+            or jump.label is not None
+            or len(jump.operands) != 1
+            or jump.operands[0].text not in program.labels
+        ):
+            continue
+        otherwise_line = program.labels[branch.text] - 1
+        if otherwise_line != i + 3:
+            continue
+        if lines[otherwise_line].opcode is None and lines[otherwise_line].label is not None:
+            otherwise_line += 1  # label on a line of its own
+            if otherwise_line < count and lines[otherwise_line].label is not None:
+                continue
+        otherwise = move(otherwise_line)
+        if otherwise is None or program.labels[jump.operands[0].text] - 1 != otherwise_line + 1:
+            continue
+        if then[0] != otherwise[0]:
+            continue
+        values = (then[2], otherwise[2])
+        if any(
+            value.kind not in (NUMBER, HASH, REGISTER, IDENTIFIER)
+            or _register(program, value) == then[0]
+            or _indirect(program, value)
+            for value in values
+        ):
+            continue
+        if any(i < target <= otherwise_line for target in numeric):
+            continue
+
+        label = f"{line.label}: " if line.label is not None else ""
+        condition = " ".join(operand.text for operand in line.operands[:-1])
+        register = then[1]
+        first = f"{label}{SELECT_OPCODES[line.opcode]} {register} {condition}"
+        second = f"select {register} {register} {otherwise[2].text} {then[2].text}"
+        remove = set(range(i + 2, otherwise_line + 1))
+        texts = splice(program, remove, {i: first, i + 1: second})
+        yield Rewrite("select-diamond", line.number, f"{first.strip()} / {second}"), texts
+
+
+def remove_dead_code(
+    program: Program, parse: Callable[[str], Program]
+) -> Iterator[tuple[Rewrite, list[str]]]:
+    """Drop unreachable runs, unused names and dead stores (I003-I005).
+
+    Aliases of devices stay even when unused: the housing shows them as the
+    names of its pins.
+    """
+    if unmovable(program) is not None:
+        return
+    cfg = build_cfg(program)
+    dead = find_dead_code(cfg, Liveness(cfg))
+    lines = program.lines
+
+    def keep_label(indices: Iterable[int]) -> dict[int, str]:
+        return {i: f"{lines[i].label}:" for i in indices if lines[i].label is not None}
+
+    for run in dead.unreachable:
+        indices = [
+            i
+            for i in range(run.start, run.end + 1)
+            if lines[i].opcode is not None and lines[i].opcode not in ("alias", "define")
+        ]
+        replace = keep_label(indices)
+        detail = f"lines {run.start + 1}-{run.end + 1} can never run"
+        yield Rewrite("unreachable", run.start + 1, detail), splice(
+            program, set(indices) - replace.keys(), replace
+        )
+
+    for unused in dead.unused:
+        line = lines[unused.line]
+        if unused.kind == "label" and line.opcode is not None:
+            continue
+        if unused.kind == "alias" and len(line.operands) == 2:
+            target, _ = resolve_operand(program, line.operands[1])
+            if target.kind in (DEVICE, INDIRECT_DEVICE):
+                continue
+        if unused.kind != "label" and line.label is not None:
+            continue
+        detail = f"{unused.kind} '{unused.name}' is never used"
+        yield Rewrite("unused-name", line.number, detail), splice(program, {unused.line})
+
+    for i in dead.dead_stores:
+        line = lines[i]
+        text = _without_comment(line).strip()
+        replace = keep_label([i])
+        detail = f"'{text}' is never read"
+        yield Rewrite("dead-store", line.number, detail), splice(
+            program, {i} - replace.keys(), replace
+        )
+
+
+def reuse_device_io(
+    program: Program, parse: Callable[[str], Program]
+) -> Iterator[tuple[Rewrite, list[str]]]:
+    """Reuse a value loaded earlier in the tick; drop a store that repeats one.
+
+    Device values only change between ticks or when the script writes to a
+    device, so a second identical load since the last pause or write is a
+    `move` from the register that still holds the first (or nothing, if it
+    is the same register).
+    """
+    cfg = build_cfg(program)
+    if not cfg.blocks or cfg.computed_jumps():
+        return
+    liveness = Liveness(cfg)
+    movable = unmovable(program) is None
+    lines = program.lines
+    for i, facts in _available_io(program, cfg, liveness):
+        line = lines[i]
+        fact = _io_fact(program, line)
+        if fact is None or fact[0] not in facts:
+            continue
+        key, register, text, _ = fact
+        held, holder, _ = facts[key]
+        label = {i: f"{line.label}:"} if line.label is not None else {}
+        if line.opcode == "s":
+            if movable and holder == text:
+                detail = f"'{_instruction(line)}' repeats an earlier store"
+                yield Rewrite("repeated-store", line.number, detail), splice(
+                    program, {i} - label.keys(), label
+                )
+        elif held == register:
+            if movable:
+                detail = f"'{_instruction(line)}' is already in {holder}"
+                yield Rewrite("reuse-load", line.number, detail), splice(
+                    program, {i} - label.keys(), label
+                )
+        else:
+            start = line.opcode_column - 1
+            move = f"move {line.operands[0].text} {holder}"
+            texts = [other.text for other in lines]
+            texts[i] = line.text[:start] + move + line.text[len(_without_comment(line)) :]
+            detail = f"'{_instruction(line)}' -> '{move}'"
+            yield Rewrite("reuse-load", line.number, detail), texts
+
+
+PASSES: tuple[Pass, ...] = (
+    remove_dead_code,
+    fold_defines,
+    remove_redundant_moves,
+    thread_branches,
+    select_diamonds,
+    reuse_device_io,
+)
+
+
+# =============================================================================
+# Driver
+# =============================================================================
+
+
+def issue_counts(result: ValidationResult) -> Counter:
+    """Errors and warnings per rule; info findings are left to the dead-code rewrites."""
+    return Counter(issue.rule for issue in result.errors + result.warnings)
+
+
+def worst_tick(program: Program) -> int:
+    """Worst-case instructions per tick over the bounded paths (W004)."""
+    return max((path.instructions for path in build_cfg(program).tick_paths()), default=0)
+
+
+def optimize(
+    code: str,
+    validator: Optional[IC10Validator] = None,
+    passes: tuple[Pass, ...] = PASSES,
+) -> OptimizeResult:
+    """Apply rewrites until none applies, keeping those the validator accepts."""
+    validator = validator or IC10Validator()
+    baseline = issue_counts(validator.validate(code))
+    program = validator.parse(code)
+    result = OptimizeResult(
+        code=code,
+        lines_before=len(program.lines),
+        lines_after=len(program.lines),
+        tick_before=worst_tick(program),
+        tick_after=0,
+    )
+    rejected: set[tuple[str, str]] = set()
+    budget = 4 * len(program.lines) + 16  # every rewrite shrinks or retargets
+
+    while budget > 0:
+        budget -= 1
+        applied = False
+        for rewrite_pass in passes:
+            for rewrite, texts in rewrite_pass(program, validator.parse):
+                key = (rewrite.kind, rewrite.detail)
+                if key in rejected:
+                    continue
+                candidate = "\n".join(texts)
+                counts = issue_counts(validator.validate(candidate))
+                if any(counts[rule] > baseline[rule] for rule in counts):
+                    rejected.add(key)
+                    result.rejected.append(rewrite)
+                    continue
+                program = validator.parse(candidate)
+                result.rewrites.append(rewrite)
+                applied = True
+                break
+            if applied:
+                break
+        if not applied:
+            break
+
+    result.code = program.code
+    result.lines_after = len(program.lines)
+    result.tick_after = worst_tick(program)
+    return result
+
+
+# =============================================================================
+# CLI Interface
+# =============================================================================
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Peephole-optimize an IC10 script")
+    parser.add_argument("file", type=Path, help="Path to IC10 file to optimize")
+    parser.add_argument("-o", "--output", type=Path, help="Write the optimized script here")
+    parser.add_argument("--write", action="store_true", help="Overwrite the input file")
+    parser.add_argument("--diff", action="store_true", help="Print a unified diff")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    try:
+        code = args.file.read_text(encoding="utf-8")
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    result = optimize(code)
+
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        print(result.report())
+    if args.diff:
+        print(
+            "".join(
+                difflib.unified_diff(
+                    code.splitlines(keepends=True),
+                    result.code.splitlines(keepends=True),
+                    str(args.file),
+                    f"{args.file} (optimized)",
+                )
+            )
+        )
+    if args.output:
+        args.output.write_text(result.code, encoding="utf-8")
+    if args.write and result.rewrites:
+        args.file.write_text(result.code, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Single-pass IC10 tokenizer producing a compact per-line IR."""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+# =============================================================================
+# Operand Kinds
+# =============================================================================
+
+REGISTER = "register"  # r0-r15, ra, sp (and out-of-range rN)
+INDIRECT_REGISTER = "indirect_register"  # rr0, rrr1, ...
+DEVICE = "device"  # d0-d5, db (and out-of-range dN, bare dr)
+INDIRECT_DEVICE = "indirect_device"  # dr0, drr1, ...
+NUMBER = "number"  # 1, -2.5, 1e3, $FF, %1010
+HASH = "hash"  # HASH("...") / STR("...")
+IDENTIFIER = "identifier"  # labels, aliases, defines, logic types
+
+_TOKEN_RE = re.compile(r'\w+\("[^"]*"\)|\S+')
+_LABEL_RE = re.compile(r"(\w+):")
+_REGISTER_RE = re.compile(r"r(\d+)|ra|sp")
+_INDIRECT_REGISTER_RE = re.compile(r"r+r(\d+)")
+_DEVICE_RE = re.compile(r"d(\d+)|db|dr")
+_INDIRECT_DEVICE_RE = re.compile(r"dr+(\d+)")
+_NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_HASH_RE = re.compile(r'(?:HASH|STR)\("[^"]*"\)')
+
+
+# =============================================================================
+# Data Classes
+# =============================================================================
+
+
+@dataclass(slots=True)
+class Operand:
+    """A single typed instruction operand."""
+
+    text: str
+    kind: str
+    column: int  # 1-indexed column in the raw line
+    index: Optional[int] = None  # register/device number for rN, dN, rrN, drN
+    value: Optional[float] = None  # parsed value for NUMBER operands
+
+
+@dataclass(slots=True)
+class Line:
+    """One source line of IC10 code, tokenized."""
+
+    number: int  # 1-indexed line number
+    text: str  # raw line, as written
+    label: Optional[str] = None
+    label_column: Optional[int] = None
+    opcode: Optional[str] = None  # lowercased instruction name
+    opcode_column: Optional[int] = None
+    operands: tuple[Operand, ...] = ()
+    comment_column: Optional[int] = None  # 1-indexed start of comment, if any
+
+    @property
+    def is_code(self) -> bool:
+        """True for lines carrying a label or an instruction."""
+        return self.label is not None or self.opcode is not None
+
+
+@dataclass(slots=True)
+class Program:
+    """Tokenized IC10 program shared by every validation rule."""
+
+    code: str
+    lines: list[Line]
+    size: int  # bytes, UTF-8 encoded
+    labels: dict[str, int] = field(default_factory=dict)  # name -> line number
+    aliases: dict[str, str] = field(default_factory=dict)  # name -> target
+    defines: dict[str, str] = field(default_factory=dict)  # name -> value text
+    tree: Any = None  # tree-sitter Tree when parsed by the grammar
+
+    @property
+    def code_lines(self) -> list[Line]:
+        """Lines carrying a label or an instruction."""
+        return [line for line in self.lines if line.is_code]
+
+    @property
+    def instructions(self) -> list[Line]:
+        """Lines carrying an instruction."""
+        return [line for line in self.lines if line.opcode is not None]
+
+
+# =============================================================================
+# Tokenizer
+# =============================================================================
+
+
+def _comment_start(text: str) -> int:
+    """Return the index where a '#' or '//' comment starts, or -1."""
+    hash_at = text.find("#")
+    slash_at = text.find("//")
+    if hash_at < 0:
+        start = slash_at
+    elif slash_at < 0:
+        start = hash_at
+    else:
+        start = min(hash_at, slash_at)
+
+    if start < 0 or '"' not in text[:start]:
+        return start
+
+    # Comment markers inside HASH("...") strings don't start a comment
+    in_string = False
+    for i, char in enumerate(text):
+        if char == '"':
+            in_string = not in_string
+        elif not in_string and (
+            char == "#" or (char == "/" and text.startswith("//", i))
+        ):
+            return i
+    return -1
+
+
+def parse_number(text: str) -> Optional[float]:
+    """Parse an IC10 numeric literal (decimal, $hex or %binary)."""
+    if _NUMBER_RE.fullmatch(text):
+        return float(text)
+    try:
+        if text.startswith("$"):
+            return float(int(text[1:].replace("_", ""), 16))
+        if text.startswith("%"):
+            return float(int(text[1:].replace("_", ""), 2))
+    except ValueError:
+        return None
+    return None
+
+
+def classify_operand(text: str, column: int) -> Operand:
+    """Build a typed operand from its source text."""
+    first = text[0]
+    if first == "r" or first == "s":
+        match = _REGISTER_RE.fullmatch(text)
+        if match:
+            index = match.group(1)
+            return Operand(text, REGISTER, column, int(index) if index else None)
+        match = _INDIRECT_REGISTER_RE.fullmatch(text)
+        if match:
+            return Operand(text, INDIRECT_REGISTER, column, int(match.group(1)))
+    elif first == "d":
+        match = _DEVICE_RE.fullmatch(text)
+        if match:
+            index = match.group(1)
+            return Operand(text, DEVICE, column, int(index) if index else None)
+        match = _INDIRECT_DEVICE_RE.fullmatch(text)
+        if match:
+            return Operand(text, INDIRECT_DEVICE, column, int(match.group(1)))
+    elif first in "0123456789-+.$%":
+        value = parse_number(text)
+        if value is not None:
+            return Operand(text, NUMBER, column, value=value)
+    elif _HASH_RE.fullmatch(text):
+        return Operand(text, HASH, column)
+    return Operand(text, IDENTIFIER, column)
+
+
+def tokenize_line(number: int, text: str) -> Line:
+    """Tokenize a single source line."""
+    line = Line(number=number, text=text)
+
+    # Scraped scripts carry stray byte-order marks; treat them as whitespace
+    if "\ufeff" in text:
+        text = text.replace("\ufeff", " ")
+
+    end = _comment_start(text)
+    if end >= 0:
+        line.comment_column = end + 1
+    else:
+        end = len(text)
+
+    tokens = _TOKEN_RE.finditer(text, 0, end)
+    first = next(tokens, None)
+    if first is None:
+        return line
+
+    head = first.group()
+    head_start = first.start()
+    label_match = _LABEL_RE.match(head)
+    if label_match:
+        line.label = label_match.group(1)
+        line.label_column = head_start + 1
+        # "main:yield" carries an instruction after the label
+        head_start += label_match.end()
+        head = head[label_match.end() :]
+        if not head:
+            first = next(tokens, None)
+            if first is None:
+                return line
+            head = first.group()
+            head_start = first.start()
+
+    line.opcode = head.lower()
+    line.opcode_column = head_start + 1
+    line.operands = tuple(classify_operand(m.group(), m.start() + 1) for m in tokens)
+    return line
+
+
+def tokenize(code: str) -> Program:
+    """Tokenize IC10 source into a Program in a single pass."""
+    lines = [tokenize_line(i, text) for i, text in enumerate(code.split("\n"), 1)]
+    program = Program(code=code, lines=lines, size=len(code.encode("utf-8")))
+    index_program(program)
+    return program
+
+
+def index_program(program: Program) -> None:
+    """(Re)build the label, alias and define tables from the program's lines."""
+    program.labels.clear()
+    program.aliases.clear()
+    program.defines.clear()
+    for line in program.lines:
+        if line.label is not None:
+            program.labels[line.label] = line.number
+        if line.opcode == "alias" and len(line.operands) >= 2:
+            program.aliases[line.operands[0].text] = line.operands[1].text
+        elif line.opcode == "define" and len(line.operands) >= 2:
+            program.defines[line.operands[0].text] = line.operands[1].text
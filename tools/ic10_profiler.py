@@ -0,0 +1,349 @@
+"""Instruction-level profiler for IC10 scripts.
+
+Records how often each source line runs, how many instructions each tick
+uses (between yields/sleeps) and which loops are hottest, then exports a
+text report, JSON or collapsed stacks for flamegraph tools. Lines are
+reported by their 1-indexed number and text in the original source file.
+
+Profiling runs the chip on a copy of its Bytecode whose handlers are
+counting wrappers, so `Chip.run` itself is unchanged and unprofiled runs pay
+nothing:
+
+    profile = Profile.from_file(Path("examples/patterns/auto_item_sorter.ic10"))
+    chip = profile.chip()        # or profile.attach(existing_chip)
+    profile.run(chip, ticks=100)
+    print(profile.report())
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from copy import copy
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Optional
+
+from . import config
+from .ic10_cfg import BRANCH_OPCODES, CALL_OPCODES, RETURN, jump_target
+from .ic10_emulator import (
+    ERROR,
+    PIN_COUNT,
+    SLEEP,
+    YIELD,
+    Chip,
+    CompileError,
+    Device,
+    compile_program,
+)
+from .ic10_parser import tokenize
+
+_TOP_LEVEL = "(top)"  # frame name for lines before the first label
+
+
+class Profile:
+    """Execution counts of one program, gathered from any number of chips."""
+
+    def __init__(self, source: str, path: Optional[Path] = None):
+        program = tokenize(source)
+        self.path = path
+        self.bytecode = compile_program(program)
+        self.source = [line.text for line in program.lines]
+        self.frames = _label_frames(program.lines)
+        self.line_counts = [0] * self.bytecode.lines
+        self.back_edges: Counter[tuple[int, int]] = Counter()  # (from, to) line indices
+        self.tick_counts: list[int] = []  # instructions per tick
+        self._ticks: dict[int, int] = {}  # id(chip) -> instructions in its tick under way
+        links = _link_lines(program)
+        self.profiled = replace(
+            self.bytecode,
+            handlers=[
+                self._counted(i, h, i not in links)
+                for i, h in enumerate(self.bytecode.handlers)
+            ],
+        )
+
+    @classmethod
+    def from_file(cls, path: Path) -> "Profile":
+        return cls(path.read_text(encoding="utf-8"), path)
+
+    @property
+    def name(self) -> str:
+        """Source path relative to the project root where possible."""
+        if self.path is None:
+            return "script.ic10"
+        try:
+            return self.path.resolve().relative_to(config.PROJECT_ROOT.resolve()).as_posix()
+        except ValueError:
+            return self.path.as_posix()
+
+    @property
+    def instructions(self) -> int:
+        return sum(self.line_counts)
+
+    # -- Collection ---------------------------------------------------------
+
+    def _counted(self, index: int, handler: Callable, loops: bool) -> Callable:
+        """`handler` counting its line; `loops` is False for calls and returns."""
+        counts = self.line_counts
+        back_edges = self.back_edges
+        ticks = self._ticks
+        tick_counts = self.tick_counts
+
+        def counted(chip, m, a):
+            counts[index] += 1
+            key = id(chip)
+            ticks[key] = ticks.get(key, 0) + 1
+            target = handler(chip, m, a)
+            if target is not None:
+                if 0 <= target <= index:
+                    if loops:
+                        back_edges[(index, target)] += 1
+                elif target < -1:  # yield, sleep or hcf ends the tick
+                    tick_counts.append(ticks.pop(key))
+            return target
+
+        return counted
+
+    def chip(self, seed: int = 0) -> Chip:
+        """A new chip running the profiled bytecode."""
+        return Chip(self.profiled, seed)
+
+    def attach(self, chip: Chip) -> Chip:
+        """Profile an existing chip of this program (any scheduler can run it)."""
+        if chip.bytecode.ops != self.bytecode.ops:
+            raise ValueError("Chip runs a different program")
+        chip.bytecode = self.profiled
+        return chip
+
+    def detach(self, chip: Chip) -> Chip:
+        """Return a chip to the unprofiled bytecode."""
+        self.end_tick(chip)
+        chip.bytecode = self.bytecode
+        return chip
+
+    def end_tick(self, chip: Optional[Chip] = None) -> None:
+        """Close a tick cut short by the driver (step limit, fault, end).
+
+        Closes `chip`'s tick, or that of every chip when none is given.
+        """
+        keys = list(self._ticks) if chip is None else [id(chip)]
+        for key in keys:
+            count = self._ticks.pop(key, 0)
+            if count:
+                self.tick_counts.append(count)
+
+    def run(self, chip: Chip, ticks: int = 1, max_steps: int = 1_000_000) -> str:
+        """Run an attached chip through `ticks` yields/sleeps."""
+        status = None
+        for _ in range(ticks):
+            status = chip.run(max_steps)
+            if status not in (YIELD, SLEEP):
+                self.end_tick(chip)
+                break
+        return status
+
+    # -- Reports ------------------------------------------------------------
+
+    def mapped(self, source_map, source: str, path: Optional[Path] = None) -> "Profile":
+        """This profile of a minified script, reported on the source it came from.
+
+        `source_map` is the ic10_minifier.SourceMap of the script and `source`
+        the readable original. The copy is for reports only; keep running the
+        chips on this profile.
+        """
+        lines = tokenize(source).lines
+        mapped = copy(self)
+        mapped.path = path
+        mapped.source = [line.text for line in lines]
+        mapped.frames = _label_frames(lines)
+        mapped.line_counts = [0] * len(lines)
+        for i, count in enumerate(self.line_counts):
+            if count:
+                mapped.line_counts[source_map.original(i + 1) - 1] += count
+        mapped.back_edges = Counter()
+        for (end, start), iterations in self.back_edges.items():
+            edge = (source_map.original(end + 1) - 1, source_map.original(start + 1) - 1)
+            mapped.back_edges[edge] += iterations
+        mapped.tick_counts = list(self.tick_counts)
+        return mapped
+
+    def hot_loops(self, limit: int = 10) -> list[dict]:
+        """Backward jumps by instructions spent inside the loop they close."""
+        loops = []
+        for (end, start), iterations in self.back_edges.items():
+            loops.append(
+                {
+                    "start": start + 1,
+                    "end": end + 1,
+                    "label": self.frames[start],
+                    "iterations": iterations,
+                    "instructions": sum(self.line_counts[start : end + 1]),
+                }
+            )
+        loops.sort(key=lambda loop: (-loop["instructions"], loop["start"]))
+        return loops[:limit]
+
+    def to_dict(self) -> dict:
+        total = self.instructions
+        ticks = self.tick_counts
+        budget = config.MAX_INSTRUCTIONS_PER_TICK
+        return {
+            "path": self.name,
+            "instructions": total,
+            "ticks": {
+                "count": len(ticks),
+                "max": max(ticks, default=0),
+                "mean": round(sum(ticks) / len(ticks), 2) if ticks else 0.0,
+                "budget": budget,
+                "over_budget": sum(1 for count in ticks if count > budget),
+                "instructions": ticks,
+            },
+            "lines": [
+                {
+                    "line": i + 1,
+                    "source": self.source[i],
+                    "label": self.frames[i],
+                    "count": count,
+                    "percent": round(100 * count / total, 2),
+                }
+                for i, count in enumerate(self.line_counts)
+                if count
+            ],
+            "hot_loops": self.hot_loops(),
+        }
+
+    def collapsed(self) -> str:
+        """Collapsed stacks (`file;label;line count`) for flamegraph.pl/speedscope."""
+        root = self.name.replace(";", ",")
+        rows = []
+        for i, count in enumerate(self.line_counts):
+            if count:
+                text = self.source[i].strip().replace(";", ",")
+                rows.append(f"{root};{self.frames[i]};{i + 1}: {text} {count}")
+        return "\n".join(rows) + "\n" if rows else ""
+
+    def report(self, top: int = 10) -> str:
+        """Human-readable summary: hottest lines, ticks and loops."""
+        total = self.instructions
+        ticks = self.tick_counts
+        budget = config.MAX_INSTRUCTIONS_PER_TICK
+        out = [f"Profile: {self.name}", f"Instructions: {total}"]
+        if ticks:
+            over = sum(1 for count in ticks if count > budget)
+            out.append(
+                f"Ticks: {len(ticks)}, {sum(ticks) / len(ticks):.1f} instructions/tick"
+                f" (max {max(ticks)}, {over} over the {budget} budget)"
+            )
+        out += ["", "Hottest lines:"]
+        hottest = sorted(range(len(self.line_counts)), key=lambda i: -self.line_counts[i])
+        for i in hottest[:top]:
+            count = self.line_counts[i]
+            if not count:
+                break
+            out.append(
+                f"  {i + 1:>4}  {count:>10}  {100 * count / total:5.1f}%  {self.source[i].strip()}"
+            )
+        loops = self.hot_loops(top)
+        if loops:
+            out += ["", "Hottest loops:"]
+            for loop in loops:
+                out.append(
+                    f"  lines {loop['start']}-{loop['end']} ({loop['label']}):"
+                    f" {loop['iterations']} iterations, {loop['instructions']} instructions"
+                )
+        return "\n".join(out)
+
+
+def _label_frames(lines) -> list[str]:
+    """Enclosing label of every line, used as its stack frame."""
+    frames = []
+    current = _TOP_LEVEL
+    for line in lines:
+        if line.label is not None:
+            current = line.label
+        frames.append(current)
+    return frames
+
+
+def _link_lines(program) -> set[int]:
+    """Lines that call a function or return from one rather than loop."""
+    links = set()
+    for i, line in enumerate(program.lines):
+        if line.opcode in CALL_OPCODES:
+            links.add(i)
+        elif line.opcode in BRANCH_OPCODES and line.operands:
+            if jump_target(program, line, line.operands[-1]) == RETURN:
+                links.add(i)
+    return links
+
+
+# =============================================================================
+# CLI Interface
+# =============================================================================
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Profile an IC10 script offline")
+    parser.add_argument("file", type=Path, help="Path to IC10 file to profile")
+    parser.add_argument(
+        "--ticks", type=int, default=100, help="Yields/sleeps to run through (default: 100)"
+    )
+    parser.add_argument(
+        "--max-steps",
+        type=int,
+        default=1_000_000,
+        help="Instruction budget per tick (default: 1000000)",
+    )
+    parser.add_argument(
+        "--devices",
+        action="store_true",
+        help="Attach an empty device to every pin (d0-d5)",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Lines/loops to list")
+    parser.add_argument("--json", type=Path, help="Write the JSON profile here")
+    parser.add_argument(
+        "--collapsed", type=Path, help="Write collapsed stacks (flamegraph input) here"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for rand")
+    parser.add_argument(
+        "--source-map",
+        type=Path,
+        metavar="PATH",
+        help="Report lines of the source a minified script came from (see ic10_minifier)",
+    )
+    args = parser.parse_args()
+
+    try:
+        profile = Profile.from_file(args.file)
+    except (OSError, CompileError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    chip = profile.chip(args.seed)
+    if args.devices:
+        for pin in range(PIN_COUNT):
+            chip.pins[pin] = Device()
+    status = profile.run(chip, args.ticks, args.max_steps)
+    if args.source_map:
+        from .ic10_minifier import SourceMap
+
+        try:
+            source_map = SourceMap.load(args.source_map)
+            original = Path(source_map.source or "")
+            profile = profile.mapped(source_map, original.read_text(encoding="utf-8"), original)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error: source map {args.source_map}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    print(profile.report(args.top))
+    print(f"\nStatus: {status}" + (f" ({chip.error})" if chip.error else ""))
+    if args.json:
+        args.json.write_text(json.dumps(profile.to_dict(), indent=2) + "\n")
+    if args.collapsed:
+        args.collapsed.write_text(profile.collapsed())
+    sys.exit(1 if status == ERROR else 0)
+
+
+if __name__ == "__main__":
+    main()
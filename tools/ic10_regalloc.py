@@ -0,0 +1,416 @@
+"""Liveness-based register allocation for IC10 scripts.
+
+Scripts may alias more values than the chip has registers by naming virtual
+registers past r15 (`alias total r20`). The allocator computes which
+registers are live after every line over the CFG and gives each value a real
+register, so values whose lifetimes never overlap share one:
+
+    alias sum r16            alias sum r0
+    alias count r17          alias count r1
+    ...                      ...
+    alias peak r21    ->     alias peak r0    # sum is dead by then
+
+A value is one register's storage: every alias of it and every raw use.
+Values named only through aliases, and raw virtual registers, may move;
+raw uses of r0-r15 stay where they are. When more values are live at once
+than fit, the cheapest ones are spilled to the top of the chip's own stack:
+a `get` before each read, a `put` after each write, and the alias becomes a
+`define` of its stack address.
+
+    result = allocate(code)
+    print(result.report())
+"""
+
+import argparse
+import difflib
+import json
+import math
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from . import config
+from .ic10_cfg import Liveness, RegisterReference, build_cfg, resolve_operand
+from .ic10_emulator import STACK_SIZE
+from .ic10_optimizer import issue_counts, replace_operand, splice, unmovable, worst_tick
+from .ic10_parser import INDIRECT_DEVICE, NUMBER, REGISTER, Program
+from .ic10_validator import IC10Validator
+
+# r0-r15; ra and sp are never allocated
+REGISTERS = len([r for r in config.VALID_REGISTERS if r not in ("ra", "sp")])
+
+# Spill/rename rounds before giving up (each round spills at least one value)
+MAX_ROUNDS = 32
+
+
+class AllocationError(Exception):
+    """The script cannot be allocated (computed jumps, too many fixed registers)."""
+
+
+# =============================================================================
+# Data Classes
+# =============================================================================
+
+
+@dataclass
+class AllocationResult:
+    """The allocated source, where each value went and the pressure it relieved."""
+
+    code: str
+    registers_before: int  # distinct registers referenced
+    registers_after: int
+    pressure_before: int  # most registers live at once
+    pressure_after: int
+    lines_before: int
+    lines_after: int
+    tick_before: int  # worst-case instructions per tick (0 if none bounded)
+    tick_after: int
+    assigned: dict[str, str] = field(default_factory=dict)  # alias/virtual -> register
+    spilled: dict[str, int] = field(default_factory=dict)  # alias/virtual -> stack address
+
+    def to_dict(self) -> dict:
+        return {
+            "registers_before": self.registers_before,
+            "registers_after": self.registers_after,
+            "pressure_before": self.pressure_before,
+            "pressure_after": self.pressure_after,
+            "lines_before": self.lines_before,
+            "lines_after": self.lines_after,
+            "tick_before": self.tick_before,
+            "tick_after": self.tick_after,
+            "assigned": self.assigned,
+            "spilled": self.spilled,
+            "code": self.code,
+        }
+
+    def report(self) -> str:
+        out = [
+            f"Registers: {self.registers_before} -> {self.registers_after}",
+            f"Peak register pressure: {self.pressure_before} -> {self.pressure_after}",
+        ]
+        out += [f"  {name:<20} {register}" for name, register in self.assigned.items()]
+        if self.spilled:
+            out.append(f"Spilled to the stack: {len(self.spilled)}")
+            out += [f"  {name:<20} db {address}" for name, address in self.spilled.items()]
+        out.append(f"Lines: {self.lines_before} -> {self.lines_after}")
+        if self.tick_before or self.tick_after:
+            out.append(
+                f"Worst-case instructions per tick: {self.tick_before} -> {self.tick_after}"
+            )
+        return "\n".join(out)
+
+
+# =============================================================================
+# Allocation
+# =============================================================================
+
+
+def _liveness(program: Program) -> Liveness:
+    """Liveness of a program whose every register access is known statically."""
+    cfg = build_cfg(program)
+    computed = cfg.computed_jumps()
+    if computed:
+        raise AllocationError(f"line {computed[0] + 1} jumps to a computed address")
+    liveness = Liveness(cfg)
+    if liveness.indirect:
+        line = program.lines[liveness.indirect[0]]
+        raise AllocationError(f"line {line.number} reads registers indirectly")
+    return liveness
+
+
+def _color(
+    graph: dict[int, set[int]],
+    fixed: set[int],
+    costs: dict[int, float],
+    keep: bool = False,
+) -> tuple[dict[int, int], list[int]]:
+    """Optimistic (Briggs) graph coloring; returns colors and spilled nodes.
+
+    With `keep`, a node that is already a real register keeps it if free.
+    """
+    colors = {register: register for register in fixed}
+    remaining = {node for node in graph if node not in fixed}
+    degree = {node: len(graph[node]) for node in remaining}
+    stack = []
+    while remaining:
+        low = [node for node in remaining if degree[node] < REGISTERS]
+        if low:
+            node = min(low)
+        else:
+            node = min(remaining, key=lambda n: (costs[n] / max(degree[n], 1), n))
+        remaining.discard(node)
+        stack.append(node)
+        for other in graph[node]:
+            if other in remaining:
+                degree[other] -= 1
+
+    spilled = []
+    for node in reversed(stack):
+        taken = {colors[other] for other in graph[node] if other in colors}
+        if keep and node < REGISTERS and node not in taken:
+            colors[node] = node
+            continue
+        free = next((c for c in range(REGISTERS) if c not in taken), None)
+        if free is None:
+            spilled.append(node)
+        else:
+            colors[node] = free
+    return colors, spilled
+
+
+def _stack_addresses(program: Program) -> set[int]:
+    """Constant addresses the script itself reads or writes on `db`."""
+    used = set()
+    for line in program.lines:
+        operands = line.operands
+        if line.opcode == "poke" and len(operands) == 2:
+            address = operands[0]
+        elif line.opcode == "get" and len(operands) == 3 and operands[1].text == "db":
+            address = operands[2]
+        elif line.opcode == "put" and len(operands) == 3 and operands[0].text == "db":
+            address = operands[1]
+        else:
+            continue
+        if address.kind == NUMBER and address.value is not None:
+            used.add(int(address.value))
+    return used
+
+
+def _spill(
+    program: Program,
+    liveness: Liveness,
+    spilled: list[int],
+    slots: dict[int, int],
+    next_register: int,
+) -> tuple[str, int]:
+    """Source with `spilled` registers kept on the stack between uses.
+
+    Every reference goes through a fresh virtual register that lives from a
+    `get` just before the line to a `put` just after it; a label on the line
+    moves to its first `get`. Also returns the next unused virtual register.
+    """
+    taken = _stack_addresses(program) | set(slots.values())
+    for register in spilled:
+        address = STACK_SIZE - 1
+        while address in taken:
+            address -= 1
+        if address < 0:
+            raise AllocationError("no free stack address left to spill to")
+        slots[register] = address
+        taken.add(address)
+
+    names: dict[int, str] = {}
+    for i, line in enumerate(program.lines):
+        if line.opcode == "alias" and len(line.operands) == 2:
+            target, _ = resolve_operand(program, line.operands[1])
+            if target.kind in (REGISTER, INDIRECT_DEVICE) and target.index in slots:
+                names.setdefault(target.index, line.operands[0].text)
+
+    replace: dict[int, str] = {}
+    before: dict[int, list[str]] = {}
+    after: dict[int, list[str]] = {}
+    by_line: dict[int, list[RegisterReference]] = {}
+    for reference in liveness.references:
+        if reference.register in slots:
+            by_line.setdefault(reference.line, []).append(reference)
+
+    for i, references in by_line.items():
+        text = program.lines[i].text
+        temps: dict[int, int] = {}
+        for reference in sorted(references, key=lambda r: -r.operand.column):
+            register = reference.register
+            if register not in temps:
+                temps[register] = next_register
+                next_register += 1
+            prefix = "dr" if reference.device else "r"
+            text = replace_operand(text, reference.operand, f"{prefix}{temps[register]}")
+        replace[i] = text
+        for register, temp in temps.items():
+            address = names.get(register, str(slots[register]))
+            if liveness.uses[i] >> register & 1:
+                before.setdefault(i, []).append(f"get r{temp} db {address}")
+            if liveness.defs[i] >> register & 1:
+                after.setdefault(i, []).append(f"put db {address} r{temp}")
+
+    for i, gets in before.items():
+        line = program.lines[i]
+        if line.label is not None:
+            # a jump to the label must run the reloads too
+            start = line.label_column - 1
+            end = start + len(line.label) + 1
+            replace[i] = replace[i][:start] + replace[i][end:].lstrip()
+            gets[0] = f"{line.label}: {gets[0]}"
+
+    for i, line in enumerate(program.lines):
+        if line.opcode == "alias" and len(line.operands) == 2:
+            target, _ = resolve_operand(program, line.operands[1])
+            if target.kind in (REGISTER, INDIRECT_DEVICE) and target.index in slots:
+                replace[i] = f"define {line.operands[0].text} {slots[target.index]}"
+
+    texts = splice(program, replace=replace, before=before, after=after)
+    return "\n".join(texts), next_register
+
+
+def _movable(liveness: Liveness) -> set[int]:
+    """Registers only named through aliases, plus every virtual register."""
+    fixed = {
+        reference.register
+        for reference in liveness.references
+        if reference.register < REGISTERS and reference.alias is None
+    }
+    return liveness.registers() - fixed
+
+
+def _rename(program: Program, colors: dict[int, int]) -> str:
+    """Source with alias targets and raw virtual registers renumbered."""
+    texts = []
+    for line in program.lines:
+        text = line.text
+        operands = line.operands[1:] if line.opcode == "alias" else line.operands
+        if line.opcode != "define":
+            for operand in sorted(operands, key=lambda o: -o.column):
+                if operand.kind not in (REGISTER, INDIRECT_DEVICE) or operand.index is None:
+                    continue
+                color = colors.get(operand.index)
+                if color is not None and color != operand.index:
+                    prefix = "dr" if operand.kind == INDIRECT_DEVICE else "r"
+                    text = replace_operand(text, operand, f"{prefix}{color}")
+        texts.append(text)
+    return "\n".join(texts)
+
+
+def _names(program: Program, liveness: Liveness) -> dict[int, str]:
+    """A readable name per register: its first alias, else the register."""
+    names: dict[int, str] = {}
+    for line in program.lines:
+        if line.opcode == "alias" and len(line.operands) == 2:
+            target, _ = resolve_operand(program, line.operands[1])
+            if target.kind in (REGISTER, INDIRECT_DEVICE) and target.index is not None:
+                names.setdefault(target.index, line.operands[0].text)
+    for register in liveness.registers():
+        names.setdefault(register, f"r{register}")
+    return names
+
+
+def allocate(code: str, validator: Optional[IC10Validator] = None) -> AllocationResult:
+    """Map every value of a script onto r0-r15, spilling to the stack if needed."""
+    validator = validator or IC10Validator()
+    program = validator.parse(code)
+    liveness = _liveness(program)
+    names = _names(program, liveness)
+    movable = _movable(liveness)
+    original = liveness.registers()
+    result = AllocationResult(
+        code=code,
+        registers_before=len(original),
+        registers_after=0,
+        pressure_before=liveness.pressure(),
+        pressure_after=0,
+        lines_before=len(program.lines),
+        lines_after=0,
+        tick_before=worst_tick(program),
+        tick_after=0,
+    )
+    fixed = original - movable
+    slots: dict[int, int] = {}
+    first_temp = next_temp = max(original | {REGISTERS - 1}) + 1
+
+    for _ in range(MAX_ROUNDS):
+        graph = liveness.interference()
+        costs: dict[int, float] = Counter(reference.register for reference in liveness.references)
+        for register in graph:
+            if register >= first_temp:
+                costs[register] = math.inf  # a spill temp cannot be spilled again
+        colors, spilled = _color(graph, fixed & set(graph), costs)
+        if not spilled:
+            kept, unkept = _color(graph, fixed & set(graph), costs, keep=True)
+            if not unkept and len(set(kept.values())) <= len(set(colors.values())):
+                colors = kept  # as few registers, and a smaller diff
+            break
+        if any(register >= first_temp for register in spilled):
+            raise AllocationError("more registers are live at once than fit, even spilled")
+        reason = unmovable(program)
+        if reason is not None:
+            raise AllocationError(f"cannot insert spill code: {reason}")
+        code, next_temp = _spill(program, liveness, spilled, slots, next_temp)
+        program = validator.parse(code)
+        liveness = _liveness(program)
+    else:
+        raise AllocationError(f"no allocation found in {MAX_ROUNDS} rounds")
+
+    code = _rename(program, colors)
+    baseline = issue_counts(validator.validate(result.code))
+    validation = validator.validate(code)
+    counts = issue_counts(validation)
+    for issue in validation.errors + validation.warnings:
+        if counts[issue.rule] > baseline[issue.rule]:
+            raise AllocationError(
+                f"the result fails {issue.rule} on line {issue.line}: {issue.message}"
+            )
+
+    program = validator.parse(code)
+    final = _liveness(program)
+    result.code = code
+    result.registers_after = len(final.registers())
+    result.pressure_after = final.pressure()
+    result.lines_after = len(program.lines)
+    result.tick_after = worst_tick(program)
+    for register in sorted(original):
+        if register in slots:
+            result.spilled[names[register]] = slots[register]
+        elif register in movable and colors[register] != register:
+            result.assigned[names[register]] = f"r{colors[register]}"
+    return result
+
+
+# =============================================================================
+# CLI Interface
+# =============================================================================
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Allocate IC10 registers by liveness")
+    parser.add_argument("file", type=Path, help="Path to IC10 file to allocate")
+    parser.add_argument("-o", "--output", type=Path, help="Write the allocated script here")
+    parser.add_argument("--write", action="store_true", help="Overwrite the input file")
+    parser.add_argument("--diff", action="store_true", help="Print a unified diff")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    try:
+        code = args.file.read_text(encoding="utf-8")
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        result = allocate(code)
+    except AllocationError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        print(result.report())
+    if args.diff:
+        print(
+            "".join(
+                difflib.unified_diff(
+                    code.splitlines(keepends=True),
+                    result.code.splitlines(keepends=True),
+                    str(args.file),
+                    f"{args.file} (allocated)",
+                )
+            )
+        )
+    if args.output:
+        args.output.write_text(result.code, encoding="utf-8")
+    if args.write and result.code != code:
+        args.file.write_text(result.code, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Event-driven tick scheduler for many emulated IC10 chips.
+
+Each game tick, every awake chip runs until it yields or sleeps, for at most
+config.MAX_INSTRUCTIONS_PER_TICK instructions; a chip cut off at the cap
+carries on from there next tick, as in the game. Yielding chips run again on
+the next tick; sleeping chips wait in a min-heap keyed by wake tick, and
+ticks on which no chip is awake are skipped outright, so a base that mostly
+sleeps costs only its wake-ups.
+
+    scheduler = Scheduler([Chip.from_source(code) for _ in range(10_000)])
+    scheduler.run(config.DAY_TICKS)
+"""
+
+import argparse
+import heapq
+import math
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Union
+
+from . import config
+from .ic10_emulator import (
+    ERROR,
+    LIMIT,
+    PIN_COUNT,
+    SLEEP,
+    YIELD,
+    Chip,
+    CompileError,
+    Device,
+    compile_program,
+)
+
+
+@dataclass
+class SchedulerStats:
+    """Work done by a Scheduler so far."""
+
+    ticks: int = 0  # game ticks advanced
+    idle_ticks: int = 0  # skipped because every chip was asleep
+    runs: int = 0  # chip wake-ups
+    instructions: int = 0
+    overruns: int = 0  # chips that hit the per-tick instruction cap
+
+
+def _wake_tick(tick: int, seconds: float) -> Union[int, float]:
+    """First tick after `sleep seconds` issued on `tick`."""
+    if not seconds > 0:  # also NaN
+        return tick + 1
+    if seconds == math.inf:
+        return math.inf
+    return tick + max(1, math.ceil(seconds / config.TICK_SECONDS))
+
+
+class Scheduler:
+    """Runs chips tick by tick, waking sleepers from a heap.
+
+    Chips run in the order they were added within a tick, so chips sharing
+    devices see each other's writes deterministically. A chip that uses the
+    whole per-tick budget without yielding carries on next tick, or faults
+    with "CPU overrun" with `overrun_error=True`.
+    """
+
+    def __init__(
+        self,
+        chips: Iterable[Chip] = (),
+        budget: int = config.MAX_INSTRUCTIONS_PER_TICK,
+        overrun_error: bool = False,
+    ):
+        self.tick = 0
+        self.budget = budget
+        self.overrun_error = overrun_error
+        self.stats = SchedulerStats()
+        self.stopped: list[Chip] = []  # halted, ended or faulted, in stop order
+        self._awake: list[tuple[int, Chip]] = []  # (order, chip) due this tick
+        self._sleeping: list[tuple[Union[int, float], int, Chip]] = []  # (wake, order, chip)
+        self._order = 0
+        for chip in chips:
+            self.add(chip)
+
+    def __len__(self) -> int:
+        """Chips still scheduled (awake or asleep)."""
+        return len(self._awake) + len(self._sleeping)
+
+    def add(self, chip: Chip, delay: int = 0) -> None:
+        """Schedule a chip to start `delay` ticks from now."""
+        order = self._order
+        self._order += 1
+        if delay <= 0:
+            self._awake.append((order, chip))
+        else:
+            heapq.heappush(self._sleeping, (self.tick + delay, order, chip))
+
+    def run(self, ticks: int) -> SchedulerStats:
+        """Advance the game clock by `ticks` ticks."""
+        end = self.tick + ticks
+        budget = self.budget
+        overrun_error = self.overrun_error
+        sleeping = self._sleeping
+        stopped = self.stopped
+        stats = self.stats
+        awake = self._awake
+        tick = self.tick
+        while tick < end:
+            if sleeping and sleeping[0][0] <= tick:
+                while sleeping and sleeping[0][0] <= tick:
+                    _, order, chip = heapq.heappop(sleeping)
+                    awake.append((order, chip))
+                awake.sort()
+            if not awake:
+                skip = min(sleeping[0][0], end) if sleeping else end
+                stats.idle_ticks += skip - tick
+                tick = skip
+                continue
+
+            current, awake = awake, []
+            instructions = 0
+            for entry in current:
+                chip = entry[1]
+                steps = chip.steps
+                status = chip.run(budget)
+                instructions += chip.steps - steps
+                if status == YIELD:
+                    awake.append(entry)
+                elif status == SLEEP:
+                    heapq.heappush(
+                        sleeping, (_wake_tick(tick, chip.sleep_seconds), entry[0], chip)
+                    )
+                elif status == LIMIT:
+                    stats.overruns += 1
+                    if overrun_error:
+                        chip.status = ERROR
+                        chip.error = f"Line {chip.pc + 1}: CPU overrun"
+                        stopped.append(chip)
+                    else:
+                        awake.append(entry)
+                else:
+                    stopped.append(chip)
+            stats.runs += len(current)
+            stats.instructions += instructions
+            tick += 1
+        self._awake = awake
+        self.tick = end
+        stats.ticks += ticks
+        return stats
+
+
+# =============================================================================
+# CLI Interface
+# =============================================================================
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Run many IC10 chips on the game clock")
+    parser.add_argument("file", type=Path, help="Path to IC10 file to run")
+    parser.add_argument("--chips", type=int, default=1, help="Copies to run (default: 1)")
+    parser.add_argument(
+        "--ticks",
+        type=int,
+        default=config.DAY_TICKS,
+        help="Game ticks to simulate (default: one day, %(default)s)",
+    )
+    parser.add_argument(
+        "--devices",
+        action="store_true",
+        help="Attach an empty device to every pin (d0-d5)",
+    )
+    parser.add_argument(
+        "--overrun-error",
+        action="store_true",
+        help="Chips over the per-tick instruction cap fault instead of continuing next tick",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for rand (chip i gets seed + i)")
+    parser.add_argument(
+        "--jit", action="store_true", help="Run compiled blocks (tools.ic10_jit)"
+    )
+    args = parser.parse_args()
+
+    engine = Chip
+    if args.jit:
+        from .ic10_jit import JitChip as engine
+
+    try:
+        bytecode = compile_program(args.file.read_text(encoding="utf-8"))
+    except (OSError, CompileError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    chips = []
+    for i in range(args.chips):
+        chip = engine(bytecode, args.seed + i)
+        if args.devices:
+            for pin in range(PIN_COUNT):
+                chip.pins[pin] = Device()
+        chips.append(chip)
+    scheduler = Scheduler(chips, overrun_error=args.overrun_error)
+
+    start = time.perf_counter()
+    stats = scheduler.run(args.ticks)
+    elapsed = time.perf_counter() - start
+
+    print(f"Ticks: {stats.ticks} ({stats.idle_ticks} idle, skipped)")
+    print(f"Wake-ups: {stats.runs}")
+    print(f"Instructions: {stats.instructions}")
+    print(f"Overruns: {stats.overruns}")
+    print(f"Elapsed: {elapsed:.2f}s")
+    statuses = Counter(chip.status for chip in chips)
+    for status, count in statuses.most_common():
+        print(f"  {status}: {count}")
+    errors = Counter(chip.error for chip in chips if chip.error)
+    for error, count in errors.most_common(5):
+        print(f"  {count} x {error}")
+    sys.exit(1 if statuses.get(ERROR) else 0)
+
+
+if __name__ == "__main__":
+    main()
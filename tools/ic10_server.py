@@ -0,0 +1,369 @@
+"""Resident IC10 validation server speaking LSP over stdio.
+
+Keeps one warm IC10Validator for the life of the process, tracks open
+documents and publishes diagnostics after every open/change. Besides the
+standard lifecycle and textDocument/* notifications it answers a custom
+"ic10/validate" request returning the full ValidationResult dict, so simple
+JSON-RPC clients can use it without implementing LSP documents.
+"""
+
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Optional
+
+from .ic10_treesitter import SyntaxDocument
+from .ic10_validator import IC10Validator, ValidationIssue, ValidationResult
+
+# LSP DiagnosticSeverity
+SEVERITY = {"error": 1, "warning": 2, "info": 3}
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# LSP MessageType for window/logMessage
+LOG_ERROR = 1
+
+# LSP PositionEncodingKind: characters count UTF-16 code units unless the
+# client also offers UTF-32, i.e. code points like Python strings
+UTF16 = "utf-16"
+UTF32 = "utf-32"
+
+
+class InvalidParams(Exception):
+    """A request's params are missing, malformed or name an unknown document."""
+
+
+# =============================================================================
+# Documents
+# =============================================================================
+
+
+def utf16_length(text: str) -> int:
+    """Length of `text` in UTF-16 code units."""
+    return len(text) + sum(1 for char in text if ord(char) > 0xFFFF)
+
+
+def from_utf16(text: str, units: int) -> int:
+    """Index into `text` of the UTF-16 offset `units` (clamped to the end)."""
+    count = 0
+    for index, char in enumerate(text):
+        if count >= units:
+            return index
+        count += 2 if ord(char) > 0xFFFF else 1
+    return len(text)
+
+
+@dataclass
+class Document:
+    """An open text document tracked by the server."""
+
+    uri: str
+    text: str
+    version: int = 0
+    syntax: Optional[SyntaxDocument] = None  # incremental tree, if parser loaded
+    encoding: str = UTF16  # how LSP positions count characters
+
+    def offset(self, line: int, character: int) -> int:
+        """Convert an LSP (line, character) position to a string offset."""
+        start = 0
+        for _ in range(line):
+            newline = self.text.find("\n", start)
+            if newline < 0:
+                return len(self.text)
+            start = newline + 1
+        line_end = self.text.find("\n", start)
+        if line_end < 0:
+            line_end = len(self.text)
+        if self.encoding == UTF16:
+            character = from_utf16(self.text[start:line_end], character)
+        return min(start + character, line_end)
+
+    def apply_change(self, change: dict) -> None:
+        """Apply one TextDocumentContentChangeEvent (full or ranged)."""
+        if "range" not in change:
+            self.text = change["text"]
+            if self.syntax is not None:
+                self.syntax.set_text(self.text)
+            return
+        start = change["range"]["start"]
+        end = change["range"]["end"]
+        start_offset = self.offset(start["line"], start["character"])
+        end_offset = self.offset(end["line"], end["character"])
+        self.text = self.text[:start_offset] + change["text"] + self.text[end_offset:]
+        if self.syntax is not None:
+            self.syntax.edit(start_offset, end_offset, change["text"])
+
+
+# =============================================================================
+# Server
+# =============================================================================
+
+
+def to_diagnostic(issue: ValidationIssue, lines: list[str], encoding: str = UTF16) -> dict:
+    """Convert a ValidationIssue to an LSP Diagnostic."""
+    line = max(issue.line - 1, 0)
+    text = lines[line] if line < len(lines) else ""
+    start = (issue.column - 1) if issue.column else 0
+    end = len(text)
+    if issue.column:
+        # Underline the token starting at the column
+        token_end = text.find(" ", start)
+        end = token_end if token_end > start else len(text)
+    end = max(end, start)
+    if encoding == UTF16:
+        start, end = utf16_length(text[:start]), utf16_length(text[:end])
+    return {
+        "range": {
+            "start": {"line": line, "character": start},
+            "end": {"line": line, "character": end},
+        },
+        "severity": SEVERITY.get(issue.severity, 3),
+        "code": issue.rule,
+        "source": "ic10",
+        "message": issue.message,
+    }
+
+
+class IC10Server:
+    """LSP/JSON-RPC server around a single warm IC10Validator."""
+
+    def __init__(
+        self,
+        validator: Optional[IC10Validator] = None,
+        reader: Optional[BinaryIO] = None,
+        writer: Optional[BinaryIO] = None,
+    ):
+        self.validator = validator or IC10Validator()
+        self.reader = reader or sys.stdin.buffer
+        self.writer = writer or sys.stdout.buffer
+        self.documents: dict[str, Document] = {}
+        self.shutdown_requested = False
+        self.running = True
+        self.encoding = UTF16  # until the client offers UTF-32
+
+        # Warm regexes and rule state before the first request arrives
+        self.validator.validate("yield")
+
+    # -------------------------------------------------------------------------
+    # Transport
+    # -------------------------------------------------------------------------
+
+    def read_message(self) -> Optional[dict]:
+        """Read one Content-Length framed message, or None at EOF."""
+        length = None
+        while True:
+            header = self.reader.readline()
+            if not header:
+                return None
+            header = header.strip()
+            if not header:
+                break
+            name, _, value = header.decode("ascii").partition(":")
+            if name.lower() == "content-length":
+                length = int(value.strip())
+        if length is None:
+            return None
+        return json.loads(self.reader.read(length))
+
+    def send(self, message: dict) -> None:
+        """Write one Content-Length framed message."""
+        body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+        self.writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii"))
+        self.writer.write(body)
+        self.writer.flush()
+
+    def notify(self, method: str, params: Any) -> None:
+        """Send a JSON-RPC notification."""
+        self.send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    # -------------------------------------------------------------------------
+    # Dispatch
+    # -------------------------------------------------------------------------
+
+    def serve(self) -> int:
+        """Process messages until exit; return the process exit code."""
+        while self.running:
+            try:
+                message = self.read_message()
+            except (ValueError, UnicodeDecodeError) as e:
+                self.send(
+                    {
+                        "jsonrpc": "2.0",
+                        "id": None,
+                        "error": {"code": PARSE_ERROR, "message": str(e)},
+                    }
+                )
+                continue
+            if message is None:
+                break
+            self.handle(message)
+        return 0 if self.shutdown_requested else 1
+
+    def handle(self, message: Any) -> None:
+        """Dispatch a single request or notification.
+
+        A failing handler never stops the server: requests get an error
+        response and notifications an error in the client's log. Only
+        InvalidParams is blamed on the client; anything else is a bug and
+        comes back as an internal error.
+        """
+        method = message.get("method") if isinstance(message, dict) else None
+        if not isinstance(method, str):
+            request_id = message.get("id") if isinstance(message, dict) else None
+            self.send(
+                {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "error": {"code": INVALID_REQUEST, "message": "Expected a request object"},
+                }
+            )
+            return
+        params = message.get("params") or {}
+        handler = getattr(self, "on_" + method.replace("/", "_").replace("$", "_"), None)
+
+        if "id" not in message:
+            # Notifications never get a response
+            if handler is None:
+                return
+            try:
+                handler(params)
+            except Exception as e:
+                self.notify(
+                    "window/logMessage",
+                    {"type": LOG_ERROR, "message": f"{method} failed: {e!r}"},
+                )
+            return
+
+        response: dict[str, Any] = {"jsonrpc": "2.0", "id": message["id"]}
+        if handler is None:
+            response["error"] = {
+                "code": METHOD_NOT_FOUND,
+                "message": f"Unknown method '{method}'",
+            }
+        else:
+            try:
+                if not isinstance(params, dict):
+                    raise InvalidParams("Expected params to be an object")
+                response["result"] = handler(params)
+            except InvalidParams as e:
+                response["error"] = {"code": INVALID_PARAMS, "message": str(e)}
+            except Exception as e:
+                response["error"] = {"code": INTERNAL_ERROR, "message": repr(e)}
+        self.send(response)
+
+    def publish(self, document: Document) -> ValidationResult:
+        """Validate a document and publish its diagnostics."""
+        if document.syntax is not None:
+            result = self.validator.validate_program(document.syntax.program)
+        else:
+            result = self.validator.validate(document.text)
+        lines = document.text.split("\n")
+        issues = result.errors + result.warnings + result.info
+        self.notify(
+            "textDocument/publishDiagnostics",
+            {
+                "uri": document.uri,
+                "version": document.version,
+                "diagnostics": [
+                    to_diagnostic(issue, lines, document.encoding) for issue in issues
+                ],
+            },
+        )
+        return result
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def on_initialize(self, params: dict) -> dict:
+        general = (params.get("capabilities") or {}).get("general") or {}
+        if UTF32 in (general.get("positionEncodings") or ()):
+            self.encoding = UTF32
+        return {
+            "capabilities": {
+                "positionEncoding": self.encoding,
+                # 2 = incremental sync
+                "textDocumentSync": {"openClose": True, "change": 2},
+            },
+            "serverInfo": {"name": "ic10-validator"},
+        }
+
+    def on_initialized(self, params: dict) -> None:
+        pass
+
+    def on_shutdown(self, params: dict) -> None:
+        self.shutdown_requested = True
+        return None
+
+    def on_exit(self, params: dict) -> None:
+        self.running = False
+
+    # -------------------------------------------------------------------------
+    # Documents
+    # -------------------------------------------------------------------------
+
+    def on_textDocument_didOpen(self, params: dict) -> None:
+        item = params["textDocument"]
+        document = Document(
+            item["uri"], item["text"], item.get("version", 0), encoding=self.encoding
+        )
+        if self.validator.parser is not None:
+            document.syntax = SyntaxDocument(self.validator.parser, document.text)
+        self.documents[document.uri] = document
+        self.publish(document)
+
+    def on_textDocument_didChange(self, params: dict) -> None:
+        identifier = params["textDocument"]
+        document = self.documents.get(identifier["uri"])
+        if document is None:
+            return
+        for change in params["contentChanges"]:
+            document.apply_change(change)
+        document.version = identifier.get("version", document.version + 1)
+        self.publish(document)
+
+    def on_textDocument_didSave(self, params: dict) -> None:
+        pass
+
+    def on_textDocument_didClose(self, params: dict) -> None:
+        uri = params["textDocument"]["uri"]
+        self.documents.pop(uri, None)
+        # Clear diagnostics for the closed document
+        self.notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+
+    # -------------------------------------------------------------------------
+    # Plain JSON-RPC
+    # -------------------------------------------------------------------------
+
+    def on_ic10_validate(self, params: dict) -> dict:
+        """Validate code (or an open document by URI) and return the result."""
+        if "uri" in params:
+            uri = params["uri"]
+            document = self.documents.get(uri) if isinstance(uri, str) else None
+            if document is None:
+                raise InvalidParams(f"Unknown document {uri!r}")
+            code = document.text
+        else:
+            code = params.get("code")
+            if not isinstance(code, str):
+                raise InvalidParams("Expected 'code' (a string) or 'uri'")
+        return self.validator.validate(code).to_dict()
+
+
+# =============================================================================
+# CLI Interface
+# =============================================================================
+
+
+def main():
+    """CLI entry point (see also: python -m tools.ic10_validator --serve)."""
+    sys.exit(IC10Server().serve())
+
+
+if __name__ == "__main__":
+    main()
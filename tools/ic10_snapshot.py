@@ -0,0 +1,237 @@
+"""Compact snapshots and deterministic replay of emulated IC10 chips.
+
+A Snapshot is the chip's registers, stack, program counter, sleep timer and
+status plus every attached device (pins and batch network), zlib-compressed
+into a few hundred bytes. Restoring it against the same Bytecode gives a chip
+that runs identically. For branching what-if runs in memory, `Chip.fork()`
+is cheaper still: it copies the small state and shares the stack until one
+side writes to it.
+
+    start = Snapshot.capture(chip)
+    recorder = Recorder(chip)
+    for tick in range(100):
+        chip.pins[0].write("Pressure", readings[tick])   # inputs from outside
+        recorder.run()
+    again = replay(start, chip.bytecode, recorder.trace)
+    assert Snapshot.capture(again) == Snapshot.capture(chip)
+"""
+
+import json
+import struct
+import zlib
+from array import array
+from dataclasses import dataclass
+from typing import Any, Union
+
+from .ic10_emulator import (
+    END,
+    ERROR,
+    HALT,
+    LIMIT,
+    OPCODE_IDS,
+    REGISTER_COUNT,
+    SLEEP,
+    STACK_SIZE,
+    YIELD,
+    Bytecode,
+    Chip,
+    Device,
+)
+from .ic10_network import DeviceNetwork
+
+FORMAT_VERSION = 1
+
+_STATUSES = (None, YIELD, SLEEP, HALT, END, ERROR, LIMIT)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+# version, program fingerprint, pc, steps, sleep seconds, status, has rng, meta length
+_HEADER = struct.Struct("<BIIQdBBI")
+_RAND = OPCODE_IDS["rand"]
+
+# One recorded input: (device index, logic type or (slot, logic type), value)
+TraceEntry = tuple[int, Union[str, tuple[int, str]], float]
+
+
+def program_fingerprint(bytecode: Bytecode) -> int:
+    """CRC-32 of the opcodes and constants, to refuse restoring onto another program."""
+    return zlib.crc32(array("d", bytecode.constants).tobytes(), zlib.crc32(bytecode.ops.tobytes()))
+
+
+def _device_table(chip: Chip) -> list[Device]:
+    """Unique devices in a stable order: housing, pins d0-d5, then network."""
+    table = [chip.housing]
+    seen = {id(chip.housing)}
+    for device in [*chip.pins, *chip.network]:
+        if device is not None and id(device) not in seen:
+            seen.add(id(device))
+            table.append(device)
+    return table
+
+
+# =============================================================================
+# Snapshots
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Serialized chip and device state."""
+
+    data: bytes
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @classmethod
+    def capture(cls, chip: Chip) -> "Snapshot":
+        table = _device_table(chip)
+        index = {id(device): i for i, device in enumerate(table)}
+        meta = {
+            "error": chip.error,
+            "devices": [
+                {
+                    "prefab": device.prefab_hash,
+                    "name": device.name_hash,
+                    "logic": dict(device.logic),
+                    "slots": [dict(slot) for slot in device.slots],
+                    "reagents": [[*key, value] for key, value in device.reagents.items()],
+                    "stack": list(device.stack) if i else None,  # housing: chip stack
+                }
+                for i, device in enumerate(table)
+            ],
+            "pins": [-1 if device is None else index[id(device)] for device in chip.pins],
+            "network": [index[id(device)] for device in chip.network],
+        }
+        encoded = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+        with_rng = _RAND in chip.bytecode.ops
+        parts = [
+            _HEADER.pack(
+                FORMAT_VERSION,
+                program_fingerprint(chip.bytecode),
+                chip.pc,
+                chip.steps,
+                chip.sleep_seconds,
+                _STATUS_CODES[chip.status],
+                with_rng,
+                len(encoded),
+            ),
+            encoded,
+            array("d", chip.memory[:REGISTER_COUNT]).tobytes(),
+            array("d", chip.stack).tobytes(),
+        ]
+        if with_rng:  # only scripts using rand need the generator state
+            _, state, gauss = chip.random.getstate()
+            parts.append(array("I", state).tobytes())
+            parts.append(array("d", [gauss if gauss is not None else float("nan")]).tobytes())
+        return cls(zlib.compress(b"".join(parts)))
+
+    def restore(self, bytecode: Bytecode) -> Chip:
+        """A new chip in the captured state, running `bytecode`."""
+        payload = zlib.decompress(self.data)
+        version, fingerprint, pc, steps, sleep_seconds, status, with_rng, size = (
+            _HEADER.unpack_from(payload)
+        )
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        if fingerprint != program_fingerprint(bytecode):
+            raise ValueError("Snapshot was taken from a different program")
+        offset = _HEADER.size
+        meta = json.loads(payload[offset : offset + size])
+        offset += size
+
+        chip = Chip(bytecode)
+        registers = array("d")
+        registers.frombytes(payload[offset : offset + 8 * REGISTER_COUNT])
+        offset += 8 * REGISTER_COUNT
+        chip.memory[:REGISTER_COUNT] = registers.tolist()
+        stack = array("d")
+        stack.frombytes(payload[offset : offset + 8 * STACK_SIZE])
+        offset += 8 * STACK_SIZE
+        chip.stack[:] = stack.tolist()
+        if with_rng:
+            state = array("I")
+            state.frombytes(payload[offset : offset + state.itemsize * 625])
+            offset += state.itemsize * 625
+            gauss = array("d")
+            gauss.frombytes(payload[offset : offset + 8])
+            chip.random.setstate((3, tuple(state), None if gauss[0] != gauss[0] else gauss[0]))
+
+        devices = []
+        for i, data in enumerate(meta["devices"]):
+            device = chip.housing if i == 0 else Device(stack=data["stack"])
+            device.prefab_hash = data["prefab"]
+            device.name_hash = data["name"]
+            device.logic = data["logic"]
+            device.slots = data["slots"]
+            device.reagents = {(mode, hash_): value for mode, hash_, value in data["reagents"]}
+            devices.append(device)
+        chip.pins = [None if i < 0 else devices[i] for i in meta["pins"]]
+        chip.network = DeviceNetwork(devices[i] for i in meta["network"])
+        chip.pc = pc
+        chip.steps = steps
+        chip.sleep_seconds = sleep_seconds
+        chip.status = _STATUSES[status]
+        chip.error = meta["error"]
+        return chip
+
+
+# =============================================================================
+# Recording and Replay
+# =============================================================================
+
+
+def _device_values(chip: Chip) -> dict[tuple[int, Any], float]:
+    values = {}
+    for i, device in enumerate(_device_table(chip)):
+        for logic_type, value in device.logic.items():
+            values[(i, logic_type)] = value
+        for slot, slot_values in enumerate(device.slots):
+            for logic_type, value in slot_values.items():
+                values[(i, (slot, logic_type))] = value
+    return values
+
+
+def _apply(devices: list[Device], inputs: list[TraceEntry]) -> None:
+    for i, key, value in inputs:
+        if isinstance(key, str):
+            devices[i].write(key, value)
+        else:
+            devices[i].write_slot(key[0], key[1], value)
+
+
+class Recorder:
+    """Runs a chip tick by tick, recording the device inputs it sees.
+
+    An input is any logic or slot value that changed between two runs, i.e.
+    was written by something other than the chip itself.
+    """
+
+    def __init__(self, chip: Chip):
+        self.chip = chip
+        self.start = Snapshot.capture(chip)
+        self.trace: list[list[TraceEntry]] = []  # per run
+        self._last = _device_values(chip)
+
+    def run(self, max_steps: int = 1_000_000) -> str:
+        values = _device_values(self.chip)
+        last = self._last
+        self.trace.append(
+            [(i, key, value) for (i, key), value in values.items() if last.get((i, key)) != value]
+        )
+        status = self.chip.run(max_steps)
+        self._last = _device_values(self.chip)
+        return status
+
+
+def replay(
+    snapshot: Snapshot,
+    bytecode: Bytecode,
+    trace: list[list[TraceEntry]],
+    max_steps: int = 1_000_000,
+) -> Chip:
+    """Restore `snapshot` and rerun it, applying each run's recorded inputs."""
+    chip = snapshot.restore(bytecode)
+    devices = _device_table(chip)
+    for inputs in trace:
+        _apply(devices, inputs)
+        chip.run(max_steps)
+    return chip
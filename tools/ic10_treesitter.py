@@ -0,0 +1,341 @@
+"""Tree-sitter backed IC10 parsing with incremental reparsing of edited documents.
+
+Builds the same per-line Program IR as tools.ic10_parser, but from the
+syntax nodes of the tree-sitter-ic10 grammar, so every validation rule runs
+unchanged on either path. SyntaxDocument keeps the previous tree and feeds
+edits through tree.edit() so only the changed region is reparsed and only
+the affected lines of the IR are rebuilt.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from . import config
+from .ic10_parser import (
+    DEVICE,
+    HASH,
+    IDENTIFIER,
+    NUMBER,
+    REGISTER,
+    Line,
+    Operand,
+    Program,
+    classify_operand,
+    index_program,
+    tokenize,
+    tokenize_line,
+)
+
+# Grammar node types mapped onto IR operand kinds. The tokenizer's
+# classification is kept when it is more specific (rr0, dr1, out-of-range).
+NODE_KINDS = {
+    "register": REGISTER,
+    "device": DEVICE,
+    "device_spec": DEVICE,
+    "number": NUMBER,
+    "hash_preproc": HASH,
+    "preproc_string": HASH,
+    "string": HASH,
+    "identifier": IDENTIFIER,
+    "logictype": IDENTIFIER,
+    "batchmode": IDENTIFIER,
+    "reagentmode": IDENTIFIER,
+}
+
+# Nodes that start a new IR element; anything else is descended into
+_LINE_NODES = {"instruction", "label", "comment", "ERROR"}
+
+# Keep the shared library and capsule name alive for the process lifetime
+_CAPSULE_NAME = b"tree_sitter.Language"
+_loaded_libraries: list[Any] = []
+
+
+# =============================================================================
+# Grammar Loading
+# =============================================================================
+
+
+def load_language(path: Path = config.GRAMMAR_PATH) -> Any:
+    """Load the compiled tree-sitter-ic10 grammar as a tree_sitter.Language."""
+    import ctypes
+
+    import tree_sitter
+
+    try:
+        # py-tree-sitter >= 0.22 wants a PyCapsule around TSLanguage*
+        library = ctypes.cdll.LoadLibrary(str(path))
+        factory = library.tree_sitter_ic10
+        factory.restype = ctypes.c_void_p
+        new_capsule = ctypes.pythonapi.PyCapsule_New
+        new_capsule.restype = ctypes.py_object
+        new_capsule.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_void_p]
+        _loaded_libraries.append(library)
+        return tree_sitter.Language(new_capsule(factory(), _CAPSULE_NAME, None))
+    except TypeError:
+        # py-tree-sitter 0.21 loads straight from the path
+        return tree_sitter.Language(str(path), "ic10")
+
+
+def make_parser(language: Any) -> Any:
+    """Create a parser for a loaded language (any py-tree-sitter version)."""
+    import tree_sitter
+
+    try:
+        return tree_sitter.Parser(language)
+    except TypeError:
+        parser = tree_sitter.Parser()
+        parser.set_language(language)
+        return parser
+
+
+# =============================================================================
+# Tree -> IR
+# =============================================================================
+
+
+def _char_column(text: str, byte_column: int) -> int:
+    """Convert a byte column on a line to a 0-indexed character column."""
+    if text.isascii():
+        return byte_column
+    return len(text.encode("utf-8")[:byte_column].decode("utf-8", "ignore"))
+
+
+def _node_text(node: Any) -> str:
+    return node.text.decode("utf-8", "replace")
+
+
+def _operand(node: Any, text: str) -> Operand:
+    """Build an IR operand from an operand syntax node."""
+    if node.type == "operand" and node.named_child_count:
+        node = node.named_children[0]
+    operand = classify_operand(
+        _node_text(node), _char_column(text, node.start_point[1]) + 1
+    )
+    kind = NODE_KINDS.get(node.type)
+    if kind is not None and kind != IDENTIFIER and operand.kind == IDENTIFIER:
+        operand.kind = kind
+    return operand
+
+
+def _collect(node: Any, first_row: int, last_row: int, out: dict) -> None:
+    """Gather line-level nodes per row, pruning subtrees outside the rows."""
+    for child in node.children:
+        if child.end_point[0] < first_row or child.start_point[0] > last_row:
+            continue
+        if child.type in _LINE_NODES or child.is_missing:
+            out.setdefault(child.start_point[0], []).append(child)
+        elif child.child_count:
+            _collect(child, first_row, last_row, out)
+
+
+def build_line(number: int, text: str, nodes: list[Any]) -> Line:
+    """Build one IR line from the syntax nodes starting on that row."""
+    if any(node.type == "ERROR" or node.is_missing for node in nodes):
+        # Unparseable rows still get a best-effort tokenization
+        return tokenize_line(number, text)
+
+    line = Line(number=number, text=text)
+    for node in nodes:
+        column = _char_column(text, node.start_point[1]) + 1
+        if node.type == "comment":
+            line.comment_column = column
+        elif node.type == "label":
+            names = node.named_children
+            line.label = _node_text(names[0] if names else node).rstrip(":")
+            line.label_column = column
+        elif node.type == "instruction":
+            operation = node.child_by_field_name("operation")
+            if operation is None:
+                operation = node.named_children[0]
+            line.opcode = _node_text(operation).lower()
+            line.opcode_column = _char_column(text, operation.start_point[1]) + 1
+            operands = node.children_by_field_name("operand") or [
+                child
+                for child in node.named_children
+                if child != operation and child.type != "comment"
+            ]
+            line.operands = tuple(_operand(child, text) for child in operands)
+    return line
+
+
+def program_from_tree(code: str, tree: Any) -> Program:
+    """Build a Program IR from a full syntax tree."""
+    texts = code.split("\n")
+    rows: dict[int, list[Any]] = {}
+    _collect(tree.root_node, 0, len(texts), rows)
+    lines = [build_line(i + 1, text, rows.get(i, [])) for i, text in enumerate(texts)]
+    program = Program(
+        code=code, lines=lines, size=len(code.encode("utf-8")), tree=tree
+    )
+    index_program(program)
+    return program
+
+
+def syntax_errors(tree: Any) -> Iterator[Any]:
+    """Yield ERROR and MISSING nodes, skipping subtrees without errors."""
+    stack = [tree.root_node]
+    while stack:
+        node = stack.pop()
+        if node.type == "ERROR" or node.is_missing:
+            yield node
+        elif node.has_error:
+            stack.extend(reversed(node.children))
+
+
+# =============================================================================
+# Incremental Documents
+# =============================================================================
+
+
+def _point(text: str, offset: int) -> tuple[int, int]:
+    """(row, byte column) of a character offset."""
+    row = text.count("\n", 0, offset)
+    line_start = text.rfind("\n", 0, offset) + 1
+    return row, len(text[line_start:offset].encode("utf-8"))
+
+
+class SyntaxDocument:
+    """An edited document whose tree and IR are updated incrementally."""
+
+    def __init__(self, parser: Any, text: str = ""):
+        self.parser = parser
+        self.set_text(text)
+
+    def set_text(self, text: str) -> None:
+        """Replace the whole document and parse from scratch."""
+        self.text = text
+        self.tree = self.parser.parse(text.encode("utf-8"))
+        self.program = program_from_tree(text, self.tree)
+
+    def edit(self, start: int, end: int, new_text: str) -> None:
+        """Replace text[start:end] (character offsets) and reparse incrementally."""
+        old = self.text
+        text = old[:start] + new_text + old[end:]
+        start_byte = len(old[:start].encode("utf-8"))
+        old_end_byte = start_byte + len(old[start:end].encode("utf-8"))
+        new_end_byte = start_byte + len(new_text.encode("utf-8"))
+        start_point = _point(old, start)
+        old_end_point = _point(old, end)
+        new_end_point = _point(text, start + len(new_text))
+
+        self.tree.edit(
+            start_byte=start_byte,
+            old_end_byte=old_end_byte,
+            new_end_byte=new_end_byte,
+            start_point=start_point,
+            old_end_point=old_end_point,
+            new_end_point=new_end_point,
+        )
+        tree = self.parser.parse(text.encode("utf-8"), self.tree)
+
+        # Rows to rebuild: the edited span plus whatever the reparse changed
+        first_row, last_row = start_point[0], new_end_point[0]
+        for changed in self.tree.changed_ranges(tree):
+            first_row = min(first_row, changed.start_point[0])
+            last_row = max(last_row, changed.end_point[0])
+
+        self.text = text
+        self.tree = tree
+        self._rebuild_rows(first_row, last_row, new_end_point[0] - old_end_point[0])
+
+    def _rebuild_rows(self, first_row: int, last_row: int, row_delta: int) -> None:
+        """Rebuild IR lines in [first_row, last_row]; shift and reuse the rest."""
+        texts = self.text.split("\n")
+        last_row = min(last_row, len(texts) - 1)
+        old_lines = self.program.lines
+
+        rows: dict[int, list[Any]] = {}
+        _collect(self.tree.root_node, first_row, last_row, rows)
+
+        lines = old_lines[:first_row]
+        lines.extend(
+            build_line(row + 1, texts[row], rows.get(row, []))
+            for row in range(first_row, last_row + 1)
+        )
+        for line in old_lines[last_row + 1 - row_delta :]:
+            line.number += row_delta
+            lines.append(line)
+
+        self.program = Program(
+            code=self.text,
+            lines=lines,
+            size=len(self.text.encode("utf-8")),
+            tree=self.tree,
+        )
+        index_program(self.program)
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+
+def benchmark(files: list[Path], repeat: int = 20) -> dict[str, float]:
+    """Time the regex fallback against full and incremental tree-sitter parses.
+
+    Returns milliseconds per corpus pass for each path. The incremental
+    figure is one single-character edit (and IR update) per document.
+    """
+    parser = make_parser(load_language())
+    codes = [path.read_text(encoding="utf-8") for path in files]
+
+    def timed(run) -> float:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        return (time.perf_counter() - start) * 1000 / repeat
+
+    def fallback():
+        for code in codes:
+            tokenize(code)
+
+    def full():
+        for code in codes:
+            program_from_tree(code, parser.parse(code.encode("utf-8")))
+
+    documents = [SyntaxDocument(parser, code) for code in codes]
+
+    def incremental():
+        for document in documents:
+            middle = len(document.text) // 2
+            document.edit(middle, middle, " ")
+            document.edit(middle, middle + 1, "")
+
+    return {
+        "fallback_tokenizer_ms": timed(fallback),
+        "tree_sitter_full_ms": timed(full),
+        # Two edits per document per pass
+        "tree_sitter_incremental_ms": timed(incremental) / 2,
+    }
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark tree-sitter IC10 parsing against the regex fallback",
+    )
+    parser.add_argument(
+        "--dir",
+        type=Path,
+        default=config.EXAMPLES_DIR,
+        help="Directory of *.ic10 files (default: examples/)",
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Passes per path")
+    args = parser.parse_args()
+
+    if not config.GRAMMAR_PATH.exists():
+        print(f"Grammar not built: {config.GRAMMAR_PATH} (see tools/grammars/README.md)")
+        sys.exit(1)
+
+    files = sorted(args.dir.rglob("*.ic10"))
+    results = benchmark(files, args.repeat)
+    print(f"{len(files)} files, {args.repeat} passes")
+    for name, ms in results.items():
+        print(f"  {name:<28} {ms:8.2f} ms/pass")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,36 @@
 """IC10 code validator with tree-sitter parsing and rule-based checking."""
 
 import argparse
+import functools
+import glob
+import hashlib
 import json
-import re
+import os
 import sys
-from dataclasses import asdict, dataclass, field
+import time
+from array import array
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
-
-from rich.console import Console
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional
 
 from . import config
+from .ic10_cfg import CFG, Liveness, TickPath, build_cfg
+from .ic10_deadcode import DeadCode, find_dead_code, find_dead_stores
+from .ic10_parser import DEVICE, IDENTIFIER, REGISTER, Program, tokenize
+from .ic10_treesitter import load_language, make_parser, program_from_tree, syntax_errors
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from .ic10_cache import ResultCache
 
-console = Console()
+
+@functools.cache
+def _console() -> "Console":
+    """Rich console, imported only when pretty output is actually printed."""
+    from rich.console import Console
+
+    return Console()
 
 
 # =============================================================================
@@ -20,18 +38,69 @@ console = Console()
 # =============================================================================
 
 
-@dataclass
 class ValidationIssue:
-    """A single validation issue found in IC10 code."""
+    """A single validation issue found in IC10 code.
+
+    Slotted, with interned severity/rule strings. The message may be a
+    str.format template plus arguments and is only formatted when read, so
+    bulk runs that never print messages never build them.
+    """
+
+    __slots__ = ("severity", "line", "column", "rule", "_message", "_args")
+
+    def __init__(
+        self,
+        severity: str,  # "error", "warning", "info"
+        line: int,  # 1-indexed line number
+        column: Optional[int],  # 1-indexed column, or None
+        message: str,
+        rule: str,  # Rule ID (e.g., "E001")
+        args: tuple = (),  # format arguments for a templated message
+    ):
+        self.severity = sys.intern(severity)
+        self.line = line
+        self.column = column
+        self.rule = sys.intern(rule)
+        self._message = message
+        self._args = args
+
+    @property
+    def message(self) -> str:
+        """The formatted message (formatted once, on first access)."""
+        if self._args:
+            self._message = self._message.format(*self._args)
+            self._args = ()
+        return self._message
 
-    severity: str  # "error", "warning", "info"
-    line: int  # 1-indexed line number
-    column: Optional[int]  # 1-indexed column, or None
-    message: str
-    rule: str  # Rule ID (e.g., "E001")
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "severity": self.severity,
+            "line": self.line,
+            "column": self.column,
+            "message": self.message,
+            "rule": self.rule,
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ValidationIssue):
+            return NotImplemented
+        return (self.rule, self.line, self.column, self.severity, self.message) == (
+            other.rule,
+            other.line,
+            other.column,
+            other.severity,
+            other.message,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"ValidationIssue(severity={self.severity!r}, line={self.line!r}, "
+            f"column={self.column!r}, message={self.message!r}, rule={self.rule!r})"
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationStats:
     """Statistics about the validated code."""
 
@@ -42,8 +111,23 @@ class ValidationStats:
     devices_used: list[str] = field(default_factory=list)
     labels_defined: list[str] = field(default_factory=list)
 
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "lines": self.lines,
+            "lines_of_code": self.lines_of_code,
+            "bytes": self.bytes,
+            "registers_used": list(self.registers_used),
+            "devices_used": list(self.devices_used),
+            "labels_defined": list(self.labels_defined),
+        }
+
+
+# Interned timing-name tuples (one per distinct rule/analysis set)
+_TIMING_NAMES: dict[tuple[str, ...], tuple[str, ...]] = {}
+
 
-@dataclass
+@dataclass(slots=True)
 class ValidationResult:
     """Complete result of validating IC10 code."""
 
@@ -53,77 +137,643 @@ class ValidationResult:
     warnings: list[ValidationIssue] = field(default_factory=list)
     info: list[ValidationIssue] = field(default_factory=list)
     parser_available: bool = True
+    cached: bool = False  # served from the result cache
+    # Analysis names then rule IDs; the tuple is shared by every result
+    timing_names: tuple[str, ...] = ()
+    timings: "array[float]" = field(default_factory=lambda: array("d"))  # ms
+    analysis_count: int = 0  # leading timing_names entries that are analyses
+
+    @property
+    def analysis_timings(self) -> dict[str, float]:
+        """Analysis name -> ms."""
+        n = self.analysis_count
+        return dict(zip(self.timing_names[:n], self.timings[:n]))
+
+    @property
+    def rule_timings(self) -> dict[str, float]:
+        """Rule ID -> ms."""
+        n = self.analysis_count
+        return dict(zip(self.timing_names[n:], self.timings[n:]))
+
+    def set_timings(self, analyses: dict[str, float], rules: dict[str, float]) -> None:
+        """Store timings compactly, sharing the name tuple between results."""
+        names = tuple(analyses) + tuple(rules)
+        self.timing_names = _TIMING_NAMES.setdefault(names, names)
+        self.timings = array("d", [*analyses.values(), *rules.values()])
+        self.analysis_count = len(analyses)
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
         return {
             "passed": self.passed,
-            "stats": asdict(self.stats),
-            "errors": [asdict(e) for e in self.errors],
-            "warnings": [asdict(w) for w in self.warnings],
-            "info": [asdict(i) for i in self.info],
+            "stats": self.stats.to_dict(),
+            "errors": [e.to_dict() for e in self.errors],
+            "warnings": [w.to_dict() for w in self.warnings],
+            "info": [i.to_dict() for i in self.info],
             "parser_available": self.parser_available,
+            "timings_ms": {
+                "analyses": dict(self.analysis_timings),
+                "rules": dict(self.rule_timings),
+            },
+            "cached": self.cached,
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "ValidationResult":
+        """Rebuild a result from to_dict() output."""
+        timings = data.get("timings_ms", {})
+        result = cls(
+            passed=data["passed"],
+            stats=ValidationStats(**data["stats"]),
+            errors=[ValidationIssue(**e) for e in data["errors"]],
+            warnings=[ValidationIssue(**w) for w in data["warnings"]],
+            info=[ValidationIssue(**i) for i in data["info"]],
+            parser_available=data.get("parser_available", True),
+            cached=data.get("cached", False),
+        )
+        result.set_timings(timings.get("analyses", {}), timings.get("rules", {}))
+        return result
+
+
+# =============================================================================
+# Rule Registry
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A validation rule: an ID, a severity and a check over analyses."""
+
+    id: str  # Rule ID (e.g., "E003")
+    severity: str  # "error", "warning", "info"
+    description: str
+    check: Callable[["RuleContext"], None]
+    requires: tuple[str, ...] = ("program",)  # analyses the check reads
+    default: bool = True  # enabled unless explicitly disabled
+
+
+# Registered rules, in execution order
+RULES: dict[str, Rule] = {}
+
+# Analyses rules can depend on, computed at most once per validation:
+# name -> (build, names of the analyses passed to build after the Program)
+ANALYSES: dict[str, tuple[Callable[..., Any], tuple[str, ...]]] = {}
+
+
+def register_rule(
+    rule_id: str,
+    severity: str,
+    description: str,
+    requires: tuple[str, ...] = ("program",),
+    default: bool = True,
+) -> Callable[[Callable[["RuleContext"], None]], Callable[["RuleContext"], None]]:
+    """Decorator registering a check function as a validation rule."""
+
+    def decorator(check: Callable[["RuleContext"], None]):
+        RULES[rule_id] = Rule(rule_id, severity, description, check, requires, default)
+        return check
+
+    return decorator
+
+
+def register_analysis(
+    name: str,
+    requires: tuple[str, ...] = (),
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator registering a named analysis computed from the Program.
+
+    The analyses in `requires` are computed first and passed to `build`
+    after the Program, in order.
+    """
+
+    def decorator(build: Callable[..., Any]):
+        ANALYSES[name] = (build, requires)
+        return build
+
+    return decorator
+
+
+class RuleContext:
+    """Per-validation state handed to each rule: the IR, analyses and issues."""
+
+    def __init__(self, program: Program):
+        self.program = program
+        self.issues: list[ValidationIssue] = []
+        self.analysis_timings: dict[str, float] = {}
+        self._analyses: dict[str, Any] = {"program": program}
+        self._rule: Optional[Rule] = None
+
+    def get(self, name: str) -> Any:
+        """Return a named analysis, computing and timing it on first use."""
+        if name not in self._analyses:
+            if name not in ANALYSES:
+                raise KeyError(f"Unknown analysis '{name}'")
+            build, requires = ANALYSES[name]
+            inputs = [self.get(required) for required in requires]
+            start = time.perf_counter()
+            self._analyses[name] = build(self.program, *inputs)
+            self.analysis_timings[name] = (time.perf_counter() - start) * 1000
+        return self._analyses[name]
+
+    def report(
+        self,
+        line: int,
+        column: Optional[int],
+        message: str,
+        *args: Any,
+        severity: Optional[str] = None,
+    ) -> None:
+        """Record an issue for the rule currently running.
+
+        With args, message is a str.format template filled in lazily.
+        """
+        rule = self._rule
+        self.issues.append(
+            ValidationIssue(
+                severity or rule.severity, line, column, message, rule.id, args
+            )
+        )
+
+    def run(self, rule: Rule) -> float:
+        """Run a single rule, returning its wall-clock time in ms."""
+        for name in rule.requires:
+            self.get(name)
+        self._rule = rule
+        start = time.perf_counter()
+        try:
+            rule.check(self)
+        finally:
+            self._rule = None
+        return (time.perf_counter() - start) * 1000
+
+
+# =============================================================================
+# Built-in Analyses and Rules
+# =============================================================================
+
+BRANCH_OPCODES = frozenset(config.BRANCH_INSTRUCTIONS)
+VALID_INSTRUCTIONS = frozenset(config.ALL_INSTRUCTIONS)
+
+
+@register_analysis("syntax_tree")
+def _syntax_tree(program: Program) -> Any:
+    """The tree-sitter tree, or None on the fallback tokenizer path."""
+    return program.tree
+
+
+@register_analysis("cfg")
+def _cfg(program: Program) -> CFG:
+    """Basic-block control-flow graph."""
+    return build_cfg(program)
+
+
+@register_analysis("tick_paths", requires=("cfg",))
+def _tick_paths(program: Program, cfg: CFG) -> list[TickPath]:
+    """Longest run from each resume point to the next yield/sleep."""
+    return cfg.tick_paths()
+
+
+@register_analysis("liveness", requires=("cfg",))
+def _liveness(program: Program, cfg: CFG) -> Liveness:
+    """Registers live before and after every line."""
+    return Liveness(cfg)
+
+
+@register_analysis("dead_code", requires=("cfg",))
+def _dead_code(program: Program, cfg: CFG) -> DeadCode:
+    """Unreachable runs and unused names (dead stores are separate)."""
+    return find_dead_code(cfg)
+
+
+@register_analysis("dead_stores", requires=("cfg", "liveness", "dead_code"))
+def _dead_stores(program: Program, cfg: CFG, liveness: Liveness, dead: DeadCode) -> list[int]:
+    """0-indexed lines whose result is never read (see ic10_deadcode)."""
+    return find_dead_stores(cfg, liveness, dead.unreachable)
+
+
+@register_rule("E001", "error", "Syntax error", requires=("syntax_tree",))
+def _check_syntax_tree(ctx: RuleContext) -> None:
+    tree = ctx.get("syntax_tree")
+    if tree is None:
+        return
+    lines = ctx.program.lines
+    for node in syntax_errors(tree):
+        row, byte_column = node.start_point
+        text = lines[row].text if row < len(lines) else ""
+        column = len(text.encode("utf-8")[:byte_column].decode("utf-8", "ignore")) + 1
+        if node.is_missing:
+            ctx.report(row + 1, column, "Missing '{}'", node.type)
+        else:
+            snippet = node.text.decode("utf-8", "replace").strip().split("\n")[0]
+            ctx.report(row + 1, column, "Syntax error near '{}'", snippet[:20])
+
+
+@register_rule("E002", "error", f"Line count exceeds {config.MAX_LINES}")
+def _check_line_count(ctx: RuleContext) -> None:
+    line_count = len(ctx.program.lines)
+    if line_count > config.MAX_LINES:
+        ctx.report(
+            config.MAX_LINES + 1,
+            None,
+            "Line count ({}) exceeds maximum ({})",
+            line_count,
+            config.MAX_LINES,
+        )
+
+
+@register_rule("W001", "warning", f"Line length exceeds {config.MAX_LINE_LENGTH} chars")
+def _check_line_length(ctx: RuleContext) -> None:
+    for line in ctx.program.lines:
+        if len(line.text) > config.MAX_LINE_LENGTH:
+            ctx.report(
+                line.number,
+                config.MAX_LINE_LENGTH + 1,
+                "Line length ({}) exceeds recommended maximum ({})",
+                len(line.text),
+                config.MAX_LINE_LENGTH,
+            )
+
+
+@register_rule("I001", "info", "Code size approaching limit")
+def _check_size_warning(ctx: RuleContext) -> None:
+    code_bytes = ctx.program.size
+    if config.MAX_CODE_SIZE * 0.9 < code_bytes <= config.MAX_CODE_SIZE:
+        ctx.report(
+            1,
+            None,
+            "Code size ({} bytes) approaching limit ({} bytes)",
+            code_bytes,
+            config.MAX_CODE_SIZE,
+        )
+
+
+@register_rule("E007", "error", f"Code size exceeds {config.MAX_CODE_SIZE} bytes")
+def _check_size_limit(ctx: RuleContext) -> None:
+    code_bytes = ctx.program.size
+    if code_bytes > config.MAX_CODE_SIZE:
+        ctx.report(
+            1,
+            None,
+            "Code size ({} bytes) exceeds limit ({} bytes)",
+            code_bytes,
+            config.MAX_CODE_SIZE,
+        )
+
+
+@register_rule("E003", "error", "Unknown instruction")
+def _check_syntax(ctx: RuleContext) -> None:
+    for line in ctx.program.lines:
+        if line.opcode is not None and line.opcode not in VALID_INSTRUCTIONS:
+            ctx.report(
+                line.number, line.opcode_column, "Unknown instruction '{}'", line.opcode
+            )
+
+
+@register_rule("E004", "error", "Invalid register")
+def _check_registers(ctx: RuleContext) -> None:
+    for line in ctx.program.lines:
+        for operand in line.operands:
+            # Numbered register r0-r15
+            if operand.kind == REGISTER and operand.index is not None:
+                if operand.index > 15:
+                    ctx.report(
+                        line.number,
+                        operand.column,
+                        "Invalid register 'r{}' (valid: r0-r15, ra, sp)",
+                        operand.index,
+                    )
+
+
+@register_rule("E005", "error", "Invalid device")
+def _check_devices(ctx: RuleContext) -> None:
+    for line in ctx.program.lines:
+        for operand in line.operands:
+            if operand.kind != DEVICE:
+                continue
+            # Numbered device d0-d5
+            if operand.index is not None and operand.index > 5:
+                ctx.report(
+                    line.number,
+                    operand.column,
+                    "Invalid device 'd{}' (valid: d0-d5, db, dr0-dr15)",
+                    operand.index,
+                )
+            # dr needs the register holding the pin number (dr0)
+            elif operand.text == "dr":
+                ctx.report(
+                    line.number,
+                    operand.column,
+                    "Invalid device 'dr' (give a register: dr0-dr15)",
+                )
+
+
+@register_rule("E006", "error", "Undefined branch target")
+def _check_labels(ctx: RuleContext) -> None:
+    program = ctx.program
+
+    # Defines can be used as labels in some cases
+    defined_labels = program.labels.keys() | program.defines.keys()
+
+    for line in program.lines:
+        if line.opcode not in BRANCH_OPCODES or not line.operands:
+            continue
+
+        # The jump target is always the last operand (j label, bdns d0 label)
+        target = line.operands[-1]
+
+        # Skip relative offsets, registers and indirect references
+        if target.kind != IDENTIFIER:
+            continue
+
+        if target.text not in defined_labels and target.text not in program.aliases:
+            ctx.report(
+                line.number, target.column, "Undefined branch target '{}'", target.text
+            )
+
+
+@register_rule("W002", "warning", "Loop may lack yield/sleep", requires=("cfg",))
+def _check_loops(ctx: RuleContext) -> None:
+    cfg: CFG = ctx.get("cfg")
+    lines = ctx.program.lines
+
+    # Every strongly connected component left after removing yielding blocks
+    for component in cfg.yield_free_cycles():
+        members = set(component)
+        header = cfg.blocks[component[0]]
+
+        # Report at the last jump closing the loop back to its header
+        back_edges = [
+            cfg.blocks[pred].end for pred in header.predecessors if pred in members
+        ]
+        report_line = max(back_edges, default=header.end) + 1
+
+        label = lines[header.start].label
+        if label is not None:
+            ctx.report(
+                report_line,
+                None,
+                "Loop to '{}' (line {}) may lack yield/sleep",
+                label,
+                header.start + 1,
+            )
+        else:
+            last = max(cfg.blocks[b].end for b in component) + 1
+            ctx.report(
+                report_line,
+                None,
+                "Loop at lines {}-{} may lack yield/sleep",
+                header.start + 1,
+                last,
+            )
+
+
+@register_rule(
+    "W004",
+    "warning",
+    f"Path may exceed {config.MAX_INSTRUCTIONS_PER_TICK} instructions per tick",
+    requires=("tick_paths",),
+)
+def _check_tick_budget(ctx: RuleContext) -> None:
+    for path in ctx.get("tick_paths"):
+        if path.instructions > config.MAX_INSTRUCTIONS_PER_TICK:
+            ctx.report(
+                path.start + 1,
+                None,
+                "Up to {} instructions from line {} to line {} without yield/sleep "
+                "(limit {} per tick)",
+                path.instructions,
+                path.start + 1,
+                path.end + 1,
+                config.MAX_INSTRUCTIONS_PER_TICK,
+            )
+
+
+@register_rule(
+    "I002",
+    "info",
+    "Path approaching instructions per tick",
+    requires=("tick_paths",),
+)
+def _check_tick_budget_warning(ctx: RuleContext) -> None:
+    budget = config.MAX_INSTRUCTIONS_PER_TICK
+    for path in ctx.get("tick_paths"):
+        if budget * 0.9 < path.instructions <= budget:
+            ctx.report(
+                path.start + 1,
+                None,
+                "Up to {} instructions from line {} to line {} without yield/sleep "
+                "(approaching the limit of {} per tick)",
+                path.instructions,
+                path.start + 1,
+                path.end + 1,
+                budget,
+            )
+
+
+@register_rule("I003", "info", "Unreachable code", requires=("dead_code",))
+def _check_unreachable(ctx: RuleContext) -> None:
+    lines = ctx.program.lines
+    for run in ctx.get("dead_code").unreachable:
+        where = (
+            f"Line {run.start + 1}"
+            if run.start == run.end
+            else f"Lines {run.start + 1}-{run.end + 1}"
+        )
+        if run.after is not None:
+            ctx.report(
+                run.start + 1,
+                None,
+                "{} can never run (after '{}' on line {})",
+                where,
+                lines[run.after].opcode,
+                run.after + 1,
+            )
+        else:
+            ctx.report(run.start + 1, None, "{} can never run", where)
+
+
+@register_rule("I004", "info", "Unused label, define or alias", requires=("dead_code",))
+def _check_unused_names(ctx: RuleContext) -> None:
+    for unused in ctx.get("dead_code").unused:
+        ctx.report(unused.line + 1, None, "{} '{}' is never used", unused.kind.title(), unused.name)
+
+
+@register_rule("I005", "info", "Dead store", requires=("dead_stores",), default=False)
+def _check_dead_stores(ctx: RuleContext) -> None:
+    lines = ctx.program.lines
+    for i in ctx.get("dead_stores"):
+        target = lines[i].operands[0]
+        ctx.report(
+            i + 1, target.column, "'{}' is overwritten or never read after this", target.text
+        )
+
 
 # =============================================================================
 # Validator Class
 # =============================================================================
 
 
+@functools.lru_cache(maxsize=None)
+def _module_digest(module_name: str) -> bytes:
+    """SHA-256 of a loaded module's source file (name only if unavailable)."""
+    module = sys.modules.get(module_name)
+    source = getattr(module, "__file__", None)
+    try:
+        return hashlib.sha256(Path(source).read_bytes()).digest()
+    except (OSError, TypeError):
+        return module_name.encode()
+
+
 class IC10Validator:
     """Validates IC10 code for Stationeers."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        enable: Iterable[str] = (),
+        disable: Iterable[str] = (),
+        extra_rules: Iterable[Rule] = (),
+        cache: Optional["ResultCache"] = None,
+    ):
+        self.cache = cache
+        self._fingerprint: Optional[str] = None
         self.parser = None
         self.language = None
         self._try_load_parser()
 
-        # Build instruction set from config
-        self.valid_instructions = set(config.ALL_INSTRUCTIONS)
-
-        # Regex patterns for fallback parsing
-        self._patterns = {
-            "comment": re.compile(r"^\s*#.*$|^\s*//.*$"),
-            "label": re.compile(r"^(\w+):"),
-            "instruction": re.compile(r"^\s*(\w+)(?:\s+(.*))?$"),
-            "register": re.compile(r"\br([0-9]+)\b|\b(ra|sp)\b"),
-            "device": re.compile(r"\bd([0-9]+)\b|\b(db|dr)\b"),
-            "alias": re.compile(r"^\s*alias\s+(\w+)\s+(\w+)"),
-            "define": re.compile(r"^\s*define\s+(\w+)\s+(.+)"),
-        }
+        # Per-instance rule set: registered rules plus any custom ones
+        self.rules: dict[str, Rule] = dict(RULES)
+        for rule in extra_rules:
+            self.rules[rule.id] = rule
+        self.enabled: set[str] = {r.id for r in self.rules.values() if r.default}
+
+        for rule_id in enable:
+            self.enable_rule(rule_id)
+        for rule_id in disable:
+            self.disable_rule(rule_id)
 
     def _try_load_parser(self) -> None:
         """Try to load tree-sitter parser if available."""
         try:
-            import tree_sitter
-
             if config.GRAMMAR_PATH.exists():
                 # Load language from compiled grammar file
-                self.language = tree_sitter.Language(str(config.GRAMMAR_PATH))
-                self.parser = tree_sitter.Parser(self.language)
+                self.language = load_language(config.GRAMMAR_PATH)
+                self.parser = make_parser(self.language)
         except (ImportError, OSError, Exception):
             # tree-sitter not available or grammar not built
             self.parser = None
             self.language = None
 
+    def _rule_id(self, rule_id: str) -> str:
+        """Normalize and check a rule ID."""
+        rule_id = rule_id.strip().upper()
+        if rule_id not in self.rules:
+            raise ValueError(
+                f"Unknown rule '{rule_id}' (known: {', '.join(self.rules)})"
+            )
+        return rule_id
+
+    def add_rule(self, rule: Rule, enabled: bool = True) -> None:
+        """Add a custom rule to this validator."""
+        self.rules[rule.id] = rule
+        if enabled:
+            self.enabled.add(rule.id)
+        self._fingerprint = None
+
+    def enable_rule(self, rule_id: str) -> None:
+        """Enable a rule by ID."""
+        self.enabled.add(self._rule_id(rule_id))
+        self._fingerprint = None
+
+    def disable_rule(self, rule_id: str) -> None:
+        """Disable a rule by ID."""
+        self.enabled.discard(self._rule_id(rule_id))
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self) -> str:
+        """Digest of everything besides the code that affects results.
+
+        Covers the hard limits, the active rules and their severities, and
+        the source of every module implementing them, so editing a rule
+        invalidates cached results automatically.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            digest.update(
+                f"{config.MAX_LINES}:{config.MAX_LINE_LENGTH}:{config.MAX_CODE_SIZE}".encode()
+            )
+            digest.update(b"parser" if self.parser is not None else b"fallback")
+            modules = {__name__, tokenize.__module__, build_cfg.__module__}
+            for rule in self.active_rules:
+                check = rule.check
+                digest.update(
+                    f"{rule.id}:{rule.severity}:{check.__module__}.{check.__qualname__}".encode()
+                )
+                modules.add(check.__module__)
+            for module in sorted(modules):
+                digest.update(_module_digest(module))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    @property
+    def active_rules(self) -> list[Rule]:
+        """Enabled rules, in execution order."""
+        return [rule for rule in self.rules.values() if rule.id in self.enabled]
+
     def validate(self, code: str) -> ValidationResult:
-        """Validate IC10 code and return structured results."""
-        issues: list[ValidationIssue] = []
-        lines = code.split("\n")
+        """Validate IC10 code, consulting the result cache if configured."""
+        if self.cache is None:
+            return self._validate(code)
+
+        start = time.perf_counter()
+        key = hashlib.sha256(
+            self.fingerprint.encode() + b"\0" + code.encode("utf-8")
+        ).hexdigest()
+        stored = self.cache.get(key)
+        if stored is not None:
+            result = ValidationResult.from_dict(stored)
+            result.cached = True
+            result.set_timings({"cache": (time.perf_counter() - start) * 1000}, {})
+            return result
+
+        result = self._validate(code)
+        self.cache.put(key, result.to_dict())
+        return result
+
+    def parse(self, code: str) -> Program:
+        """Build the IR with tree-sitter when available, else the tokenizer."""
+        if self.parser is not None:
+            return program_from_tree(code, self.parser.parse(code.encode("utf-8")))
+        return tokenize(code)
+
+    def _validate(self, code: str) -> ValidationResult:
+        """Parse the code and run every enabled rule over it."""
+        start = time.perf_counter()
+        program = self.parse(code)
+        return self.validate_program(program, (time.perf_counter() - start) * 1000)
+
+    def validate_program(
+        self, program: Program, parse_ms: float = 0.0
+    ) -> ValidationResult:
+        """Run every enabled rule over an already-parsed program."""
+        # Parse once; every rule consumes the same IR
+        context = RuleContext(program)
+        context.analysis_timings["program"] = parse_ms
 
         # Gather statistics
-        stats = self._gather_stats(code, lines)
+        stats = self._gather_stats(program)
 
-        # Run all checks
-        issues.extend(self._check_constraints(code, lines))
-        issues.extend(self._check_syntax(code, lines))
-        issues.extend(self._check_registers(lines))
-        issues.extend(self._check_devices(lines))
-        issues.extend(self._check_labels(lines))
-        issues.extend(self._check_loops(lines))
+        # Compute required analyses up front so rule timings exclude them
+        rules = self.active_rules
+        for rule in rules:
+            for name in rule.requires:
+                context.get(name)
+
+        # Run all enabled rules
+        rule_timings = {rule.id: context.run(rule) for rule in rules}
 
         # Categorize issues
+        issues = context.issues
         errors = [i for i in issues if i.severity == "error"]
         warnings = [i for i in issues if i.severity == "warning"]
         info = [i for i in issues if i.severity == "info"]
@@ -131,7 +781,7 @@ class IC10Validator:
         # Determine pass/fail
         passed = len(errors) == 0
 
-        return ValidationResult(
+        result = ValidationResult(
             passed=passed,
             stats=stats,
             errors=errors,
@@ -139,352 +789,162 @@ class IC10Validator:
             info=info,
             parser_available=self.parser is not None,
         )
+        result.set_timings(context.analysis_timings, rule_timings)
+        return result
 
-    def _gather_stats(self, code: str, lines: list[str]) -> ValidationStats:
+    def _gather_stats(self, program: Program) -> ValidationStats:
         """Gather statistics about the code."""
+        # Names are interned: bulk runs keep thousands of copies of "r0"/"d0"
+        intern = sys.intern
         registers_used: set[str] = set()
         devices_used: set[str] = set()
         labels_defined: list[str] = []
         lines_of_code = 0
 
-        for line in lines:
-            stripped = line.strip()
-
-            # Skip empty lines and comments
-            if not stripped or stripped.startswith("#") or stripped.startswith("//"):
+        for line in program.lines:
+            if not line.is_code:
                 continue
 
             lines_of_code += 1
 
-            # Extract label if present
-            label_match = self._patterns["label"].match(stripped)
-            if label_match:
-                labels_defined.append(label_match.group(1))
-
-            # Extract registers
-            for match in self._patterns["register"].finditer(line):
-                if match.group(1):  # r0-r15
-                    registers_used.add(f"r{match.group(1)}")
-                elif match.group(2):  # ra, sp
-                    registers_used.add(match.group(2))
-
-            # Extract devices
-            for match in self._patterns["device"].finditer(line):
-                if match.group(1):  # d0-d5
-                    devices_used.add(f"d{match.group(1)}")
-                elif match.group(2):  # db, dr
-                    devices_used.add(match.group(2))
+            if line.label is not None:
+                labels_defined.append(intern(line.label))
+
+            for operand in line.operands:
+                if operand.kind == REGISTER:
+                    registers_used.add(intern(operand.text))
+                elif operand.kind == DEVICE:
+                    devices_used.add(intern(operand.text))
 
         return ValidationStats(
-            lines=len(lines),
+            lines=len(program.lines),
             lines_of_code=lines_of_code,
-            bytes=len(code.encode("utf-8")),
+            bytes=program.size,
             registers_used=sorted(registers_used),
             devices_used=sorted(devices_used),
             labels_defined=labels_defined,
         )
 
-    def _check_constraints(self, code: str, lines: list[str]) -> list[ValidationIssue]:
-        """Check hard constraints (line count, line length, code size)."""
-        issues = []
-
-        # E002: Line count
-        if len(lines) > config.MAX_LINES:
-            issues.append(
-                ValidationIssue(
-                    severity="error",
-                    line=config.MAX_LINES + 1,
-                    column=None,
-                    message=f"Line count ({len(lines)}) exceeds maximum ({config.MAX_LINES})",
-                    rule="E002",
-                )
-            )
-
-        # W001: Line length
-        for i, line in enumerate(lines, 1):
-            if len(line) > config.MAX_LINE_LENGTH:
-                issues.append(
-                    ValidationIssue(
-                        severity="warning",
-                        line=i,
-                        column=config.MAX_LINE_LENGTH + 1,
-                        message=f"Line length ({len(line)}) exceeds recommended maximum ({config.MAX_LINE_LENGTH})",
-                        rule="W001",
-                    )
-                )
-
-        # I001: Code size approaching limit
-        code_bytes = len(code.encode("utf-8"))
-        if code_bytes > config.MAX_CODE_SIZE * 0.9:
-            issues.append(
-                ValidationIssue(
-                    severity="info" if code_bytes <= config.MAX_CODE_SIZE else "error",
-                    line=1,
-                    column=None,
-                    message=f"Code size ({code_bytes} bytes) approaching limit ({config.MAX_CODE_SIZE} bytes)",
-                    rule="I001" if code_bytes <= config.MAX_CODE_SIZE else "E007",
-                )
-            )
-
-        return issues
-
-    def _check_syntax(self, code: str, lines: list[str]) -> list[ValidationIssue]:
-        """Check syntax and instruction validity."""
-        issues = []
-
-        for i, line in enumerate(lines, 1):
-            stripped = line.strip()
-
-            # Skip empty lines and comments
-            if not stripped or stripped.startswith("#") or stripped.startswith("//"):
-                continue
-
-            # Remove inline comments
-            if "#" in stripped:
-                stripped = stripped[: stripped.index("#")].strip()
-            if "//" in stripped:
-                stripped = stripped[: stripped.index("//")].strip()
-
-            if not stripped:
-                continue
-
-            # Check for label definition
-            label_match = self._patterns["label"].match(stripped)
-            if label_match:
-                # Remove label prefix for instruction parsing
-                stripped = stripped[label_match.end() :].strip()
-                if not stripped:
-                    continue  # Label-only line is valid
-
-            # Parse instruction
-            instr_match = self._patterns["instruction"].match(stripped)
-            if instr_match:
-                instruction = instr_match.group(1).lower()
-
-                # E003: Unknown instruction
-                if instruction not in self.valid_instructions:
-                    issues.append(
-                        ValidationIssue(
-                            severity="error",
-                            line=i,
-                            column=1,
-                            message=f"Unknown instruction '{instruction}'",
-                            rule="E003",
-                        )
-                    )
-
-        return issues
-
-    def _check_registers(self, lines: list[str]) -> list[ValidationIssue]:
-        """Check for invalid register references."""
-        issues = []
-        valid_register_nums = set(range(16))
-
-        for i, line in enumerate(lines, 1):
-            # Find all register references
-            for match in self._patterns["register"].finditer(line):
-                if match.group(1):  # Numbered register r0-r15
-                    reg_num = int(match.group(1))
-                    if reg_num not in valid_register_nums:
-                        issues.append(
-                            ValidationIssue(
-                                severity="error",
-                                line=i,
-                                column=match.start() + 1,
-                                message=f"Invalid register 'r{reg_num}' (valid: r0-r15, ra, sp)",
-                                rule="E004",
-                            )
-                        )
-
-        return issues
-
-    def _check_devices(self, lines: list[str]) -> list[ValidationIssue]:
-        """Check for invalid device references."""
-        issues = []
-        valid_device_nums = set(range(6))
-
-        for i, line in enumerate(lines, 1):
-            # Find all device references
-            for match in self._patterns["device"].finditer(line):
-                if match.group(1):  # Numbered device d0-d5
-                    dev_num = int(match.group(1))
-                    if dev_num not in valid_device_nums:
-                        issues.append(
-                            ValidationIssue(
-                                severity="error",
-                                line=i,
-                                column=match.start() + 1,
-                                message=f"Invalid device 'd{dev_num}' (valid: d0-d5, db, dr)",
-                                rule="E005",
-                            )
-                        )
-
-        return issues
-
-    def _check_labels(self, lines: list[str]) -> list[ValidationIssue]:
-        """Check for undefined branch targets."""
-        issues = []
-
-        # First pass: collect all defined labels
-        defined_labels: set[str] = set()
-        aliases: dict[str, str] = {}
-
-        for line in lines:
-            # Strip BOM and whitespace
-            stripped = line.lstrip("\ufeff").strip()
-
-            # Check for label definition
-            label_match = self._patterns["label"].match(stripped)
-            if label_match:
-                defined_labels.add(label_match.group(1))
-
-            # Check for alias (which can create label-like references)
-            alias_match = self._patterns["alias"].match(stripped)
-            if alias_match:
-                aliases[alias_match.group(1)] = alias_match.group(2)
-
-            # Check for define (numeric constants)
-            define_match = self._patterns["define"].match(stripped)
-            if define_match:
-                # Defines can be used as labels in some cases
-                defined_labels.add(define_match.group(1))
-
-        # Second pass: check branch targets
-        branch_pattern = re.compile(
-            r"^\s*(?:\w+:)?\s*(j|jr|jal|b\w+)\s+(?:[^,]+,\s*)?(?:[^,]+,\s*)?(\w+)\s*",
-            re.IGNORECASE,
-        )
-
-        for i, line in enumerate(lines, 1):
-            stripped = line.strip()
-            if not stripped or stripped.startswith("#") or stripped.startswith("//"):
-                continue
-
-            # Remove inline comments before parsing
-            if "#" in stripped:
-                stripped = stripped[: stripped.index("#")].strip()
-            if "//" in stripped:
-                stripped = stripped[: stripped.index("//")].strip()
 
-            if not stripped:
-                continue
-
-            # Check for branch instructions
-            branch_match = branch_pattern.match(stripped)
-            if branch_match:
-                instruction = branch_match.group(1).lower()
-                target = branch_match.group(2)
-
-                # Skip if target is a number (relative jump) or register
-                if target.isdigit() or target.startswith("-") or target in ("ra", "sp"):
-                    continue
-                if re.match(r"^r\d+$", target):
-                    continue
-
-                # Skip indirect register references (rr0, rr1, rrX, etc.)
-                if re.match(r"^rr\d+$", target) or re.match(r"^rr\w+$", target):
-                    continue
-
-                # Skip indirect device references (dr0, dr1, drX, etc.)
-                if re.match(r"^dr\d+$", target) or re.match(r"^dr\w+$", target):
-                    continue
-
-                # For bdns/bdse/brdns/brdse, the first arg after instruction is a device, not a label
-                # The pattern captures the last word, which for these is still the label
-                # But if instruction is bdns/bdse and target is an alias, it's checking device
-                if instruction in (
-                    "bdns",
-                    "bdse",
-                    "brdns",
-                    "brdse",
-                    "bdseal",
-                    "bdnsal",
-                ):
-                    # These instructions: bdns device label
-                    # The target we captured might be the device alias, check if next word exists
-                    parts = stripped.split()
-                    if len(parts) >= 3:
-                        # Last part should be the label, but might be captured wrong
-                        # If target is a device alias, skip it
-                        if target in aliases:
-                            continue
-
-                # Check if target is defined
-                if target not in defined_labels and target not in aliases:
-                    issues.append(
-                        ValidationIssue(
-                            severity="error",
-                            line=i,
-                            column=None,
-                            message=f"Undefined branch target '{target}'",
-                            rule="E006",
-                        )
-                    )
-
-        return issues
+# =============================================================================
+# Corpus Validation
+# =============================================================================
 
-    def _check_loops(self, lines: list[str]) -> list[ValidationIssue]:
-        """Check for yield/sleep in loops."""
-        issues = []
+# Per-process validator, built once by the pool initializer
+_worker_validator: Optional[IC10Validator] = None
+
+
+def _init_worker(
+    enable: list[str],
+    disable: list[str],
+    cache_path: Optional[Path] = None,
+    cache_max_bytes: int = config.VALIDATOR_CACHE_MAX_BYTES,
+) -> None:
+    """Build the validator (and its cache connection) once per worker process."""
+    global _worker_validator
+    cache = None
+    if cache_path:
+        from .ic10_cache import ResultCache
+
+        cache = ResultCache(cache_path, cache_max_bytes)
+    _worker_validator = IC10Validator(enable=enable, disable=disable, cache=cache)
+
+
+def _validate_path(path: str) -> tuple[str, Optional[ValidationResult], Optional[str]]:
+    """Validate one file in a worker, returning (path, result, read error)."""
+    try:
+        code = Path(path).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as e:
+        return path, None, str(e)
+    return path, _worker_validator.validate(code), None
+
+
+def collect_files(dirs: Iterable[Path] = (), patterns: Iterable[str] = ()) -> list[Path]:
+    """Expand directories (recursive *.ic10) and glob patterns into files."""
+    files: set[Path] = set()
+    for directory in dirs:
+        files.update(p for p in directory.rglob("*.ic10") if p.is_file())
+    for pattern in patterns:
+        files.update(Path(p) for p in glob.glob(pattern, recursive=True))
+    return sorted(p for p in files if p.is_file())
+
+
+def validate_files(
+    paths: Iterable[Path],
+    jobs: Optional[int] = None,
+    enable: Iterable[str] = (),
+    disable: Iterable[str] = (),
+    cache_path: Optional[Path] = None,
+    cache_max_bytes: int = config.VALIDATOR_CACHE_MAX_BYTES,
+) -> Iterator[tuple[str, Optional[ValidationResult], Optional[str]]]:
+    """Validate many files across a process pool, yielding as each finishes.
+
+    Yields (path, result, error) tuples; result is None when the file could
+    not be read, in which case error holds the reason. With cache_path set,
+    every worker shares the same on-disk result cache.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    paths = [str(p) for p in paths]
+    initargs = (list(enable), list(disable), cache_path, cache_max_bytes)
+    jobs = jobs or os.cpu_count() or 1
+
+    if jobs == 1 or len(paths) <= 1:
+        _init_worker(*initargs)
+        for path in paths:
+            yield _validate_path(path)
+        return
 
-        # Simple heuristic: find backward jumps and check for yield between target and jump
-        label_lines: dict[str, int] = {}
-        jump_lines: list[tuple[int, str]] = []  # (line_num, target)
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(paths)),
+        initializer=_init_worker,
+        initargs=initargs,
+    ) as pool:
+        futures = [pool.submit(_validate_path, path) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def run_corpus(
+    paths: list[Path],
+    jobs: Optional[int] = None,
+    enable: Iterable[str] = (),
+    disable: Iterable[str] = (),
+    cache_path: Optional[Path] = None,
+    cache_max_bytes: int = config.VALIDATOR_CACHE_MAX_BYTES,
+    out=None,
+) -> int:
+    """Stream one NDJSON record per file plus a summary; return the exit code."""
+    out = out or sys.stdout
+    start = time.perf_counter()
+    summary = {"files": 0, "passed": 0, "failed": 0, "unreadable": 0}
+    totals = {"errors": 0, "warnings": 0, "info": 0, "lines": 0, "cached": 0}
+
+    results = validate_files(
+        paths, jobs, enable, disable, cache_path, cache_max_bytes
+    )
+    for path, result, error in results:
+        summary["files"] += 1
+        if result is None:
+            summary["unreadable"] += 1
+            record = {"file": path, "error": error}
+        else:
+            summary["passed" if result.passed else "failed"] += 1
+            totals["errors"] += len(result.errors)
+            totals["warnings"] += len(result.warnings)
+            totals["info"] += len(result.info)
+            totals["lines"] += result.stats.lines
+            totals["cached"] += result.cached
+            record = {"file": path, **result.to_dict()}
+        out.write(json.dumps(record) + "\n")
+        out.flush()
 
-        # First pass: collect labels and jumps
-        for i, line in enumerate(lines, 1):
-            stripped = line.strip()
-            if not stripped or stripped.startswith("#") or stripped.startswith("//"):
-                continue
+    summary.update(totals)
+    summary["elapsed_s"] = round(time.perf_counter() - start, 3)
+    out.write(json.dumps({"summary": summary}) + "\n")
+    out.flush()
 
-            # Collect labels
-            label_match = self._patterns["label"].match(stripped)
-            if label_match:
-                label_lines[label_match.group(1)] = i
-
-            # Collect unconditional jumps
-            instr_match = self._patterns["instruction"].match(stripped)
-            if instr_match:
-                instr = instr_match.group(1).lower()
-                args = instr_match.group(2) or ""
-
-                if instr == "j":
-                    # Simple jump - target is the first (and only) argument
-                    target = args.split()[0] if args.split() else ""
-                    if target and not target.isdigit() and not target.startswith("-"):
-                        jump_lines.append((i, target))
-
-        # Second pass: check for backward jumps without yield
-        for jump_line, target in jump_lines:
-            if target in label_lines:
-                target_line = label_lines[target]
-                if target_line < jump_line:
-                    # This is a backward jump (potential loop)
-                    has_yield = False
-
-                    # Check lines between target and jump for yield/sleep
-                    for i in range(target_line, jump_line + 1):
-                        if i <= len(lines):
-                            check_line = lines[i - 1].strip().lower()
-                            for yield_instr in config.YIELD_INSTRUCTIONS:
-                                if yield_instr in check_line:
-                                    has_yield = True
-                                    break
-                            if has_yield:
-                                break
-
-                    if not has_yield:
-                        issues.append(
-                            ValidationIssue(
-                                severity="warning",
-                                line=jump_line,
-                                column=None,
-                                message=f"Loop to '{target}' (line {target_line}) may lack yield/sleep",
-                                rule="W002",
-                            )
-                        )
-
-        return issues
+    return 0 if summary["failed"] == 0 and summary["unreadable"] == 0 else 1
 
 
 # =============================================================================
@@ -552,6 +1012,11 @@ def format_pretty(result: ValidationResult) -> str:
     return "\n".join(output_lines)
 
 
+def _split_ids(values: list[str]) -> list[str]:
+    """Flatten repeatable comma-separated rule ID arguments."""
+    return [rule_id for value in values for rule_id in value.split(",") if rule_id]
+
+
 def main():
     """CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -562,6 +1027,12 @@ Examples:
   uv run -m tools.ic10_validator --file code.ic10
   cat code.ic10 | uv run -m tools.ic10_validator --stdin
   uv run -m tools.ic10_validator --file code.ic10 --format json
+  uv run -m tools.ic10_validator --file code.ic10 --disable W001,W002
+  uv run -m tools.ic10_validator --file code.min.ic10 --source-map code.min.ic10.map
+  uv run -m tools.ic10_validator --list-rules
+  uv run -m tools.ic10_validator --dir examples --jobs 8
+  uv run -m tools.ic10_validator --glob "outputs/**/*.ic10"
+  uv run -m tools.ic10_validator --serve
         """,
     )
 
@@ -579,6 +1050,64 @@ Examples:
     input_group.add_argument(
         "--check", action="store_true", help="Check if validator is available"
     )
+    input_group.add_argument(
+        "--dir",
+        type=Path,
+        action="append",
+        help="Validate every *.ic10 under a directory (NDJSON output, repeatable)",
+    )
+    input_group.add_argument(
+        "--glob",
+        action="append",
+        help="Validate files matching a glob pattern (NDJSON output, repeatable)",
+    )
+    input_group.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a resident LSP / JSON-RPC server on stdio",
+    )
+    input_group.add_argument(
+        "--list-rules", action="store_true", help="List rules and whether enabled"
+    )
+
+    # Rule selection
+    parser.add_argument(
+        "--enable",
+        action="append",
+        default=[],
+        metavar="IDS",
+        help="Comma-separated rule IDs to enable (repeatable)",
+    )
+    parser.add_argument(
+        "--disable",
+        action="append",
+        default=[],
+        metavar="IDS",
+        help="Comma-separated rule IDs to disable (repeatable)",
+    )
+
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        nargs="?",
+        const=config.VALIDATOR_CACHE_PATH,
+        default=None,
+        metavar="PATH",
+        help=f"Reuse results for unchanged code (default: {config.VALIDATOR_CACHE_PATH})",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=config.VALIDATOR_CACHE_MAX_BYTES / (1024 * 1024),
+        help="Evict least recently used cache entries beyond this size",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help="Worker processes for --dir/--glob (default: CPU count)",
+    )
 
     # Output format
     parser.add_argument(
@@ -587,27 +1116,75 @@ Examples:
         default="pretty",
         help="Output format (default: pretty)",
     )
+    parser.add_argument(
+        "--source-map",
+        type=Path,
+        metavar="PATH",
+        help="Report lines of the source a minified script came from (see ic10_minifier)",
+    )
 
     args = parser.parse_args()
 
+    cache_max_bytes = int(args.cache_max_mb * 1024 * 1024)
+    try:
+        validator = IC10Validator(
+            enable=_split_ids(args.enable), disable=_split_ids(args.disable)
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.cache:
+        from .ic10_cache import ResultCache
+
+        validator.cache = ResultCache(args.cache, cache_max_bytes)
+
+    # Handle --serve
+    if args.serve:
+        from .ic10_server import IC10Server
+
+        sys.exit(IC10Server(validator).serve())
+
+    # Handle --list-rules
+    if args.list_rules:
+        for rule in validator.rules.values():
+            state = "on " if rule.id in validator.enabled else "off"
+            _console().print(
+                f"  {rule.id}  {state}  {rule.severity:<7}  {rule.description}"
+                f"  [dim](needs: {', '.join(rule.requires)})[/dim]"
+            )
+        return
+
     # Handle --check
     if args.check:
-        validator = IC10Validator()
         if validator.parser is not None:
-            console.print("[green]tree-sitter parser available[/green]")
-            console.print(f"Grammar: {config.GRAMMAR_PATH}")
+            _console().print("[green]tree-sitter parser available[/green]")
+            _console().print(f"Grammar: {config.GRAMMAR_PATH}")
         else:
-            console.print("[yellow]tree-sitter parser not available[/yellow]")
-            console.print("Using fallback regex-based validation")
-            console.print(
+            _console().print("[yellow]tree-sitter parser not available[/yellow]")
+            _console().print("Using fallback regex-based validation")
+            _console().print(
                 f"To enable full parsing, build grammar at: {config.GRAMMAR_PATH}"
             )
         return
 
+    # Corpus mode: one NDJSON record per file, then a summary record
+    if args.dir or args.glob:
+        paths = collect_files(args.dir or (), args.glob or ())
+        sys.exit(
+            run_corpus(
+                paths,
+                jobs=args.jobs,
+                enable=_split_ids(args.enable),
+                disable=_split_ids(args.disable),
+                cache_path=args.cache,
+                cache_max_bytes=cache_max_bytes,
+            )
+        )
+
     # Get code to validate
     if args.file:
         if not args.file.exists():
-            console.print(f"[red]Error: File not found: {args.file}[/red]")
+            _console().print(f"[red]Error: File not found: {args.file}[/red]")
             sys.exit(1)
         code = args.file.read_text()
     elif args.stdin:
@@ -616,14 +1193,17 @@ Examples:
         code = args.code
 
     # Validate
-    validator = IC10Validator()
     result = validator.validate(code)
+    if args.source_map:
+        from .ic10_minifier import SourceMap
+
+        result = SourceMap.load(args.source_map).map_result(result)
 
     # Output
     if args.format == "json":
         print(json.dumps(result.to_dict(), indent=2))
     else:
-        console.print(format_pretty(result))
+        _console().print(format_pretty(result))
 
     # Exit code
     sys.exit(0 if result.passed else 1)